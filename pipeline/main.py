@@ -1,42 +1,109 @@
 import pandas as pd
+import argparse
+import cProfile
+import inspect
 import logging
+import multiprocessing
 import os
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 # Add project root to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pipeline.schemas.schema_pandera import OperationsSchema, FlotteursSchema, ResultatsHumainSchema
-from pipeline.utils.data_types import operations_dtypes, flotteurs_dtypes, resultats_humain_dtypes
-from pipeline.utils.db_utils import get_engine, insert_dataframe
+from pipeline.schemas.schema_pandera import (
+    OperationsSchema, FlotteursSchema, ResultatsHumainSchema,
+    CompactOperationsSchema, CompactFlotteursSchema, CompactResultatsHumainSchema,
+)
+from pipeline.utils.data_types import (
+    operations_dtypes, flotteurs_dtypes, resultats_humain_dtypes,
+    compact_operations_dtypes, compact_flotteurs_dtypes, compact_resultats_humain_dtypes,
+    operations_date_cols, operations_renames, operations_passthrough_cols,
+    apply_dtypes, memory_report, DTYPE_PROFILES,
+)
+from pipeline.utils.db_utils import (
+    get_engine, insert_dataframe, LOAD_METHODS, CONFLICT_MODES,
+    load_table_cache, save_table_cache, bump_data_versions,
+)
+from pipeline.utils.scheduler import run_stages
+from pipeline.utils.instrumentation import start_run, current_run, isolated_run, stage, file_size, add_count
+from pipeline.utils.dates import normalize_dates
+from pipeline.utils.csv_reader import csv_header, raw_projection, read_csv
+from pipeline.utils.partitions import byte_partitions, partition_count, read_partition, concat_partitions
+from pipeline.utils.checkpoints import CheckpointStore
+from pipeline.utils.incremental import (
+    load_state, filter_changed, merge_pending, commit_state, forget_rows,
+)
+from pipeline.utils.quarantine import Quarantine, split_failure_cases, split_rows, row_keys, REASON_COL
+from pipeline.utils.integrity import ParentKeys
+from pipeline.utils.dedup import KeyDeduplicator, key_hashes, fetch_known_keys
+from pipeline.schemas.fast_validator import (
+    compile_schema, fast_validate, failing_rows, DEFAULT_MAX_FAILURE_CASES,
+)
 from pandera.errors import SchemaErrors
+from sqlalchemy.exc import SQLAlchemyError
 import pandera as pa
 
 # ============================
 # 1. Chargement des données brutes
 # ============================
 
-def load_raw_data():
-    operations = pd.read_csv("pipeline/data/operations.csv")
-    flotteurs = pd.read_csv("pipeline/data/flotteurs.csv")
-    resultats = pd.read_csv("pipeline/data/resultats_humain.csv")
+def raw_read_options(name, path, dtype_profile="default"):
+    # Colonnes lues et types de lecture déduits du schéma de la table :
+    # les colonnes brutes inutiles ne sont jamais matérialisées, les textes
+    # sont lus directement en string / catégories (profil compact)
+    cfg = TABLES[name]
+    dtypes, schema = table_types(name, dtype_profile)
+    usecols, dtype = raw_projection(
+        csv_header(path),
+        list(schema.columns) + cfg["passthrough_cols"],
+        dtypes,
+        cfg["date_cols"],
+        cfg["renames"],
+    )
+    return {"usecols": usecols, "dtype": dtype}
+
+
+def read_raw_csv(path, table, dtype_profile="default"):
+    with stage("load_raw_data", table) as metrics:
+        df = read_csv(path, **raw_read_options(table, path, dtype_profile))
+        metrics["rows"] = len(df)
+        metrics["bytes_read"] = file_size(path)
+    return df
+
+
+def load_raw_data(dtype_profile="default"):
+    operations = read_raw_csv("pipeline/data/operations.csv", "operations", dtype_profile)
+    flotteurs = read_raw_csv("pipeline/data/flotteurs.csv", "flotteurs", dtype_profile)
+    resultats = read_raw_csv("pipeline/data/resultats_humain.csv", "resultats_humain", dtype_profile)
     return operations, flotteurs, resultats
 
 
+def to_text(series):
+    # Les colonnes déjà catégorielles (profil compact) restent catégorielles
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype('string')
+
+
 # ============================
 # 2. Nettoyage OPERATIONS
 # ============================
 
 def clean_operations(df):
 
-    # Convertir les dates avec gestion des dates aberrantes
-    df['date_heure_reception_alerte'] = pd.to_datetime(
-        df['date_heure_reception_alerte'], errors='coerce'
-    )
+    # Noms du schéma et de la table SQL (cross → cross_type)
+    df = df.rename(columns=operations_renames)
 
-    df['date_heure_fin_operation'] = pd.to_datetime(
-        df['date_heure_fin_operation'], errors='coerce'
-    )
+    # Dates : une seule analyse par valeur distincte, heures locales
+    # converties en UTC selon fuseau_horaire, dates aberrantes → NaT
+    df, unparseable = normalize_dates(df, operations_date_cols)
+    for col, count in unparseable.items():
+        add_count(f"dates_non_reconnues:{col}", count)
+        if count:
+            logging.warning(f"⚠️ {col} : {count} valeur(s) non reconnue(s) remplacée(s) par NaT")
 
     # Colonnes numériques
     numeric_cols = [
@@ -55,7 +122,7 @@ def clean_operations(df):
     # Colonnes texte
     text_cols = [
         'type_operation', 'pourquoi_alerte', 'moyen_alerte', 'qui_alerte',
-        'categorie_qui_alerte', 'cross', 'departement', 'evenement',
+        'categorie_qui_alerte', 'cross_type', 'departement', 'evenement',
         'categorie_evenement', 'autorite', 'seconde_autorite',
         'zone_responsabilite', 'vent_direction_categorie',
         'cross_sitrep', 'fuseau_horaire', 'systeme_source'
@@ -63,7 +130,7 @@ def clean_operations(df):
 
     for col in text_cols:
         if col in df.columns:
-            df[col] = df[col].astype('string')
+            df[col] = to_text(df[col])
 
     return df
 
@@ -75,8 +142,9 @@ def clean_operations(df):
 
 def clean_flotteurs(df):
 
-    # Supprimer les doublons
-    df = df.drop_duplicates()
+    # Supprimer les doublons (copie superficielle : le résultat peut être
+    # une sélection, ses colonnes sont remplacées ci-dessous)
+    df = df.drop_duplicates().copy(deep=False)
 
     # Convertir numero_ordre en numérique
     if 'numero_ordre' in df.columns:
@@ -90,7 +158,7 @@ def clean_flotteurs(df):
 
     for col in text_cols:
         if col in df.columns:
-            df[col] = df[col].astype('string')
+            df[col] = to_text(df[col])
 
     return df
 
@@ -100,10 +168,11 @@ def clean_flotteurs(df):
 # ============================
 
 def clean_resultats(df):
+    df = df.copy(deep=False)
 
     # Harmoniser les types texte
     if 'resultat_flotteur' in df.columns:
-        df['resultat_flotteur'] = df['resultat_flotteur'].astype('string')
+        df['resultat_flotteur'] = to_text(df['resultat_flotteur'])
 
     return df
 
@@ -126,21 +195,106 @@ def save_clean_data(ops, flot, res):
 # 6. Validation des dataframes
 # ============================
 
+VALIDATION_MODES = ("pandera", "fast")
+
+# fail : une ligne invalide fait échouer la table ;
+# quarantine : les lignes invalides sont écartées (voir utils/quarantine.py)
+ON_INVALID = ("fail", "quarantine")
+
+# Schémas Pandera compilés pour la validation rapide (une fois par processus)
+_compiled_schemas = {}
+
+
+def _cap_failure_cases(failure_cases, max_failure_cases):
+    if max_failure_cases is not None and isinstance(failure_cases, pd.DataFrame):
+        if len(failure_cases) > max_failure_cases:
+            logging.error(
+                f"➡️ {len(failure_cases)} cas d'échec, affichage limité à {max_failure_cases}"
+            )
+        return failure_cases.head(max_failure_cases)
+    return failure_cases
+
+
+def quarantine_rows(split, quarantine, schema_name):
+    # Lignes valides conservées, lignes fautives envoyées en quarantaine
+    valid, rejected = split
+    quarantine.add(schema_name, rejected)
+    logging.warning(
+        f"🚧 {schema_name} : {len(rejected)} ligne(s) invalide(s) mise(s) en quarantaine"
+    )
+    return valid
+
+
+def fast_validate_df(
+    df: pd.DataFrame,
+    schema,
+    schema_name: str,
+    sample=None,
+    max_failure_cases=DEFAULT_MAX_FAILURE_CASES,
+    quarantine=None,
+) -> pd.DataFrame:
+    rules = _compiled_schemas.get(id(schema))
+    if rules is None:
+        rules = _compiled_schemas[id(schema)] = compile_schema(schema)
+
+    total, failure_cases = fast_validate(
+        df, rules, sample=sample, max_failure_cases=max_failure_cases
+    )
+    if total == 0:
+        return df
+
+    if quarantine is not None:
+        # Mêmes lignes contrôlées que fast_validate (échantillon compris)
+        checked = df.sample(n=sample, random_state=0) if sample is not None and sample < len(df) else df
+        reasons, column_errors = failing_rows(checked, rules)
+        if not column_errors:
+            return quarantine_rows(split_rows(df, reasons), quarantine, schema_name)
+
+    logging.error(f"❌ Validation échouée pour le schéma : {schema_name}")
+    logging.error(f"➡️ {total} échec(s) détecté(s) par la validation rapide :")
+    logging.error(failure_cases)
+
+    raise RuntimeError(
+        f"Validation rapide échouée pour le schéma '{schema_name}'"
+    )
+
+
 def validate_df(
     df: pd.DataFrame,
     schema,
-    schema_name: str
+    schema_name: str,
+    mode="pandera",
+    sample=None,
+    max_failure_cases=DEFAULT_MAX_FAILURE_CASES,
+    quarantine=None,
 ) -> pd.DataFrame:
+    # mode "fast" : règles NumPy compilées depuis le schéma Pandera ;
+    # mode "pandera" : validation de référence.
+    # quarantine : les lignes invalides sont écartées au lieu de tout faire échouer
+    if mode == "fast":
+        return fast_validate_df(
+            df, schema, schema_name,
+            sample=sample, max_failure_cases=max_failure_cases, quarantine=quarantine,
+        )
+
     try:
+        # Échantillon plus grand que le bloc : tout est validé
+        if sample is not None and sample < len(df):
+            return schema.validate(df, lazy=True, sample=sample, random_state=0)
         return schema.validate(df, lazy=True)
 
     except SchemaErrors as e:
+        if quarantine is not None and hasattr(e, "failure_cases"):
+            split = split_failure_cases(df, e.failure_cases)
+            if split is not None:
+                return quarantine_rows(split, quarantine, schema_name)
+
         logging.error(f"❌ Validation échouée pour le schéma : {schema_name}")
         logging.error("➡️ Détails des erreurs Pandera :")
 
         # Pandera may expose different attributes depending on version
         if hasattr(e, "failure_cases"):
-            logging.error(e.failure_cases)
+            logging.error(_cap_failure_cases(e.failure_cases, max_failure_cases))
         elif hasattr(e, "schema_errors"):
             logging.error(e.schema_errors)
         else:
@@ -152,91 +306,1075 @@ def validate_df(
 
 
 # ============================
-# Pipeline principal
+# 7. Tables du pipeline
 # ============================
 
-if __name__ == "__main__":
-    # Extraction des données
-    ops, flot, res = load_raw_data()
-
-    # Nettoyage
-    ops = clean_operations(ops)
-    flot = clean_flotteurs(flot)
-    res = clean_resultats(res)
-    save_clean_data(ops, flot, res)
-
-    # Ré-hydrater les données (car repasser par un CSV nous fait perdre certains types de données)
-    date_cols_ops = [
-        "date_heure_reception_alerte",
-        "date_heure_fin_operation"
-    ]
+TABLES = {
+    "operations": {
+        "file": "operations.csv",
+        "clean": clean_operations,
+        "dtypes": operations_dtypes,
+        "compact_dtypes": compact_operations_dtypes,
+        "date_cols": operations_date_cols,
+        "renames": operations_renames,
+        "passthrough_cols": operations_passthrough_cols,
+        "schema": OperationsSchema,
+        "compact_schema": CompactOperationsSchema,
+        "table": "operation",
+        "conflict_cols": ["operation_id"],
+        "conflict_constraint": None,
+        "key_cols": ["operation_id"],
+        "watermark_col": "date_heure_reception_alerte",
+        "dedupe": False,
+        "dedupe_keys": None,
+        "depends_on": [],
+    },
+    "flotteurs": {
+        "file": "flotteurs.csv",
+        "clean": clean_flotteurs,
+        "dtypes": flotteurs_dtypes,
+        "compact_dtypes": compact_flotteurs_dtypes,
+        "date_cols": [],
+        "renames": {},
+        "passthrough_cols": [],
+        "schema": FlotteursSchema,
+        "compact_schema": CompactFlotteursSchema,
+        "table": "flotteurs",
+        "conflict_cols": ["operation_id", "numero_ordre"],
+        "conflict_constraint": None,
+        "key_cols": ["operation_id", "numero_ordre"],
+        "watermark_col": "operation_id",
+        "dedupe": True,
+        # même clé que la contrainte flotteurs_unique
+        "dedupe_keys": ["operation_id", "numero_ordre"],
+        # FK vers operation : chargement après le commit des opérations
+        "depends_on": ["operations"],
+    },
+    "resultats_humain": {
+        "file": "resultats_humain.csv",
+        "clean": clean_resultats,
+        "dtypes": resultats_humain_dtypes,
+        "compact_dtypes": compact_resultats_humain_dtypes,
+        "date_cols": [],
+        "renames": {},
+        "passthrough_cols": [],
+        "schema": ResultatsHumainSchema,
+        "compact_schema": CompactResultatsHumainSchema,
+        "table": "resultats_humain",
+        "conflict_cols": None,
+        "conflict_constraint": "resultats_humain_unique",
+        "key_cols": ["operation_id", "categorie_personne"],
+        "watermark_col": "operation_id",
+        "dedupe": False,
+        # même clé que la contrainte resultats_humain_unique
+        "dedupe_keys": ["operation_id", "categorie_personne"],
+        "depends_on": ["operations"],
+    },
+}
 
-    ops_clean = pd.read_csv(
-        "pipeline/data/operations_clean.csv",
-        dtype=operations_dtypes,
-        parse_dates=date_cols_ops,
-        date_parser=lambda col: pd.to_datetime(col, utc=True)
-    )
 
-    # reconvertir les dates AVANT validation
-    ops_clean["date_heure_reception_alerte"] = pd.to_datetime(ops_clean["date_heure_reception_alerte"], errors="coerce")
-    ops_clean["date_heure_fin_operation"] = pd.to_datetime(ops_clean["date_heure_fin_operation"], errors="coerce")
+def table_types(name, dtype_profile="default"):
+    # (dtypes, schéma Pandera) de la table pour le profil demandé
+    cfg = TABLES[name]
+    if dtype_profile == "compact":
+        return cfg["compact_dtypes"], cfg["compact_schema"]
+    return cfg["dtypes"], cfg["schema"]
+
+
+def load_options(name, load_method="insert", on_conflict="nothing"):
+    # Arguments de insert_dataframe pour la table (cible des conflits, méthode)
+    cfg = TABLES[name]
+    return {
+        "conflict_cols": cfg["conflict_cols"],
+        "conflict_constraint": cfg["conflict_constraint"],
+        "method": load_method,
+        "on_conflict": on_conflict,
+        "key_cols": cfg["key_cols"],
+    }
+
+
+# Compteur des lignes envoyées, par table de destination
+LOADED_COUNTER = "chargees:"
+
+
+def load_rows(df, table_name, engine, **kwargs):
+    # insert_dataframe, puis comptage des lignes effectivement envoyées
+    insert_dataframe(df, table_name, engine, **kwargs)
+    add_count(f"{LOADED_COUNTER}{table_name}", len(df))
+
 
-    ops_clean["date_heure_reception_alerte"] = pd.to_datetime(
-        ops_clean["date_heure_reception_alerte"],
-        errors="coerce",
-        utc=True
+def loaded_tables():
+    # Tables de destination ayant reçu des lignes pendant l'exécution courante
+    return {
+        name[len(LOADED_COUNTER):]
+        for name, count in current_run().counters.items()
+        if name.startswith(LOADED_COUNTER) and count > 0
+    }
+
+
+def print_memory_report(frames):
+    print("📦 Empreinte mémoire par table :")
+    print(memory_report(frames).to_string(index=False))
+
+
+def timed(stage_name, table, fn, df, *args, **kwargs):
+    # fn(df, ...) mesurée dans le rapport d'exécution (lignes = lignes reçues)
+    with stage(stage_name, table) as metrics:
+        metrics["rows"] = len(df)
+        return fn(df, *args, **kwargs)
+
+
+# ============================
+# 8. Ingestion incrémentale
+# ============================
+
+def select_changed_rows(name, df):
+    # Filtre les lignes BRUTES : les lignes inchangées ne sont ni nettoyées,
+    # ni validées, ni renvoyées au serveur
+    cfg = TABLES[name]
+    state = load_state(name)
+    df, pending = filter_changed(df, state, cfg["key_cols"], cfg["watermark_col"])
+    return df, (state, pending)
+
+
+def commit_changed_rows(name, state, pending, dropped=()):
+    # Appelé uniquement après un chargement réussi. dropped : étiquettes des
+    # lignes écartées sans trace (ni chargées, ni en quarantaine), à retraiter
+    pending = forget_rows(pending, dropped)
+    committed = commit_state(name, state, pending)
+    print(
+        f"↻ {name} : {pending['new']} nouvelles lignes, {pending['modified']} modifiées "
+        f"(watermark {state['watermark']} → {committed['watermark']})"
     )
 
-    ops_clean["date_heure_fin_operation"] = pd.to_datetime(
-        ops_clean["date_heure_fin_operation"],
-        errors="coerce",
-        utc=True
+
+def silently_dropped(before, after, validation=None):
+    # Lignes de `before` absentes de `after` : écartées sans être conservées
+    # si aucune quarantaine ne les recueille
+    if (validation or {}).get("quarantine") is not None:
+        return before.index[:0]
+    return before.index.difference(after.index)
+
+
+def iter_changed_chunks(chunks, name, state, pendings):
+    cfg = TABLES[name]
+    for chunk in chunks:
+        chunk, pending = filter_changed(chunk, state, cfg["key_cols"], cfg["watermark_col"])
+        pendings.append(pending)
+        yield chunk
+
+
+# ============================
+# 9. Mode streaming (par blocs)
+# ============================
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def iter_raw_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, dtype=None, table=None, usecols=None):
+    # Lecture paresseuse : un seul bloc du fichier en mémoire à la fois
+    # (parseur C : le moteur pyarrow ne lit pas par blocs)
+    with pd.read_csv(path, chunksize=chunk_size, dtype=dtype, usecols=usecols) as reader:
+        while True:
+            with stage("load_raw_data", table) as metrics:
+                chunk = next(reader, None)
+                if chunk is None:
+                    # fin de fichier : le fichier entier a été lu
+                    metrics["bytes_read"] = file_size(path)
+                else:
+                    metrics["rows"] = len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+
+def iter_clean_chunks(chunks, clean_fn, dtypes, date_cols=(), table=None):
+    for chunk in chunks:
+        chunk = timed(clean_fn.__name__, table, clean_fn, chunk)
+        yield timed("apply_dtypes", table, apply_dtypes, chunk, dtypes, date_cols)
+
+
+def iter_dedup_chunks(chunks, name, dedup):
+    # Le dédoublonneur garde les empreintes des clés déjà émises :
+    # les doublons entre blocs sont écartés aussi
+    for chunk in chunks:
+        yield dedupe_table(name, chunk, dedup)
+
+
+def iter_fk_chunks(chunks, name, parents, validation=None, dropped=None):
+    # dropped : liste complétée des orphelins écartés sans quarantaine
+    for chunk in chunks:
+        kept = drop_orphans(name, chunk, parents, validation)
+        if dropped is not None:
+            dropped.extend(silently_dropped(chunk, kept, validation))
+        yield kept
+
+
+def iter_valid_chunks(chunks, schema, schema_name, validation=None):
+    for chunk in chunks:
+        yield timed(
+            "validate_df", schema_name, validate_df, chunk,
+            schema=schema, schema_name=schema_name, **(validation or {}),
+        )
+
+
+def load_chunks(chunks, table_name, engine, **insert_kwargs):
+    total = 0
+    for chunk in chunks:
+        timed("insert_dataframe", table_name, load_rows, chunk, table_name, engine, **insert_kwargs)
+        total += len(chunk)
+    return total
+
+
+def run_streaming(
+    engine,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    data_dir="pipeline/data",
+    load_method="insert",
+    incremental=False,
+    validation=None,
+    dtype_profile="default",
+    on_conflict="nothing",
+    dedupe_db=False,
+    fk_check=False,
+):
+    # Chaque table traverse lecture → nettoyage → validation → chargement
+    # bloc par bloc : la mémoire dépend de chunk_size, pas de la taille du fichier.
+    # L'ordre des tables respecte les clés étrangères (operation d'abord).
+    parents = {}
+    for name, cfg in TABLES.items():
+        dtypes, schema = table_types(name, dtype_profile)
+        path = os.path.join(data_dir, cfg["file"])
+        dropped = [] if incremental else None
+        chunks = iter_raw_chunks(path, chunk_size, table=name, **raw_read_options(name, path, dtype_profile))
+        if incremental:
+            state, pendings = load_state(name), []
+            chunks = iter_changed_chunks(chunks, name, state, pendings)
+        chunks = iter_clean_chunks(chunks, cfg["clean"], dtypes, cfg["date_cols"], table=name)
+        dedup = table_deduplicator(name, engine, dedupe_db, on_conflict)
+        if dedup:
+            chunks = iter_dedup_chunks(chunks, name, dedup)
+        chunks = iter_valid_chunks(chunks, schema, name, validation)
+        if fk_check:
+            # Tables parentes déjà chargées : leurs clés sont toutes en base
+            for parent in cfg["depends_on"]:
+                if parent not in parents:
+                    parents[parent] = make_parent_keys(parent, engine)
+            chunks = iter_fk_chunks(chunks, name, parents, validation, dropped)
+
+        total = load_chunks(chunks, cfg["table"], engine, **load_options(name, load_method, on_conflict))
+        print(f"✔ {name} : {total} lignes traitées en streaming")
+        report_dedup(name, dedup)
+
+        if incremental:
+            commit_changed_rows(name, state, merge_pending(pendings), dropped=dropped)
+
+
+# ============================
+# 10. Mode parallèle (ordonnanceur d'étapes)
+# ============================
+
+DEFAULT_WORKERS = 4
+
+
+def prepare_table(
+    name,
+    data_dir="pipeline/data",
+    incremental=False,
+    validation=None,
+    dtype_profile="default",
+    checkpoint=None,
+    clean_workers=1,
+    engine=None,
+    dedupe_db=False,
+    on_conflict="nothing",
+):
+    # checkpoint : (CheckpointStore, clés des étapes) pour reprendre un
+    # chargement interrompu sans refaire les étapes déjà réussies
+    cfg = TABLES[name]
+    dtypes, schema = table_types(name, dtype_profile)
+    store, keys = checkpoint or (None, None)
+
+    if store:
+        if store.has(name, "loaded", keys["loaded"]):
+            return None, None
+        df = store.load(name, "validated", keys["validated"])
+        if df is not None:
+            print(f"⏩ {name} : reprise après validation")
+            return df, None
+
+    changes = None
+    df = store.load(name, "clean", keys["clean"]) if store else None
+    if df is not None:
+        print(f"⏩ {name} : reprise après nettoyage")
+    else:
+        if clean_workers > 1:
+            df = clean_partitioned(name, clean_workers, data_dir, dtype_profile)
+        else:
+            df = read_raw_csv(os.path.join(data_dir, cfg["file"]), name, dtype_profile)
+
+            if incremental:
+                df, changes = select_changed_rows(name, df)
+
+            df = timed(cfg["clean"].__name__, name, cfg["clean"], df)
+            df = timed("apply_dtypes", name, apply_dtypes, df, dtypes, cfg["date_cols"])
+
+        dedup = table_deduplicator(name, engine, dedupe_db, on_conflict)
+        df = dedupe_table(name, df, dedup)
+        report_dedup(name, dedup)
+        if store:
+            store.save(name, "clean", keys["clean"], df)
+
+    df = timed("validate_df", name, validate_df, df, schema=schema, schema_name=name, **(validation or {}))
+    if store:
+        store.save(name, "validated", keys["validated"], df)
+    return df, changes
+
+
+def load_table(
+    name,
+    prepared,
+    engine,
+    load_method="insert",
+    checkpoint=None,
+    on_conflict="nothing",
+    parents=None,
+    validation=None,
+):
+    # parents : {table parente: ParentKeys} pour écarter les orphelins (--fk-check)
+    cfg = TABLES[name]
+    df, changes = prepared
+    if df is None:
+        print(f"⏭ {name} : déjà chargée, entrées inchangées")
+        return 0
+
+    dropped = ()
+    if parents:
+        kept = drop_orphans(name, df, parents, validation)
+        dropped, df = silently_dropped(df, kept, validation), kept
+
+    timed(
+        "insert_dataframe",
+        name,
+        load_rows,
+        df,
+        cfg["table"],
+        engine,
+        **load_options(name, load_method, on_conflict),
     )
+    print(f"✔ {name} : {len(df)} lignes chargées")
+
+    if changes is not None:
+        commit_changed_rows(name, *changes, dropped=dropped)
+    if checkpoint:
+        store, keys = checkpoint
+        store.save(name, "loaded", keys["loaded"])
+    return len(df)
+
 
-    # Check intégrité Pandera avec nom de schéma
-    schema_mapping = {
-        "operations": (ops_clean, OperationsSchema, "operation"),
-        "flotteurs": (
-            pd.read_csv(
-                "pipeline/data/flotteurs_clean.csv",
-                dtype=flotteurs_dtypes
+def run_parallel(
+    engine,
+    data_dir="pipeline/data",
+    load_method="insert",
+    max_workers=DEFAULT_WORKERS,
+    incremental=False,
+    validation=None,
+    dtype_profile="default",
+    checkpoints=None,
+    clean_workers=1,
+    on_conflict="nothing",
+    dedupe_db=False,
+    fk_check=False,
+):
+    # Nettoyage + validation des trois tables en parallèle ; chaque chargement
+    # démarre dès que sa table est prête ET que les tables parentes (FK) sont
+    # commitées : flotteurs et resultats_humain se chargent ensemble après operation.
+    stages = {}
+    for name, cfg in TABLES.items():
+        checkpoint = None
+        if checkpoints is not None:
+            checkpoint = (
+                checkpoints,
+                checkpoint_keys(
+                    checkpoints, name, data_dir, dtype_profile, validation, engine, on_conflict, dedupe_db
+                ),
+            )
+        stages[f"prepare:{name}"] = (
+            lambda name=name, checkpoint=checkpoint: prepare_table(
+                name, data_dir, incremental, validation, dtype_profile, checkpoint, clean_workers,
+                engine, dedupe_db, on_conflict,
             ),
-            FlotteursSchema,
-            "flotteurs"
-        ),
-        "resultats_humain": (
-            pd.read_csv(
-                "pipeline/data/resultats_humain_clean.csv",
-                dtype=resultats_humain_dtypes
+            [],
+        )
+        fk_parents = cfg["depends_on"] if fk_check else []
+        stages[f"load:{name}"] = (
+            lambda prepared, *deps, name=name, checkpoint=checkpoint, fk_parents=fk_parents: load_table(
+                name, prepared, engine, load_method, checkpoint, on_conflict,
+                # résultats des étapes parents:* (après les load:* des parents)
+                dict(zip(fk_parents, deps[len(deps) - len(fk_parents):])), validation,
             ),
-            ResultatsHumainSchema,
-            "resultats_humain"
+            [f"prepare:{name}"]
+            + [f"load:{parent}" for parent in cfg["depends_on"]]
+            + [f"parents:{parent}" for parent in fk_parents],
+        )
+
+    if fk_check:
+        # Clés parentes : lecture en masse en base + table en cours de chargement
+        for parent in {parent for cfg in TABLES.values() for parent in cfg["depends_on"]}:
+            stages[f"parents:{parent}"] = (
+                lambda prepared, parent=parent: make_parent_keys(parent, engine, prepared[0]),
+                [f"prepare:{parent}"],
+            )
+
+    results = run_stages(stages, max_workers=max_workers)
+    frames = {name: results[f"prepare:{name}"][0] for name in TABLES}
+    print_memory_report({name: df for name, df in frames.items() if df is not None})
+    return {name: results[f"load:{name}"] for name in TABLES}
+
+
+# ============================
+# 11. Reprise sur points de reprise
+# ============================
+
+def schema_version(schema):
+    # Ce qui change le résultat d'une validation : types, nullabilité, checks
+    return [
+        (
+            name,
+            str(column.dtype),
+            column.nullable,
+            column.required,
+            [(check.name, check.statistics) for check in column.checks],
+        )
+        for name, column in schema.columns.items()
+    ]
+
+
+def checkpoint_keys(
+    store,
+    name,
+    data_dir="pipeline/data",
+    dtype_profile="default",
+    validation=None,
+    engine=None,
+    on_conflict="nothing",
+    dedupe_db=False,
+):
+    cfg = TABLES[name]
+    dtypes, schema = table_types(name, dtype_profile)
+    path = os.path.join(data_dir, cfg["file"])
+    versions = [
+        ("clean", (
+            inspect.getsource(cfg["clean"]),
+            inspect.getsource(to_text),
+            inspect.getsource(normalize_dates),
+            inspect.getsource(apply_dtypes),
+            dtypes,
+            list(cfg["date_cols"]),
+            inspect.getsource(raw_projection),
+            raw_read_options(name, path, dtype_profile),
+            # dédoublonnage : sa sortie dépend aussi des clés en base (--dedupe-db)
+            inspect.getsource(key_hashes),
+            cfg["dedupe_keys"] if on_conflict != "update" else None,
+            dedupe_db,
+        )),
+        ("validated", (schema_version(schema), validation)),
+        # str(url) masque le mot de passe
+        ("loaded", (
+            str(getattr(engine, "url", "")),
+            cfg["table"],
+            cfg["conflict_cols"],
+            cfg["conflict_constraint"],
+            on_conflict,
+        )),
+    ]
+    return store.stage_keys(path, versions)
+
+
+def run_resume(
+    engine,
+    data_dir="pipeline/data",
+    load_method="insert",
+    validation=None,
+    dtype_profile="default",
+    checkpoints=None,
+    clean_workers=1,
+    on_conflict="nothing",
+    dedupe_db=False,
+    fk_check=False,
+):
+    # Tables traitées une à une dans l'ordre des FK ; chacune repart de la
+    # première étape dont les entrées (fichier, code, schéma, cible) ont changé
+    store = checkpoints or CheckpointStore()
+    counts, parents = {}, {}
+    parent_tables = {parent for cfg in TABLES.values() for parent in cfg["depends_on"]}
+    for name in TABLES:
+        checkpoint = (
+            store,
+            checkpoint_keys(store, name, data_dir, dtype_profile, validation, engine, on_conflict, dedupe_db),
+        )
+        prepared = prepare_table(
+            name,
+            data_dir,
+            validation=validation,
+            dtype_profile=dtype_profile,
+            checkpoint=checkpoint,
+            clean_workers=clean_workers,
+            engine=engine,
+            dedupe_db=dedupe_db,
+            on_conflict=on_conflict,
         )
+        if fk_check and name in parent_tables:
+            # Avant le chargement de la table parente : lecture en masse + lignes préparées
+            parents[name] = make_parent_keys(name, engine, prepared[0])
+        counts[name] = load_table(
+            name, prepared, engine, load_method, checkpoint, on_conflict,
+            {parent: parents[parent] for parent in TABLES[name]["depends_on"] if parent in parents},
+            validation,
+        )
+    return counts
+
+
+# ============================
+# 12. Nettoyage parallèle (processus)
+# ============================
+
+# Pas de fork() depuis un processus multi-thread (mode --parallel) :
+# les processus du pool partent d'un serveur dédié
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Un pool par nombre de processus, réutilisé pour toutes les tables
+# (les processus importent pandas une seule fois)
+_clean_pools = {}
+_clean_pools_lock = threading.Lock()
+
+
+def get_clean_pool(workers):
+    with _clean_pools_lock:
+        if workers not in _clean_pools:
+            _clean_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(POOL_START_METHOD),
+            )
+        return _clean_pools[workers]
+
+def clean_partition(name, path, start, end, dtype_profile="default"):
+    # Exécuté dans un processus du pool : lecture, nettoyage et typage
+    # d'une partition du CSV ; retourne aussi le nombre de lignes brutes lues
+    # et les compteurs ajoutés pendant la tâche (l'enregistreur du processus
+    # fils n'est pas celui du rapport)
+    cfg = TABLES[name]
+    dtypes, _ = table_types(name, dtype_profile)
+    with isolated_run() as recorder:
+        raw = read_partition(path, start, end, **raw_read_options(name, path, dtype_profile))
+        df = apply_dtypes(cfg["clean"](raw), dtypes, cfg["date_cols"])
+    return df, len(raw), recorder.counters
+
+
+def clean_partitioned(name, workers, data_dir="pipeline/data", dtype_profile="default"):
+    cfg = TABLES[name]
+    path = os.path.join(data_dir, cfg["file"])
+    partitions = byte_partitions(path, partition_count(path, workers))
+    if not partitions:
+        # Fichier sans données : rien à répartir
+        df = cfg["clean"](read_raw_csv(path, name, dtype_profile))
+        return apply_dtypes(df, table_types(name, dtype_profile)[0], cfg["date_cols"])
+
+    with stage("clean_partitioned", name) as metrics:
+        starts, ends = zip(*partitions)
+        # map conserve l'ordre des partitions
+        results = list(get_clean_pool(workers).map(
+            clean_partition, repeat(name), repeat(path), starts, ends, repeat(dtype_profile)
+        ))
+
+        frames, offset = [], 0
+        for df, raw_rows, counts in results:
+            # Index global : mêmes étiquettes qu'une lecture du fichier entier
+            df.index = df.index + offset
+            frames.append(df)
+            offset += raw_rows
+            for counter, count in counts.items():
+                add_count(counter, count)
+        df = concat_partitions(frames)
+
+        if cfg["dedupe"]:
+            # Chaque partition est déjà dédoublonnée ; restent les doublons
+            # entre partitions (première occurrence conservée, ordre du fichier)
+            df = df.drop_duplicates()
+
+        metrics["rows"] = offset
+        metrics["bytes_read"] = file_size(path)
+
+    print(f"⚙️ {name} : {offset} lignes nettoyées en {len(partitions)} partitions ({workers} processus)")
+    return df
+
+
+# ============================
+# 13. Quarantaine des lignes invalides
+# ============================
+
+def make_quarantine(engine=None, root=None):
+    return Quarantine(root, engine, key_cols={name: cfg["key_cols"] for name, cfg in TABLES.items()})
+
+
+def run_reinject(
+    engine,
+    load_method="insert",
+    validation=None,
+    dtype_profile="default",
+    on_conflict="nothing",
+    fk_check=False,
+):
+    # Lignes corrigées dans les fichiers de quarantaine : retypées, revalidées
+    # (celles toujours invalides y retournent) puis chargées, dans l'ordre des FK
+    validation = dict(validation or {})
+    quarantine = validation.get("quarantine") or make_quarantine(engine)
+    validation["quarantine"] = quarantine
+
+    counts = {}
+    for name, cfg in TABLES.items():
+        taken = quarantine.take(name)
+        if taken is None:
+            continue
+
+        dtypes, schema = table_types(name, dtype_profile)
+        df = timed("apply_dtypes", name, apply_dtypes, taken.copy(), dtypes, cfg["date_cols"])
+        df = timed("validate_df", name, validate_df, df, schema=schema, schema_name=name, **validation)
+        if fk_check:
+            # Parents réinjectés juste avant : déjà en base ; orphelins renvoyés en quarantaine
+            parents = {parent: make_parent_keys(parent, engine) for parent in cfg["depends_on"]}
+            df = drop_orphans(name, df, parents, validation)
+        timed(
+            "insert_dataframe",
+            name,
+            load_rows,
+            df,
+            cfg["table"],
+            engine,
+            **load_options(name, load_method, on_conflict),
+        )
+        quarantine.release(name, taken)
+
+        counts[name] = len(df)
+        print(f"↩ {name} : {len(df)} ligne(s) réinjectée(s), {len(taken) - len(df)} toujours en quarantaine")
+    return counts
+
+
+# ============================
+# 14. Dédoublonnage sur les clés métier
+# ============================
+
+def table_deduplicator(name, engine=None, dedupe_db=False, on_conflict="nothing"):
+    # None si la table n'a pas de clé à dédoublonner, ou en mode update :
+    # la dernière version d'une clé doit alors l'emporter (insert_dataframe)
+    cfg = TABLES[name]
+    if not cfg["dedupe_keys"] or on_conflict == "update":
+        return None
+
+    known = None
+    if dedupe_db:
+        with stage("fetch_known_keys", name) as metrics:
+            known = fetch_known_keys(engine, cfg["table"], cfg["dedupe_keys"])
+            metrics["rows"] = len(known)
+    return KeyDeduplicator(cfg["dedupe_keys"], known)
+
+
+def dedupe_table(name, df, dedup):
+    if dedup is None:
+        return df
+    return timed("dedupe", name, dedup.drop, df)
+
+
+def report_dedup(name, dedup):
+    if dedup is None:
+        return
+    add_count(f"doublons:{name}", dedup.duplicates)
+    add_count(f"deja_en_base:{name}", dedup.known_dropped)
+    print(f"🧹 {name} : {dedup.duplicates} doublon(s) de clé écarté(s), {dedup.known_dropped} déjà en base")
+
+
+# ============================
+# 15. Intégrité référentielle (--fk-check)
+# ============================
+
+def make_parent_keys(name, engine, frame=None):
+    # Clés de la table parente : celles déjà en base (une lecture en masse)
+    # et celles de `frame`, les lignes en cours de chargement
+    cfg = TABLES[name]
+    with stage("fetch_parent_keys", name) as metrics:
+        parents = ParentKeys(cfg["key_cols"], fetch_known_keys(engine, cfg["table"], cfg["key_cols"]))
+        parents.add(frame)
+        metrics["rows"] = len(parents)
+    return parents
+
+
+def drop_orphans(name, df, parents, validation=None):
+    # Lignes dont la clé parente n'existe ni en base ni dans le chargement :
+    # écartées avant l'envoi (en quarantaine si --on-invalid quarantine)
+    quarantine = (validation or {}).get("quarantine")
+    for parent in TABLES[name]["depends_on"]:
+        if parent not in parents:
+            continue
+        df, orphans = timed("fk_check", name, parents[parent].split_orphans, df)
+        if orphans.empty:
+            continue
+
+        add_count(f"orphelins:{name}", len(orphans))
+        key_cols = parents[parent].key_cols
+        sample = ", ".join(row_keys(orphans, key_cols).unique()[:5])
+        print(f"🔗 {name} : {len(orphans)} ligne(s) orpheline(s) écartée(s), absentes de {parent} ({sample}…)")
+        if quarantine is not None:
+            quarantine.add(name, orphans.assign(**{REASON_COL: f"{'|'.join(key_cols)}:foreign_key({parent})"}))
+    return df
+
+
+def check_foreign_keys(frames, engine, validation=None):
+    # Mode par défaut : toutes les tables sont prêtes, rien n'est encore envoyé
+    parents = {
+        parent: make_parent_keys(parent, engine, frames.get(parent))
+        for parent in {parent for cfg in TABLES.values() for parent in cfg["depends_on"]}
     }
+    return {name: drop_orphans(name, df, parents, validation) for name, df in frames.items()}
 
-    supa_engine = get_engine()
 
-    for name, (df, schema, table_name) in schema_mapping.items():
-        df_valid = validate_df(df, schema=schema, schema_name=name)
-    
+# ============================
+# Pipeline principal
+# ============================
+
+def run_batch(
+    supa_engine,
+    save_clean=False,
+    load_method="insert",
+    incremental=False,
+    validation=None,
+    dtype_profile="default",
+    clean_workers=1,
+    on_conflict="nothing",
+    dedupe_db=False,
+    fk_check=False,
+):
+    changes = {}
+    if clean_workers > 1:
+        # Lecture + nettoyage par partitions dans un pool de processus
+        frames = {
+            name: clean_partitioned(name, clean_workers, dtype_profile=dtype_profile)
+            for name in TABLES
+        }
+    else:
+        # Extraction des données
+        raw = dict(zip(TABLES, load_raw_data(dtype_profile)))
+
+        # Incrémental : seules les lignes nouvelles ou modifiées sont retraitées
+        if incremental:
+            for name in raw:
+                raw[name], changes[name] = select_changed_rows(name, raw[name])
+
+        # Nettoyage
+        frames = {
+            name: timed(TABLES[name]["clean"].__name__, name, TABLES[name]["clean"], df)
+            for name, df in raw.items()
+        }
+
+    # Export CSV facultatif (utilisé par les scripts de support_tools)
+    if save_clean:
+        with stage("save_clean_data") as metrics:
+            metrics["rows"] = sum(len(df) for df in frames.values())
+            save_clean_data(*frames.values())
+
+    # Typage en mémoire : plus d'aller-retour CSV pour retrouver les dtypes
+    for name, df in frames.items():
+        dtypes, _ = table_types(name, dtype_profile)
+        frames[name] = timed("apply_dtypes", name, apply_dtypes, df, dtypes, TABLES[name]["date_cols"])
+
+        dedup = table_deduplicator(name, supa_engine, dedupe_db, on_conflict)
+        frames[name] = dedupe_table(name, frames[name], dedup)
+        report_dedup(name, dedup)
+
+    print_memory_report(frames)
+
+    # Toutes les tables sont validées avant le premier envoi
+    valid = {}
+    for name, df in frames.items():
+        _, schema = table_types(name, dtype_profile)
+
+        # Check intégrité Pandera avec nom de schéma
+        valid[name] = timed(
+            "validate_df", name, validate_df, df,
+            schema=schema, schema_name=name, **(validation or {}),
+        )
+
+    if fk_check:
+        valid = check_foreign_keys(valid, supa_engine, validation)
+
+    for name, df_valid in valid.items():
+        cfg = TABLES[name]
+
         # Chargement en base de données
-        if table_name == 'operation':
-            conflict_cols = ['operation_id']
-            conflict_constraint = None
-        elif table_name == 'flotteurs':
-            conflict_cols = ['operation_id', 'numero_ordre']
-            conflict_constraint = None
-        elif table_name == 'resultats_humain':
-            conflict_cols = None
-            conflict_constraint = 'resultats_humain_unique'
-        else:
-            conflict_cols = None
-            conflict_constraint = None
-        insert_dataframe(
-            df,
-            table_name,
+        timed(
+            "insert_dataframe",
+            name,
+            load_rows,
+            df_valid,
+            cfg["table"],
             supa_engine,
-            conflict_cols=conflict_cols,
-            conflict_constraint=conflict_constraint
-        )
\ No newline at end of file
+            **load_options(name, load_method, on_conflict),
+        )
+
+        if incremental:
+            dropped = silently_dropped(frames[name], df_valid, validation)
+            commit_changed_rows(name, *changes[name], dropped=dropped)
+
+
+def notify_data_change(engine, tables):
+    # Caches de l'application : les tables chargées ont une nouvelle version
+    tables = [cfg["table"] for cfg in TABLES.values() if cfg["table"] in tables]
+    if not tables:
+        return
+    try:
+        with stage("data_version"):
+            bump_data_versions(engine, tables)
+    except SQLAlchemyError as e:
+        # Base sans data_version : les caches retombent sur leur TTL
+        logging.warning(f"⚠️ Versions de données non incrémentées : {e}")
+
+
+def run_pipeline(supa_engine, args, validation):
+    if args.schema_cache:
+        load_table_cache()
+
+    try:
+        if args.reinject:
+            run_reinject(
+                supa_engine,
+                load_method=args.load_method,
+                on_conflict=args.on_conflict,
+                validation=validation,
+                dtype_profile=args.dtype_profile,
+                fk_check=args.fk_check,
+            )
+        elif args.stream:
+            run_streaming(
+                supa_engine,
+                chunk_size=args.chunk_size,
+                load_method=args.load_method,
+                on_conflict=args.on_conflict,
+                dedupe_db=args.dedupe_db,
+                fk_check=args.fk_check,
+                incremental=args.incremental,
+                validation=validation,
+                dtype_profile=args.dtype_profile,
+            )
+        elif args.parallel:
+            run_parallel(
+                supa_engine,
+                load_method=args.load_method,
+                on_conflict=args.on_conflict,
+                dedupe_db=args.dedupe_db,
+                fk_check=args.fk_check,
+                max_workers=args.workers,
+                incremental=args.incremental,
+                validation=validation,
+                dtype_profile=args.dtype_profile,
+                checkpoints=CheckpointStore() if args.resume else None,
+                clean_workers=args.clean_workers,
+            )
+        elif args.resume:
+            run_resume(
+                supa_engine,
+                load_method=args.load_method,
+                on_conflict=args.on_conflict,
+                dedupe_db=args.dedupe_db,
+                fk_check=args.fk_check,
+                validation=validation,
+                dtype_profile=args.dtype_profile,
+                clean_workers=args.clean_workers,
+            )
+        else:
+            run_batch(
+                supa_engine,
+                save_clean=args.save_clean,
+                load_method=args.load_method,
+                on_conflict=args.on_conflict,
+                dedupe_db=args.dedupe_db,
+                fk_check=args.fk_check,
+                incremental=args.incremental,
+                validation=validation,
+                dtype_profile=args.dtype_profile,
+                clean_workers=args.clean_workers,
+            )
+
+        if args.schema_cache:
+            save_table_cache()
+    finally:
+        # Même en cas d'échec : les lignes déjà envoyées sont en base
+        notify_data_change(supa_engine, loaded_tables())
+
+    quarantine = validation.get("quarantine")
+    for name, count in (quarantine.counts.items() if quarantine else ()):
+        print(f"🚧 {name} : {count} ligne(s) en quarantaine ({quarantine.path(name)})")
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline ETL des opérations SECMAR")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="traiter chaque table par blocs (mémoire bornée par --chunk-size)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="nombre de lignes par bloc en mode streaming",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="préparer les tables en parallèle et charger selon les dépendances FK",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="nombre de threads en mode parallèle",
+    )
+    parser.add_argument(
+        "--clean-workers",
+        type=int,
+        default=1,
+        help="nettoyer chaque CSV par partitions dans N processus (1 = sans pool)",
+    )
+    parser.add_argument(
+        "--validation",
+        choices=VALIDATION_MODES,
+        default="pandera",
+        help="pandera : validation de référence ; fast : contrôles NumPy vectorisés",
+    )
+    parser.add_argument(
+        "--validation-sample",
+        type=int,
+        default=None,
+        help="ne valider qu'un échantillon aléatoire de N lignes (par table ou par bloc)",
+    )
+    parser.add_argument(
+        "--max-failure-cases",
+        type=int,
+        default=DEFAULT_MAX_FAILURE_CASES,
+        help="nombre maximal de cas d'échec affichés dans les logs",
+    )
+    parser.add_argument(
+        "--on-invalid",
+        choices=ON_INVALID,
+        default="fail",
+        help="quarantine : charger les lignes valides et écarter les autres (fichier + table quarantine)",
+    )
+    parser.add_argument(
+        "--reinject",
+        action="store_true",
+        help="revalider et charger les lignes corrigées dans pipeline/data/quarantine/",
+    )
+    parser.add_argument(
+        "--dtype-profile",
+        choices=DTYPE_PROFILES,
+        default="default",
+        help="compact : catégories, chaînes Arrow et petits entiers (empreinte mémoire réduite)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="ne retraiter que les lignes nouvelles ou modifiées depuis le dernier chargement",
+    )
+    parser.add_argument(
+        "--schema-cache",
+        action="store_true",
+        help="réutiliser les tables réfléchies sauvegardées sur disque (clé : empreinte de script_tables.sql)",
+    )
+    parser.add_argument(
+        "--save-clean",
+        action="store_true",
+        help="écrire aussi les CSV nettoyés dans pipeline/data/ (mode par défaut)",
+    )
+    parser.add_argument(
+        "--load-method",
+        choices=LOAD_METHODS,
+        default="insert",
+        help="insert : INSERT multi-VALUES par paquets ; copy : COPY en masse puis fusion ; "
+        "async : paquets INSERT en pipeline sur plusieurs connexions (DB_ASYNC_*)",
+    )
+    parser.add_argument(
+        "--on-conflict",
+        choices=CONFLICT_MODES,
+        default="nothing",
+        help="update : réécrire les lignes existantes dont le contenu a changé (empreinte row_hash)",
+    )
+    parser.add_argument(
+        "--dedupe-db",
+        action="store_true",
+        help="écarter aussi, avant envoi, les lignes dont la clé métier est déjà en base",
+    )
+    parser.add_argument(
+        "--fk-check",
+        action="store_true",
+        help="écarter avant envoi les lignes enfants dont l'operation_id n'existe ni en base ni dans le chargement",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reprendre depuis les points de reprise (pipeline/data/.checkpoints) au lieu de tout refaire",
+    )
+    parser.add_argument(
+        "--report-dir",
+        default=None,
+        help="dossier du rapport d'exécution JSON (défaut : pipeline/data/reports)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="capturer aussi un profil cProfile (.prof) à côté du rapport",
+    )
+    args = parser.parse_args(argv)
+
+    if args.stream and args.parallel:
+        parser.error("--stream et --parallel ne peuvent pas être combinés")
+    if args.resume and (args.stream or args.incremental or args.save_clean):
+        parser.error("--resume ne peut pas être combiné avec --stream, --incremental ou --save-clean")
+    if args.clean_workers > 1 and (args.stream or args.incremental):
+        parser.error("--clean-workers ne peut pas être combiné avec --stream ou --incremental")
+    if args.dedupe_db and args.on_conflict == "update":
+        parser.error("--dedupe-db ne peut pas être combiné avec --on-conflict update")
+    if args.reinject and (args.stream or args.parallel or args.resume or args.incremental):
+        parser.error("--reinject ne peut pas être combiné avec --stream, --parallel, --resume ou --incremental")
+
+    validation = {
+        "mode": args.validation,
+        "sample": args.validation_sample,
+        "max_failure_cases": args.max_failure_cases,
+    }
+
+    recorder = start_run(sys.argv[1:] if argv is None else argv)
+    profiler = cProfile.Profile() if args.profile else None
+
+    supa_engine = get_engine()
+    recorder.attach_engine(supa_engine)
+
+    if args.on_invalid == "quarantine" or args.reinject:
+        validation["quarantine"] = make_quarantine(supa_engine)
+
+    status = "failed"
+    if profiler:
+        profiler.enable()
+    try:
+        run_pipeline(supa_engine, args, validation)
+        status = "ok"
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(recorder.report_path(args.report_dir, suffix=".prof"))
+        print(f"📊 Rapport d'exécution : {recorder.write_report(args.report_dir, status=status)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# ============================
+# Validation vectorisée (chemin rapide)
+# ============================
+# Les schémas Pandera de schema_pandera.py restent la référence : ils sont
+# "compilés" une fois en règles par colonne (type, nullabilité, bornes),
+# évaluées ensuite avec des masques NumPy sur des colonnes entières.
+
+# Checks Pandera traduits en comparaisons vectorisées
+_BOUND_CHECKS = {
+    "greater_than": lambda v, s: v > s["min_value"],
+    "greater_than_or_equal_to": lambda v, s: v >= s["min_value"],
+    "less_than": lambda v, s: v < s["max_value"],
+    "less_than_or_equal_to": lambda v, s: v <= s["max_value"],
+    "equal_to": lambda v, s: v == s["value"],
+    "in_range": lambda v, s: (
+        (v >= s["min_value"] if s["include_min"] else v > s["min_value"])
+        & (v <= s["max_value"] if s["include_max"] else v < s["max_value"])
+    ),
+}
+
+FAILURE_CASE_COLUMNS = ["column", "check", "index", "failure_case"]
+
+DEFAULT_MAX_FAILURE_CASES = 100
+
+
+def compile_schema(schema):
+    rules = []
+    for name, column in schema.columns.items():
+        checks = []
+        for check in column.checks:
+            if check.name not in _BOUND_CHECKS:
+                raise ValueError(
+                    f"Check '{check.name}' de la colonne '{name}' non supporté "
+                    "par la validation rapide : utiliser le mode pandera"
+                )
+            checks.append((check.name, dict(check.statistics)))
+
+        rules.append({
+            "column": name,
+            "dtype": str(column.dtype),
+            "nullable": column.nullable,
+            "required": column.required,
+            "checks": checks,
+        })
+    return rules
+
+
+def _dtype_matches(series, expected):
+    actual = str(series.dtype)
+
+    if expected == "str":
+        # Même tolérance que Pandera : object (valeurs str), string, category
+        return actual in ("string", "category") or (
+            actual == "object"
+            and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+        )
+    if expected == "int64":
+        return actual in ("int64", "Int64")
+    return actual == expected
+
+
+def _failures(column, check, index, values):
+    return pd.DataFrame({
+        "column": column,
+        "check": check,
+        "index": index,
+        "failure_case": values,
+    }, columns=FAILURE_CASE_COLUMNS)
+
+
+def _row_failures(column, check, series, mask, limit):
+    # Seules les `limit` premières lignes fautives sont matérialisées
+    positions = np.flatnonzero(mask)[:limit]
+    return _failures(column, check, series.index[positions], series.iloc[positions].to_numpy())
+
+
+def _row_masks(series, rule):
+    # (check, masque des lignes fautives) d'une colonne au bon type
+    isna = series.isna().to_numpy()
+
+    if not rule["nullable"] and isna.any():
+        yield "not_nullable", isna
+
+    if not rule["checks"]:
+        return
+
+    # Les checks ignorent les valeurs manquantes (comme ignore_na de Pandera)
+    values = series.to_numpy(dtype="float64", na_value=np.nan) if series.dtype.kind in "iuf" \
+        else series.to_numpy()
+    for check_name, stats in rule["checks"]:
+        with np.errstate(invalid="ignore"):
+            passed = np.asarray(_BOUND_CHECKS[check_name](values, stats), dtype=bool)
+        failed = ~passed & ~isna
+        if failed.any():
+            yield check_name, failed
+
+
+def fast_validate(
+    df,
+    rules,
+    sample=None,
+    max_failure_cases=DEFAULT_MAX_FAILURE_CASES,
+    random_state=0,
+):
+    """
+    Retourne (nombre total d'échecs, cas d'échec limités à max_failure_cases).
+    sample : nombre de lignes tirées au hasard à contrôler (None = toutes).
+    """
+    if sample is not None and sample < len(df):
+        df = df.sample(n=sample, random_state=random_state)
+
+    total = 0
+    cases = []
+
+    for rule in rules:
+        name = rule["column"]
+
+        if name not in df.columns:
+            if rule["required"]:
+                total += 1
+                cases.append(_failures(name, "column_in_dataframe", [None], [name]))
+            continue
+
+        series = df[name]
+
+        if not _dtype_matches(series, rule["dtype"]):
+            total += 1
+            cases.append(_failures(name, f"dtype('{rule['dtype']}')", [None], [str(series.dtype)]))
+            continue
+
+        for check_name, failed in _row_masks(series, rule):
+            total += int(failed.sum())
+            cases.append(_row_failures(name, check_name, series, failed, max_failure_cases))
+
+    if not cases:
+        return 0, _failures([], [], [], [])
+
+    failure_cases = pd.concat(cases, ignore_index=True)
+    if max_failure_cases is not None:
+        failure_cases = failure_cases.head(max_failure_cases)
+    return total, failure_cases
+
+
+def failing_rows(df, rules):
+    """
+    Retourne (motif d'échec des lignes fautives, indexé comme df ;
+    erreurs de colonne - type, colonne absente - rattachées à aucune ligne).
+    """
+    motifs = np.full(len(df), "", dtype=object)
+    column_errors = []
+
+    for rule in rules:
+        name = rule["column"]
+
+        if name not in df.columns:
+            if rule["required"]:
+                column_errors.append(f"{name}:column_in_dataframe")
+            continue
+
+        series = df[name]
+
+        if not _dtype_matches(series, rule["dtype"]):
+            column_errors.append(f"{name}:dtype('{rule['dtype']}')")
+            continue
+
+        for check_name, failed in _row_masks(series, rule):
+            motifs[failed] = motifs[failed] + f"{name}:{check_name}; "
+
+    bad = motifs != ""
+    reasons = pd.Series(motifs[bad], index=df.index[bad], dtype=object).str.rstrip("; ")
+    return reasons, column_errors
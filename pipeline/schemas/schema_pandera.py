@@ -78,4 +78,25 @@ ResultatsHumainSchema = DataFrameSchema({
     "nombre": pa.Column(int, nullable=True),
     "dont_nombre_blesse": pa.Column(int, nullable=True),
 
-})
\ No newline at end of file
+})
+
+# ============================
+# 4. Schémas du profil compact
+# ============================
+# Mêmes colonnes et mêmes checks ; seuls les petits entiers changent
+# (les catégories et chaînes Arrow sont déjà acceptées par pa.String).
+
+CompactOperationsSchema = OperationsSchema.update_columns({
+    "vent_direction": {"dtype": "Int16"},
+    "vent_force": {"dtype": "Int8"},
+    "mer_force": {"dtype": "Int8"},
+})
+
+CompactFlotteursSchema = FlotteursSchema.update_columns({
+    "numero_ordre": {"dtype": "Int16"},
+})
+
+CompactResultatsHumainSchema = ResultatsHumainSchema.update_columns({
+    "nombre": {"dtype": "Int32"},
+    "dont_nombre_blesse": {"dtype": "Int32"},
+})
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+
+import psycopg
+from psycopg import sql
+
+from pipeline.utils.connection import configure_connection, connect_args, db_settings, psycopg_conninfo
+from pipeline.utils.instrumentation import add_round_trips
+
+# -----------------------------
+# Async load path (psycopg pipeline mode)
+# -----------------------------
+# Each connection queues a window of chunk INSERTs and waits for the server
+# ONCE per window (pipeline sync) instead of once per chunk: on a
+# high-latency link the load becomes bandwidth-bound. Several connections
+# send their windows concurrently.
+#
+# Statements keep insert_dataframe's ON CONFLICT clause, so replaying a
+# chunk is harmless: a failed window (one implicit transaction, rolled back
+# as a whole) is replayed chunk by chunk, each chunk with its own retry
+# budget for transient errors (lost connection, serialization failure,
+# deadlock). Other errors (constraint violations...) are raised at once.
+
+TRANSIENT_ERRORS = (psycopg.OperationalError,)
+
+RETRY_DELAY = 0.5
+
+
+def chunk_params(chunk):
+    # Flat parameter list of a multi-VALUES INSERT; NA -> NULL
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return [v for row in values.itertuples(index=False, name=None) for v in row]
+
+
+class _Statements:
+    # One INSERT text per chunk length: full chunks share it, so psycopg
+    # prepares it server-side after DB_PREPARE_THRESHOLD executions
+
+    def __init__(self, target, columns, conflict):
+        self.head = sql.SQL("INSERT INTO {} ({}) VALUES ").format(
+            target, sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+        )
+        self.row = sql.SQL("({})").format(sql.SQL(", ").join(sql.Placeholder() * len(columns)))
+        self.conflict = conflict
+        self._cache = {}
+
+    def __call__(self, n_rows):
+        if n_rows not in self._cache:
+            self._cache[n_rows] = self.head + sql.SQL(", ").join([self.row] * n_rows) + self.conflict
+        return self._cache[n_rows]
+
+
+class _PipelinedLoader:
+
+    def __init__(self, conninfo, connect_kwargs, configure=None, retries=3, retry_delay=RETRY_DELAY):
+        self.conninfo = conninfo
+        self.connect_kwargs = connect_kwargs
+        self.configure = configure
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.conn = None
+
+    async def _connection(self):
+        if self.conn is None or self.conn.closed:
+            # Autocommit: each pipeline sync closes an implicit transaction
+            self.conn = await psycopg.AsyncConnection.connect(
+                self.conninfo, autocommit=True, **self.connect_kwargs
+            )
+            if self.configure:
+                self.configure(self.conn)
+        return self.conn
+
+    async def send_window(self, window):
+        # window: list of (query, params), committed together at sync
+        try:
+            conn = await self._connection()
+            async with conn.pipeline() as pipeline:
+                async with conn.cursor() as cur:
+                    for query, params in window:
+                        await cur.execute(query, params)
+                await pipeline.sync()
+            add_round_trips()
+        except psycopg.Error as exc:
+            logging.warning(f"Fenêtre de {len(window)} paquets rejouée paquet par paquet : {exc}")
+            for query, params in window:
+                await self.send_chunk(query, params)
+
+    async def send_chunk(self, query, params):
+        for attempt in range(self.retries + 1):
+            try:
+                conn = await self._connection()
+                await conn.execute(query, params)
+                add_round_trips()
+                return
+            except TRANSIENT_ERRORS as exc:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"Paquet en échec (tentative {attempt + 1}/{self.retries}) : {exc}")
+                await self._reset()
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+    async def _reset(self):
+        if self.conn is not None and self.conn.broken:
+            await self.conn.close()
+            self.conn = None
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+
+
+async def _load(df, statements, chunk_size, window_chunks, connections, make_loader):
+    starts = list(range(0, len(df), chunk_size))
+    windows = [starts[i:i + window_chunks] for i in range(0, len(starts), window_chunks)]
+    pending = iter(windows)
+
+    async def worker():
+        loader = make_loader()
+        try:
+            # Windows are built lazily: only the ones in flight hold parameters
+            for window in pending:
+                items = []
+                for start in window:
+                    chunk = df.iloc[start:start + chunk_size]
+                    items.append((statements(len(chunk)), chunk_params(chunk)))
+                await loader.send_window(items)
+        finally:
+            await loader.close()
+
+    # First error propagates; asyncio.run then cancels the other workers
+    await asyncio.gather(*(worker() for _ in range(min(connections, len(windows)))))
+
+
+def async_insert_dataframe(
+    df,
+    table_name,
+    engine,
+    schema="public",
+    chunk_size=250,
+    conflict=sql.SQL(""),
+    max_in_flight=None,
+    connections=None,
+    retries=None,
+):
+    """
+    Load df with up to max_in_flight chunks awaiting the server, spread
+    over `connections` pipelined connections. Defaults come from the
+    DB_ASYNC_* settings.
+    """
+    settings = db_settings()
+    max_in_flight = max_in_flight or settings["async_in_flight"]
+    connections = connections or settings["async_connections"]
+    retries = settings["async_retries"] if retries is None else retries
+
+    conninfo = psycopg_conninfo(engine.url)
+    kwargs = connect_args(engine.url, settings)
+    statements = _Statements(sql.Identifier(schema, table_name), list(df.columns), conflict)
+
+    asyncio.run(_load(
+        df,
+        statements,
+        chunk_size,
+        window_chunks=max(1, max_in_flight // connections),
+        connections=connections,
+        make_loader=lambda: _PipelinedLoader(
+            conninfo, kwargs,
+            configure=lambda conn: configure_connection(conn, engine.url, settings),
+            retries=retries,
+        ),
+    ))
@@ -0,0 +1,190 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CHECKPOINT_FORMAT = "parquet"
+except ImportError:
+    CHECKPOINT_FORMAT = "pickle"
+
+# ============================
+# Points de reprise par table et par étape
+# ============================
+# Chaque étape d'une table (clean, validated, loaded) a une clé dérivée de :
+#   - l'empreinte du fichier CSV d'entrée,
+#   - la version de l'étape (code, types, schéma, cible...),
+#   - la clé de l'étape précédente.
+# Un changement en amont invalide donc toutes les étapes suivantes.
+# Seul le dernier point de reprise de chaque (table, étape) est conservé.
+#
+#   {CHECKPOINT_DIR}/{table}/{étape}-{clé}.json     métadonnées
+#   {CHECKPOINT_DIR}/{table}/{étape}-{clé}.parquet  données (pickle sans pyarrow)
+
+CHECKPOINT_DIR = "pipeline/data/.checkpoints"
+
+_EXTENSIONS = {"parquet": ".parquet", "pickle": ".pkl"}
+
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _dtype_spec(dtype):
+    # str() ne distingue pas string[python] de string[pyarrow]
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+class CheckpointStore:
+
+    def __init__(self, root=None, fmt=None):
+        self.root = root or CHECKPOINT_DIR
+        self.fmt = fmt or CHECKPOINT_FORMAT
+        self._file_hashes = {}
+
+    def file_hash(self, path):
+        # Mémorisé par (chemin, taille, date de modification)
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._file_hashes[memo_key] = digest.hexdigest()
+        return self._file_hashes[memo_key]
+
+    def stage_keys(self, path, versions):
+        """
+        versions : [(étape, version)] dans l'ordre du pipeline.
+        Retourne {étape: clé}, chaque clé incluant celle de l'étape précédente.
+        """
+        keys = {}
+        previous = self.file_hash(path)
+        for stage, version in versions:
+            previous = keys[stage] = fingerprint(previous, stage, version)
+        return keys
+
+    def _base(self, table, stage, key):
+        return os.path.join(self.root, table, f"{stage}-{key}")
+
+    def _read_meta(self, table, stage, key):
+        meta_path = self._base(table, stage, key) + ".json"
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            return json.load(f)
+
+    def has(self, table, stage, key):
+        return self._read_meta(table, stage, key) is not None
+
+    def load(self, table, stage, key):
+        meta = self._read_meta(table, stage, key)
+        if meta is None or meta.get("format") is None:
+            return None
+
+        data_path = self._base(table, stage, key) + _EXTENSIONS[meta["format"]]
+        if meta["format"] == "parquet":
+            df = pd.read_parquet(data_path)
+        else:
+            df = pd.read_pickle(data_path)
+
+        # Types exacts restaurés (ex. chaînes Arrow relues en string[python])
+        for col, spec in meta["dtypes"].items():
+            if _dtype_spec(df[col].dtype) != spec:
+                df[col] = df[col].astype(spec)
+        return df
+
+    def save(self, table, stage, key, df=None):
+        # df=None : simple marqueur (ex. table déjà chargée en base)
+        self._drop_stage(table, stage)
+        os.makedirs(os.path.join(self.root, table), exist_ok=True)
+        base = self._base(table, stage, key)
+
+        meta = {
+            "table": table,
+            "stage": stage,
+            "key": key,
+            "format": None,
+            "rows": None,
+            "dtypes": {},
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if df is not None:
+            if self.fmt == "parquet":
+                df.to_parquet(base + _EXTENSIONS["parquet"])
+            else:
+                df.to_pickle(base + _EXTENSIONS["pickle"])
+            meta.update(
+                format=self.fmt,
+                rows=int(len(df)),
+                dtypes={col: _dtype_spec(dtype) for col, dtype in df.dtypes.items()},
+            )
+
+        # Métadonnées écrites en dernier : un point de reprise sans .json
+        # (écriture interrompue) est ignoré
+        with open(base + ".json", "w") as f:
+            json.dump(meta, f, indent=4)
+
+    def _drop_stage(self, table, stage):
+        for path in glob.glob(os.path.join(self.root, table, f"{stage}-*")):
+            os.remove(path)
+
+    def list(self):
+        rows = []
+        for meta_path in sorted(glob.glob(os.path.join(self.root, "*", "*.json"))):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            size = sum(
+                os.path.getsize(p)
+                for p in glob.glob(meta_path[:-len(".json")] + ".*")
+            )
+            rows.append({
+                "table": meta["table"],
+                "etape": meta["stage"],
+                "cle": meta["key"],
+                "lignes": meta["rows"],
+                "taille_mo": round(size / 1024 ** 2, 2),
+                "cree_le": meta["created_at"],
+            })
+        return pd.DataFrame(rows, columns=["table", "etape", "cle", "lignes", "taille_mo", "cree_le"])
+
+    def clear(self, table=None):
+        # Supprime les points de reprise d'une table (ou de toutes)
+        pattern = os.path.join(self.root, table or "*", "*")
+        paths = glob.glob(pattern)
+        for path in paths:
+            os.remove(path)
+        return len([p for p in paths if p.endswith(".json")])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Points de reprise du pipeline ETL")
+    parser.add_argument("--dir", default=None, help=f"dossier des points de reprise (défaut : {CHECKPOINT_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="lister les points de reprise")
+    clear = commands.add_parser("clear", help="supprimer les points de reprise")
+    clear.add_argument("--table", default=None, help="ne supprimer que ceux de cette table")
+    args = parser.parse_args(argv)
+
+    store = CheckpointStore(args.dir)
+    if args.command == "list":
+        entries = store.list()
+        print(entries.to_string(index=False) if not entries.empty else "Aucun point de reprise")
+    else:
+        print(f"🧹 {store.clear(args.table)} point(s) de reprise supprimé(s)")
+
+
+if __name__ == "__main__":
+    main()
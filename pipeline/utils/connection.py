@@ -0,0 +1,150 @@
+import os
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+
+# ============================
+# Accès base de données partagé
+# ============================
+# Un seul moteur SQLAlchemy (et donc un seul pool de connexions psycopg) par
+# URL et par configuration pour tout le processus : étapes du pipeline,
+# quarantaine, dédoublonnage et scripts de support_tools réutilisent les
+# mêmes connexions au lieu d'en ouvrir de nouvelles.
+#
+# Réglages lus dans le .env (valeur par défaut entre parenthèses) :
+#   DB_POOL_SIZE (10), DB_MAX_OVERFLOW (5), DB_POOL_TIMEOUT (60 s)
+#   DB_ECHO (0)               journaliser chaque requête SQL
+#   DB_SSLMODE (require)      disable / prefer pour le PostgreSQL local
+#   DB_PREPARE_THRESHOLD (5)  exécutions d'une même requête avant sa
+#                             préparation côté serveur
+#   DB_PREPARED_MAX (100)     requêtes préparées gardées par connexion
+#   DB_PGBOUNCER (auto)       1 derrière un pooler en mode transaction
+#                             (pgbouncer, pooler Supabase) : aucune requête
+#                             préparée, une connexion serveur différente
+#                             pouvant servir chaque transaction.
+#                             auto : activé sur le port 6543 du pooler Supabase
+#   DB_ASYNC_IN_FLIGHT (16)   méthode async : paquets envoyés sans attendre
+#                             de réponse, répartis sur DB_ASYNC_CONNECTIONS (2)
+#   DB_ASYNC_RETRIES (3)      nouvelles tentatives d'un paquet sur erreur transitoire
+
+POOLER_PORT = 6543
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _flag(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def db_settings():
+    load_dotenv()
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 60)),
+        "echo": _flag(os.getenv("DB_ECHO", "0")),
+        "sslmode": os.getenv("DB_SSLMODE", "require"),
+        "prepare_threshold": int(os.getenv("DB_PREPARE_THRESHOLD", 5)),
+        "prepared_max": int(os.getenv("DB_PREPARED_MAX", 100)),
+        "pgbouncer": os.getenv("DB_PGBOUNCER", "auto"),
+        "async_in_flight": int(os.getenv("DB_ASYNC_IN_FLIGHT", 16)),
+        "async_connections": int(os.getenv("DB_ASYNC_CONNECTIONS", 2)),
+        "async_retries": int(os.getenv("DB_ASYNC_RETRIES", 3)),
+    }
+
+
+def database_url(settings=None):
+    # Variables user/password/host/port/dbname du .env ; URL.create échappe
+    # les caractères spéciaux du mot de passe
+    settings = settings or db_settings()
+    port = os.getenv("port")
+    return URL.create(
+        "postgresql+psycopg",
+        username=os.getenv("user"),
+        password=os.getenv("password"),
+        host=os.getenv("host"),
+        port=int(port) if port else None,
+        database=os.getenv("dbname"),
+        query={"sslmode": settings["sslmode"]} if settings["sslmode"] else {},
+    )
+
+
+def behind_pooler(url, setting="auto"):
+    if setting == "auto":
+        return url.port == POOLER_PORT
+    return _flag(setting)
+
+
+def connect_args(url, settings):
+    # Instructions préparées automatiques de psycopg : désactivées derrière
+    # un pooler en mode transaction (elles n'existent que sur une connexion serveur)
+    if behind_pooler(url, settings["pgbouncer"]):
+        return {"prepare_threshold": None}
+    return {"prepare_threshold": settings["prepare_threshold"]}
+
+
+def configure_connection(conn, url, settings):
+    # prepared_max n'est pas une option de connexion (libpq la refuse) :
+    # attribut de la connexion psycopg, réglé une fois ouverte
+    if not behind_pooler(url, settings["pgbouncer"]):
+        conn.prepared_max = settings["prepared_max"]
+    return conn
+
+
+def psycopg_conninfo(url):
+    # URL SQLAlchemy → chaîne de connexion psycopg (connexions hors pool)
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def get_engine(echo=None, url=None, **pool_options):
+    """
+    Moteur partagé pour l'URL donnée (défaut : celle du .env).
+    echo et pool_options (pool_size, max_overflow, pool_timeout) remplacent
+    les réglages du .env ; chaque combinaison a son propre pool.
+    """
+    settings = db_settings()
+    url = make_url(url) if url is not None else database_url(settings)
+    echo = settings["echo"] if echo is None else echo
+    pool = {
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        **pool_options,
+    }
+    args = connect_args(url, settings)
+
+    key = (url.render_as_string(hide_password=False), echo, tuple(sorted(pool.items())), tuple(sorted(args.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(url, echo=echo, connect_args=args, **pool)
+
+            @event.listens_for(engine, "connect")
+            def _configure(dbapi_conn, connection_record, url=url, settings=settings):
+                configure_connection(dbapi_conn, url, settings)
+
+            _engines[key] = engine
+    return engine
+
+
+@contextmanager
+def pg_connection(engine=None):
+    """
+    Connexion psycopg empruntée au pool du moteur partagé, rendue au pool
+    à la sortie (une transaction non validée y est annulée).
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        yield conn.connection.driver_connection
+
+
+def dispose_engines():
+    # Ferme tous les pools (fin de processus, tests)
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
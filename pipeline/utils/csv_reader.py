@@ -0,0 +1,102 @@
+import csv
+import logging
+import os
+
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+# -----------------------------
+# Lecture des CSV bruts
+# -----------------------------
+# - seules les colonnes utiles (schémas Pandera + colonnes chargées telles
+#   quelles) sont lues : usecols ;
+# - les catégories et chaînes Arrow (profil compact) sont produites dès la
+#   lecture, les dates restent du texte : normalize_dates reste le seul
+#   analyseur de dates ;
+# - les autres colonnes restent inférées : les valeurs aberrantes ("NC"...)
+#   sont converties au nettoyage (to_numeric), pas à la lecture ;
+# - moteur pyarrow (multithreadé) si disponible, repli sur le parseur C.
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    pa = None
+    CSV_ENGINE = "c"
+
+# Types imposés dès la lecture (sans risque d'échec sur une valeur aberrante)
+READ_DTYPES = ("category", "string[pyarrow]")
+
+# Mêmes valeurs nulles que pd.read_csv
+NA_VALUES = sorted(STR_NA_VALUES)
+
+
+def csv_header(path):
+    """Colonnes du fichier, ou None s'il n'existe pas."""
+    if not os.path.exists(path):
+        return None
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def raw_projection(header, columns, dtypes, date_cols=(), renames=None):
+    """
+    Retourne (usecols, dtype) pour la lecture, en noms de colonnes BRUTS.
+    columns : colonnes gardées (noms du schéma) ; renames : brut → schéma.
+    Sans en-tête connu (fichier absent), aucune projection.
+    """
+    if header is None:
+        return None, None
+
+    to_raw = {col: raw for raw, col in (renames or {}).items()}
+    wanted = {to_raw.get(col, col): col for col in columns}
+
+    usecols = [raw for raw in header if raw in wanted]
+    dtype = {}
+    for raw in usecols:
+        col = wanted[raw]
+        if col in date_cols:
+            dtype[raw] = str
+        elif dtypes.get(col) in READ_DTYPES:
+            dtype[raw] = dtypes[col]
+    return usecols, dtype or None
+
+
+def _arrow_type(dtype):
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def read_csv_arrow(source, usecols=None, dtype=None):
+    dtype = dtype or {}
+    table = pa_csv.read_csv(
+        source,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types={col: _arrow_type(d) for col, d in dtype.items()},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+
+    # Chaînes Arrow : gardées en mémoire Arrow, sans passer par des objets Python
+    arrow_cols = [col for col, d in dtype.items() if d == "string[pyarrow]"]
+    df = table.drop_columns(arrow_cols).to_pandas()
+    for col in arrow_cols:
+        df[col] = pd.arrays.ArrowStringArray(table.column(col))
+    return df[table.column_names]
+
+
+def read_csv(source, usecols=None, dtype=None, engine=None):
+    engine = engine or CSV_ENGINE
+    if engine == "pyarrow":
+        try:
+            return read_csv_arrow(source, usecols=usecols, dtype=dtype)
+        except (ImportError, ValueError, OSError) as e:
+            # Fichier ou option que pyarrow ne sait pas lire : parseur C
+            logging.warning(f"⚠️ Lecture pyarrow impossible ({e}) : repli sur le parseur C")
+            if hasattr(source, "seek"):
+                source.seek(0)
+    return pd.read_csv(source, usecols=usecols, dtype=dtype, low_memory=False)
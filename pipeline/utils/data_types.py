@@ -1,3 +1,5 @@
+import pandas as pd
+
 # -----------------------------
 # Operations
 # -----------------------------
@@ -8,7 +10,7 @@ operations_dtypes = {
     "moyen_alerte": str,
     "qui_alerte": str,
     "categorie_qui_alerte": str,
-    "cross": str,
+    "cross_type": str,
     "departement": str,
     "evenement": str,
     "categorie_evenement": str,
@@ -27,6 +29,14 @@ operations_dtypes = {
     "numero_sitrep": str
 }
 
+# Colonnes brutes renommées au nettoyage (noms du schéma et de la table SQL)
+operations_renames = {
+    "cross": "cross_type",
+}
+
+# Colonnes de la table SQL chargées telles quelles (hors schéma Pandera)
+operations_passthrough_cols = ["est_metropolitain"]
+
 # -----------------------------
 # Flotteurs
 # -----------------------------
@@ -49,4 +59,129 @@ resultats_humain_dtypes = {
     "resultat_humain": str,
     "nombre": "Int64",           # nullable int
     "dont_nombre_blesse": "Int64"  # nullable int
-}
\ No newline at end of file
+}
+
+# -----------------------------
+# Colonnes date (UTC)
+# -----------------------------
+operations_date_cols = [
+    "date_heure_reception_alerte",
+    "date_heure_fin_operation",
+]
+
+
+# Types numériques (éventuellement nullables) : conversion via to_numeric
+NUMERIC_DTYPES = ("Int8", "Int16", "Int32", "Int64", "float32")
+
+
+def apply_dtypes(df, dtypes, date_cols=(), date_format=None):
+    """
+    Applique en mémoire les types attendus par les schémas Pandera,
+    comme le ferait une relecture CSV avec `dtype=` et `parse_dates=`.
+    date_format : format des dates texte ("ISO8601" pour les réponses de l'API,
+    dont les fractions de seconde varient d'une valeur à l'autre).
+    """
+    # df est souvent une sélection d'un autre DataFrame : copie superficielle
+    # (aucune donnée copiée), les colonnes retypées ne touchent pas l'original
+    df = df.copy(deep=False)
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if dtype is str:
+            df[col] = df[col].astype("string")
+        elif dtype is float or dtype in NUMERIC_DTYPES:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+
+    for col in date_cols:
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            # Déjà normalisée (normalize_dates) : pas de nouvelle analyse
+            df[col] = df[col].dt.tz_convert("UTC")
+        else:
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True, format=date_format)
+
+    return df
+
+
+
+# -----------------------------
+# Profil compact (optionnel)
+# -----------------------------
+# - catégories pour les textes à faible cardinalité ;
+# - chaînes Arrow pour les autres textes (repli sur "string" sans pyarrow) ;
+# - petits entiers nullables pour les mesures bornées (cf. CHECK de script_tables.sql).
+# latitude / longitude restent en float64 : float32 perdrait ~0,5 m de précision.
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = "string"
+
+DTYPE_PROFILES = ("default", "compact")
+
+compact_operations_dtypes = {
+    **operations_dtypes,
+    "type_operation": "category",
+    "pourquoi_alerte": "category",
+    "moyen_alerte": "category",
+    "qui_alerte": "category",
+    "categorie_qui_alerte": "category",
+    "cross_type": "category",
+    "departement": "category",
+    "evenement": "category",
+    "categorie_evenement": "category",
+    "autorite": "category",
+    "seconde_autorite": "category",
+    "zone_responsabilite": "category",
+    "vent_direction_categorie": "category",
+    "cross_sitrep": "category",
+    "fuseau_horaire": "category",
+    "systeme_source": "category",
+    "vent_direction": "Int16",   # 0 - 360
+    "vent_force": "Int8",        # 0 - 12 (Beaufort)
+    "mer_force": "Int8",         # 0 - 9 (Douglas)
+    "numero_sitrep": TEXT_DTYPE,
+}
+
+compact_flotteurs_dtypes = {
+    **flotteurs_dtypes,
+    "numero_ordre": "Int16",
+    "pavillon": "category",
+    "resultat_flotteur": "category",
+    "type_flotteur": "category",
+    "categorie_flotteur": "category",
+    "numero_immatriculation": TEXT_DTYPE,
+}
+
+compact_resultats_humain_dtypes = {
+    **resultats_humain_dtypes,
+    "categorie_personne": "category",
+    "resultat_humain": "category",
+    "nombre": "Int32",
+    "dont_nombre_blesse": "Int32",
+}
+
+
+def category_dtypes(dtypes):
+    # Colonnes lisibles directement en catégories dans pd.read_csv
+    # (les colonnes numériques brutes peuvent contenir des valeurs aberrantes)
+    return {col: dtype for col, dtype in dtypes.items() if dtype == "category"}
+
+
+def memory_report(frames):
+    """
+    Empreinte mémoire réelle (deep=True) de chaque DataFrame, en Mo.
+    """
+    rows = [
+        {
+            "table": name,
+            "lignes": len(df),
+            "colonnes": df.shape[1],
+            "memoire_mo": round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+        }
+        for name, df in frames.items()
+    ]
+    return pd.DataFrame(rows, columns=["table", "lignes", "colonnes", "memoire_mo"])
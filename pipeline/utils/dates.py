@@ -0,0 +1,141 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Normalisation des dates
+# -----------------------------
+# - chaque colonne est analysée UNE fois, sur ses valeurs distinctes
+#   (les horodatages SECMAR se répètent beaucoup), avec des formats explicites ;
+# - une valeur avec décalage (+00:00, +11:00...) est un instant absolu ;
+# - une valeur sans décalage est une heure locale du CROSS : elle est convertie
+#   en UTC selon fuseau_horaire, fuseau par fuseau (pas ligne par ligne).
+
+# Format des exports SECMAR ("2025-06-11 22:50:00+00:00"), suivi d'un
+# décalage facultatif
+SECMAR_FORMAT = "%Y-%m-%d %H:%M:%S"
+_OFFSET_RE = re.compile(r"^(?:Z|([+-])(\d{2}):?(\d{2}))$")
+
+# Autres formats avec décalage horaire (instant absolu)
+OFFSET_FORMATS = (
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+)
+
+# Formats sans décalage (heure locale)
+LOCAL_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d",
+)
+
+
+def _offset_minutes(tail):
+    # "" : heure locale ; "Z", "+11:00", "-0300" : décalage ; autre : invalide
+    if tail == "":
+        return 0.0, False
+    match = _OFFSET_RE.match(tail)
+    if match is None:
+        return np.nan, False
+    if match.group(1) is None:
+        return 0.0, True
+    minutes = int(match.group(2)) * 60 + int(match.group(3))
+    return (-minutes if match.group(1) == "-" else minutes), True
+
+
+def _parse_uniques(values):
+    """
+    Retourne (horodatages UTC naïfs pour les valeurs avec décalage,
+    heures locales naïves pour les autres, masque "avec décalage").
+    """
+    values = pd.Index(values, dtype=object).astype(str)
+    parsed = np.full(len(values), np.datetime64("NaT", "ns"))
+    has_offset = np.zeros(len(values), dtype=bool)
+
+    # 1. Format des exports SECMAR : partie horaire analysée en un seul appel,
+    #    décalages (très peu de valeurs distinctes) analysés une fois chacun
+    wall = pd.to_datetime(values.str.slice(0, 19), format=SECMAR_FORMAT, errors="coerce").to_numpy()
+    tail_codes, tails = pd.factorize(values.str.slice(19))
+    offsets = [_offset_minutes(tail) for tail in tails]
+    minutes = np.array([m for m, _ in offsets] + [np.nan])[tail_codes]
+    with_offset = np.array([o for _, o in offsets] + [False])[tail_codes]
+
+    ok = ~np.isnat(wall) & ~np.isnan(minutes)
+    parsed[ok] = wall[ok] - (minutes[ok] * 60).astype("timedelta64[s]")
+    has_offset[ok] = with_offset[ok]
+
+    # 2. Autres formats explicites, uniquement pour les valeurs restantes
+    todo = ~ok
+    for fmt in OFFSET_FORMATS + LOCAL_FORMATS:
+        if not todo.any():
+            break
+        offset = fmt in OFFSET_FORMATS
+        result = pd.to_datetime(values[todo], format=fmt, errors="coerce", utc=offset)
+        if offset:
+            result = result.tz_convert(None)
+        ok = ~result.isna()
+
+        positions = np.flatnonzero(todo)[ok]
+        parsed[positions] = result[ok].to_numpy().astype("datetime64[ns]")
+        has_offset[positions] = offset
+        todo[positions] = False
+
+    return parsed, has_offset
+
+
+def _localize(wall, tz):
+    # Heures ambiguës (passage à l'heure d'hiver) : heure d'hiver ;
+    # heures inexistantes (passage à l'heure d'été) : décalées en avant
+    index = pd.DatetimeIndex(wall)
+    return index.tz_localize(
+        tz, ambiguous=np.zeros(len(index), dtype=bool), nonexistent="shift_forward"
+    ).tz_convert("UTC").tz_convert(None).to_numpy()
+
+
+def normalize_dates(df, date_cols, tz_col="fuseau_horaire", default_tz="UTC"):
+    """
+    Convertit date_cols en datetime64[ns, UTC].
+    Retourne (df, {colonne: nombre de valeurs non reconnues}).
+    Les heures locales sans fuseau connu sont considérées en default_tz.
+    """
+    tz = None
+    if tz_col in df.columns:
+        tz = df[tz_col].astype(object).where(df[tz_col].notna(), default_tz).to_numpy()
+
+    unparseable = {}
+    for col in date_cols:
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].dt.tz_convert("UTC")
+            unparseable[col] = 0
+            continue
+
+        # Cache des valeurs distinctes : une analyse par valeur unique
+        codes, uniques = pd.factorize(df[col].astype(object), use_na_sentinel=True)
+        parsed, has_offset = _parse_uniques(uniques)
+
+        missing = codes < 0
+        instants = np.where(missing, np.datetime64("NaT", "ns"), parsed[codes])
+        local = ~missing & ~has_offset[codes] & ~np.isnat(instants)
+
+        if local.any():
+            zones = tz[local] if tz is not None else np.full(local.sum(), default_tz, dtype=object)
+            converted = instants[local].copy()
+            for zone in pd.unique(zones):
+                in_zone = zones == zone
+                try:
+                    converted[in_zone] = _localize(converted[in_zone], zone)
+                except Exception:
+                    # Fuseau inconnu : repli sur default_tz
+                    converted[in_zone] = _localize(converted[in_zone], default_tz)
+            instants[local] = converted
+
+        unparseable[col] = int((~missing & np.isnat(instants)).sum())
+        df[col] = pd.Series(instants, index=df.index).dt.tz_localize("UTC")
+
+    return df, unparseable
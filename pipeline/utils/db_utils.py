@@ -1,33 +1,109 @@
-from sqlalchemy import Table, MetaData
-from sqlalchemy import create_engine
+from sqlalchemy import Table, MetaData, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.dialects.postgresql import insert
-from dotenv import load_dotenv
+from psycopg import sql
 from datetime import time
 import pandas as pd
+import hashlib
+import os
+import pickle
+import threading
 
+from pipeline.utils.instrumentation import add_round_trips
+# Engines are shared process-wide; re-exported for existing callers
+from pipeline.utils.connection import get_engine  # noqa: F401
+from pipeline.utils.async_loader import async_insert_dataframe
 
-def get_engine(echo: bool = False):
-    import os
-    from dotenv import load_dotenv
 
-    load_dotenv()
+# -----------------------------
+# Reflected schema cache
+# -----------------------------
+SCHEMA_SQL_PATH = "support_tools/sql_scripts/script_tables.sql"
+SCHEMA_CACHE_DIR = "pipeline/data/.schema_cache"
 
-    user = os.getenv("user")
-    password = os.getenv("password")
-    host = os.getenv("host")
-    port = os.getenv("port")
-    dbname = os.getenv("dbname")
+_metadata = MetaData()
+_table_cache = {}
+_table_cache_lock = threading.Lock()
 
-    database_url = f"postgresql+psycopg://{user}:{password}@{host}:{port}/{dbname}?sslmode=require"
 
-    return create_engine(
-        database_url,
-        echo=True,
-        pool_size=10,          # increase max connections
-        max_overflow=5,        # allow temporary extra connections
-        pool_timeout=60,       # wait 30s for connection before error
-    )
+def get_table(table_name: str, engine, schema="public") -> Table:
+    # Reflection costs several catalog queries: do it once per (schema, table)
+    key = (schema, table_name)
+    with _table_cache_lock:
+        tbl = _table_cache.get(key)
+        if tbl is None:
+            tbl = Table(table_name, _metadata, schema=schema, autoload_with=engine)
+            _table_cache[key] = tbl
+    return tbl
+
+
+def invalidate_table_cache(table_name=None, schema="public"):
+    # Drop one table, or everything when table_name is None (e.g. after DDL)
+    global _metadata
+
+    with _table_cache_lock:
+        if table_name is None:
+            _table_cache.clear()
+            _metadata = MetaData()
+            return
+
+        tbl = _table_cache.pop((schema, table_name), None)
+        if tbl is not None:
+            _metadata.remove(tbl)
+
+
+def schema_fingerprint(sql_path=SCHEMA_SQL_PATH) -> str:
+    with open(sql_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _schema_cache_file(cache_dir, sql_path):
+    return os.path.join(cache_dir, f"tables_{schema_fingerprint(sql_path)}.pkl")
+
+
+def save_table_cache(cache_dir=SCHEMA_CACHE_DIR, sql_path=SCHEMA_SQL_PATH):
+    # The file name carries the DDL fingerprint: editing script_tables.sql
+    # makes older caches unreachable
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _schema_cache_file(cache_dir, sql_path)
+
+    with _table_cache_lock:
+        payload = (_metadata, list(_table_cache))
+        with open(path, "wb") as f:
+            pickle.dump(payload, f)
+
+    return path
+
+
+def load_table_cache(cache_dir=SCHEMA_CACHE_DIR, sql_path=SCHEMA_SQL_PATH) -> bool:
+    global _metadata
+
+    path = _schema_cache_file(cache_dir, sql_path)
+    if not os.path.exists(path):
+        return False
+
+    with open(path, "rb") as f:
+        metadata, keys = pickle.load(f)
+
+    with _table_cache_lock:
+        _metadata = metadata
+        _table_cache.clear()
+        for schema, table_name in keys:
+            _table_cache[(schema, table_name)] = metadata.tables[f"{schema}.{table_name}"]
+
+    return True
+
+
+# async: multi-VALUES INSERTs pipelined over several connections (see async_loader)
+LOAD_METHODS = ("insert", "copy", "async")
+
+# nothing: ON CONFLICT DO NOTHING (existing rows are never rewritten)
+# update: change-aware upsert, only rows whose ROW_HASH_COL differs are rewritten
+CONFLICT_MODES = ("nothing", "update")
+ROW_HASH_COL = "row_hash"
+
+# Rows serialized per COPY write: bounds the CSV buffer, not the transaction
+COPY_BLOCK_ROWS = 50_000
 
 
 def insert_dataframe(
@@ -38,7 +114,15 @@ def insert_dataframe(
     chunk_size=250,
     conflict_cols=None,
     conflict_constraint=None,
+    method="insert",
+    on_conflict="nothing",
+    key_cols=None,
 ):
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Méthode de chargement inconnue : {method} (attendu : {LOAD_METHODS})")
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"Mode de conflit inconnu : {on_conflict} (attendu : {CONFLICT_MODES})")
+
     if df.empty:
         return
 
@@ -49,17 +133,63 @@ def insert_dataframe(
             df[col] = df[col].astype('Int64')
 
     # 1.5️⃣ Replace NaN in string columns with empty strings
-    string_cols = df.select_dtypes(include=['object', 'string']).columns
+    string_cols = df.select_dtypes(include=['object', 'string', 'category']).columns
     for col in string_cols:
+        # Compact dtype profile: '' must be a category before fillna
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and '' not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories('')
         df[col] = df[col].fillna('')
 
     # 2️⃣ operation_id
     if 'operation_id' in df.columns:
         df['operation_id'] = df['operation_id'].astype('int64')
 
-    # 4️⃣ Reflect table
-    meta = MetaData()
-    tbl = Table(table_name, meta, schema=schema, autoload_with=engine)
+    # 2.5️⃣ Upsert: one content hash per row, one row per business key
+    # (DO UPDATE cannot touch the same row twice in one statement)
+    update_cols = None
+    if on_conflict == "update":
+        key_cols = key_cols or conflict_cols
+        if not key_cols:
+            raise ValueError("Le mode update exige les colonnes de la clé métier (key_cols)")
+        # A NULL key part never conflicts in PostgreSQL: only complete keys
+        # are deduplicated (NaN keys would otherwise compare equal here)
+        complete = df[key_cols].notna().all(axis=1)
+        df = df[~(df.duplicated(subset=key_cols, keep="last") & complete)]
+        df = df.assign(**{ROW_HASH_COL: row_hashes(df)})
+        update_cols = [c for c in df.columns if c not in key_cols]
+
+    # 3️⃣ Bulk mode: COPY into a staging table, then one merge statement
+    if method == "copy":
+        copy_merge_dataframe(
+            df,
+            table_name,
+            engine,
+            schema=schema,
+            conflict_cols=conflict_cols or key_cols,
+            conflict_constraint=conflict_constraint,
+            update_cols=update_cols,
+        )
+        return
+
+    # 3.5️⃣ Async mode: many chunks in flight, same conflict clause as COPY's merge
+    if method == "async":
+        async_insert_dataframe(
+            df,
+            table_name,
+            engine,
+            schema=schema,
+            chunk_size=chunk_size,
+            conflict=_conflict_clause(
+                conflict_cols or key_cols,
+                conflict_constraint,
+                update_cols,
+                sql.Identifier(schema, table_name),
+            ),
+        )
+        return
+
+    # 4️⃣ Reflect table (once per process, see get_table)
+    tbl = get_table(table_name, engine, schema=schema)
 
     # 5️⃣ Reuse ONE connection
     with engine.connect() as conn:
@@ -69,7 +199,18 @@ def insert_dataframe(
 
             stmt = insert(tbl).values(records)
 
-            if conflict_constraint:
+            if update_cols:
+                # Rows whose hash is unchanged are skipped: no new tuple, no WAL
+                target = (
+                    {"constraint": conflict_constraint}
+                    if conflict_constraint else {"index_elements": conflict_cols or key_cols}
+                )
+                stmt = stmt.on_conflict_do_update(
+                    **target,
+                    set_={c: stmt.excluded[c] for c in update_cols},
+                    where=tbl.c[ROW_HASH_COL].is_distinct_from(stmt.excluded[ROW_HASH_COL]),
+                )
+            elif conflict_constraint:
                 stmt = stmt.on_conflict_do_nothing(
                     constraint=conflict_constraint
                 )
@@ -80,4 +221,96 @@ def insert_dataframe(
 
             # One transaction per chunk
             with conn.begin():
-                conn.execute(stmt)
\ No newline at end of file
+                conn.execute(stmt)
+
+
+def row_hashes(df):
+    # 64-bit content hash of every column, stored as BIGINT. Text dtypes
+    # (object, string, category) and nullable ints hash alike, so both
+    # dtype profiles give the same value for the same row.
+    cols = [c for c in df.columns if c != ROW_HASH_COL]
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy().view("int64")
+
+
+def _conflict_clause(conflict_cols=None, conflict_constraint=None, update_cols=None, target=None):
+    if conflict_constraint:
+        clause = sql.SQL(" ON CONFLICT ON CONSTRAINT {}").format(sql.Identifier(conflict_constraint))
+    elif conflict_cols:
+        clause = sql.SQL(" ON CONFLICT ({})").format(
+            sql.SQL(", ").join(sql.Identifier(c) for c in conflict_cols)
+        )
+    else:
+        return sql.SQL("")
+
+    if not update_cols:
+        return clause + sql.SQL(" DO NOTHING")
+
+    # Change-aware upsert: unchanged rows (same hash) are not rewritten
+    return clause + sql.SQL(" DO UPDATE SET {} WHERE {} IS DISTINCT FROM EXCLUDED.{}").format(
+        sql.SQL(", ").join(
+            sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
+            for c in update_cols
+        ),
+        sql.SQL("{}.{}").format(target, sql.Identifier(ROW_HASH_COL)) if target else sql.Identifier(ROW_HASH_COL),
+        sql.Identifier(ROW_HASH_COL),
+    )
+
+
+def copy_merge_dataframe(
+    df: pd.DataFrame,
+    table_name: str,
+    engine,
+    schema="public",
+    conflict_cols=None,
+    conflict_constraint=None,
+    block_rows=COPY_BLOCK_ROWS,
+    update_cols=None,
+):
+    # COPY the frame into a temp table, then merge it into the target with ONE
+    # INSERT ... SELECT keeping insert_dataframe's conflict handling.
+    # Returns the number of rows actually inserted.
+    target = sql.Identifier(schema, table_name)
+    staging = sql.Identifier(f"_staging_{table_name}")
+    columns = sql.SQL(", ").join(sql.Identifier(c) for c in df.columns)
+
+    # Whole frame in ONE transaction: the staging table dies at COMMIT
+    with engine.begin() as conn:
+        raw_conn = conn.connection.driver_connection
+
+        with raw_conn.cursor() as cur:
+            # Same column types as the target, without constraints nor sequences
+            cur.execute(
+                sql.SQL(
+                    "CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+                ).format(staging, columns, target)
+            )
+
+            copy_stmt = sql.SQL(
+                "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+            ).format(staging, columns)
+
+            with cur.copy(copy_stmt) as copy:
+                for start in range(0, len(df), block_rows):
+                    block = df.iloc[start:start + block_rows]
+                    copy.write(block.to_csv(header=False, index=False, na_rep="\\N"))
+
+            cur.execute(
+                sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                    target, columns, columns, staging
+                )
+                + _conflict_clause(conflict_cols, conflict_constraint, update_cols, target)
+            )
+            # Raw cursor statements bypass SQLAlchemy events:
+            # CREATE TEMP, COPY and INSERT ... SELECT
+            add_round_trips(3)
+            return cur.rowcount
+
+
+def bump_data_versions(engine, table_names):
+    # Tell the app caches these tables changed (data_version, see script_tables.sql)
+    with engine.begin() as conn:
+        conn.execute(
+            text("SELECT bump_data_version(CAST(:tables AS TEXT[]))"),
+            {"tables": list(table_names)},
+        )
+    add_round_trips()
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from psycopg import sql
+
+from pipeline.utils.instrumentation import add_round_trips
+
+# -----------------------------
+# Dédoublonnage sur les clés métier
+# -----------------------------
+# Chaque clé (operation_id, numero_ordre...) est réduite à une empreinte
+# 64 bits : l'ensemble des clés déjà vues est un tableau uint64 trié
+# (8 octets par clé), qui traverse les blocs du mode streaming et peut être
+# amorcé avec les clés déjà présentes en base.
+# Les clés sont comparées sous forme texte, comme en base (operation_id est
+# VARCHAR, les textes manquants sont chargés en '') : 1, 1.0 et "1" sont
+# la même clé.
+# Une clé incomplète (NULL) ne viole pas la contrainte UNIQUE : ces lignes
+# ne sont écartées que si elles sont identiques sur toutes les colonnes.
+# Elle est repérée sur les valeurs d'origine : dans une colonne brute
+# object ("NC", "12,5"...), le texte normalisé d'un NULL est ''.
+
+_EMPTY = np.empty(0, dtype="uint64")
+
+
+def _number_text(numbers):
+    # Valeurs entières sans décimale (1.0 -> "1"), une à une
+    text = numbers.astype("string")
+    integral = numbers.notna() & (numbers % 1 == 0)
+    if integral.any():
+        text[integral] = numbers[integral].astype("int64").astype("string")
+    return text
+
+
+def _key_text(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return _number_text(pd.to_numeric(series, errors="coerce"))
+    text = series.astype("string").fillna("")
+    if series.dtype == object:
+        # Colonne numérique brute inférée en object ("NC", "12,5"...) : les
+        # valeurs lisibles comme nombres sont écrites comme dans un bloc numérique
+        numbers = pd.to_numeric(series, errors="coerce")
+        parsed = numbers.notna()
+        if parsed.any():
+            text[parsed] = _number_text(numbers[parsed])
+    return text
+
+
+def text_hashes(df):
+    """Empreinte uint64 de chaque ligne, sur ses valeurs en texte normalisé."""
+    # Indépendante des types inférés (int64 / float64 avec NaN / object) :
+    # un même fichier lu par blocs de tailles différentes donne les mêmes
+    # empreintes (un NULL s'écrit '' quel que soit le type de la colonne)
+    text = pd.DataFrame({col: _key_text(df[col]).fillna("") for col in df.columns}, index=df.index)
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+def key_hashes(df, key_cols):
+    """Empreinte uint64 de la clé métier de chaque ligne."""
+    keys = pd.DataFrame({col: _key_text(df[col]) for col in key_cols}, index=df.index)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+    partial = df[key_cols].isna().any(axis=1).to_numpy()
+    if partial.any():
+        # Clé incomplète : empreinte de la ligne entière
+        hashes = hashes.copy()
+        hashes[partial] = text_hashes(df[partial])
+    return hashes
+
+
+def sorted_unique(hashes):
+    # np.unique passe par une table de hachage, plus lente qu'un tri ici
+    hashes = np.sort(hashes)
+    return hashes[np.r_[True, hashes[1:] != hashes[:-1]]] if len(hashes) else _EMPTY
+
+
+def contains_hashes(sorted_hashes, hashes):
+    if len(sorted_hashes) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    pos = np.searchsorted(sorted_hashes, hashes).clip(max=len(sorted_hashes) - 1)
+    return sorted_hashes[pos] == hashes
+
+
+class KeyDeduplicator:
+    """
+    Écarte les lignes dont la clé a déjà été vue : plus haut dans le même
+    bloc, dans un bloc précédent, ou en base (known). La première
+    occurrence est conservée, comme le ferait ON CONFLICT DO NOTHING.
+    """
+
+    def __init__(self, key_cols, known=None):
+        self.key_cols = list(key_cols)
+        self.known = sorted_unique(known) if known is not None else _EMPTY
+        self.seen = _EMPTY
+        self.duplicates = 0
+        self.known_dropped = 0
+
+    def drop(self, df):
+        # Colonne de clé absente : la validation signalera l'erreur de colonne
+        if df.empty or not set(self.key_cols) <= set(df.columns):
+            return df
+        hashes = key_hashes(df, self.key_cols)
+
+        in_known = contains_hashes(self.known, hashes)
+        repeated = pd.Index(hashes).duplicated() | contains_hashes(self.seen, hashes)
+        keep = ~in_known & ~repeated
+
+        self.known_dropped += int(in_known.sum())
+        self.duplicates += int((repeated & ~in_known).sum())
+        # Nouvelles clés toutes distinctes : insertion triée, sans retrier l'ensemble
+        new = np.sort(hashes[keep])
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, new), new)
+        return df[keep] if not keep.all() else df
+
+
+def fetch_known_keys(engine, table_name, key_cols, schema="public", batch_rows=100_000):
+    """Empreintes triées des clés complètes déjà présentes en base."""
+    query = sql.SQL("SELECT {} FROM {} WHERE {}").format(
+        sql.SQL(", ").join(sql.SQL("{}::text").format(sql.Identifier(c)) for c in key_cols),
+        sql.Identifier(schema, table_name),
+        sql.SQL(" AND ").join(sql.SQL("{} IS NOT NULL").format(sql.Identifier(c)) for c in key_cols),
+    )
+
+    chunks = []
+    with engine.begin() as conn:
+        raw_conn = conn.connection.driver_connection
+        # Curseur côté serveur : les clés arrivent par paquets et ne sont
+        # gardées que sous forme d'empreintes
+        with raw_conn.cursor(name=f"_keys_{table_name}") as cur:
+            cur.execute(query)
+            while True:
+                rows = cur.fetchmany(batch_rows)
+                add_round_trips()
+                if not rows:
+                    break
+                frame = pd.DataFrame(rows, columns=key_cols, dtype="string")
+                chunks.append(key_hashes(frame, key_cols))
+
+    return sorted_unique(np.concatenate(chunks)) if chunks else _EMPTY
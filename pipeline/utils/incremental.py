@@ -0,0 +1,156 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from pipeline.utils.dedup import key_hashes, text_hashes
+
+# -----------------------------
+# Ingestion incrémentale
+# -----------------------------
+# Par table on conserve :
+#   - {table}.npz  : empreinte de la clé métier -> empreinte du contenu brut
+#   - {table}.json : watermark (max de la colonne de suivi) et métadonnées
+# Une ligne brute n'est retraitée que si sa clé est inconnue ou si son
+# contenu a changé depuis le dernier chargement réussi.
+# Les empreintes portent sur les valeurs en texte normalisé (voir
+# dedup.text_hashes) : elles ne dépendent ni de la taille des blocs ni du
+# mode. Une clé incomplète (numero_ordre NULL) est remplacée par l'empreinte
+# de la ligne entière : ces lignes ne s'écrasent pas entre elles.
+
+STATE_DIR = "pipeline/data/.incremental"
+
+# Incrémenté quand le calcul des empreintes change : un état d'une version
+# antérieure est ignoré (un chargement complet, puis de nouveau incrémental)
+FINGERPRINT_VERSION = 3
+
+
+def row_fingerprints(df, key_cols):
+    return key_hashes(df, key_cols), text_hashes(df)
+
+
+def empty_state():
+    return {
+        "watermark": None,
+        "keys": np.empty(0, dtype="uint64"),
+        "hashes": np.empty(0, dtype="uint64"),
+    }
+
+
+def load_state(name, state_dir=None):
+    state_dir = state_dir or STATE_DIR
+    npz_path = os.path.join(state_dir, f"{name}.npz")
+    json_path = os.path.join(state_dir, f"{name}.json")
+
+    if not (os.path.exists(npz_path) and os.path.exists(json_path)):
+        return empty_state()
+
+    with np.load(npz_path) as data:
+        keys, hashes = data["keys"], data["hashes"]
+
+    with open(json_path, "r") as f:
+        meta = json.load(f)
+    if meta.get("fingerprint") != FINGERPRINT_VERSION:
+        return empty_state()
+
+    return {"watermark": meta["watermark"], "keys": keys, "hashes": hashes}
+
+
+def _max_watermark(*values):
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+
+def _column_max(df, col):
+    if col is None or col not in df.columns:
+        return None
+    value = df[col].dropna().max() if not df.empty else None
+    if value is None or pd.isna(value):
+        return None
+    # types natifs pour la sérialisation JSON
+    return value.item() if hasattr(value, "item") else value
+
+
+def filter_changed(df, state, key_cols, watermark_col=None):
+    """
+    Retourne (lignes nouvelles ou modifiées, empreintes en attente).
+    Les empreintes ne sont enregistrées qu'après un chargement réussi
+    (voir commit_state).
+    """
+    keys, hashes = row_fingerprints(df, key_cols)
+
+    pos = pd.Index(state["keys"]).get_indexer(keys)
+    known = pos >= 0
+    unchanged = np.zeros(len(df), dtype=bool)
+    unchanged[known] = state["hashes"][pos[known]] == hashes[known]
+
+    changed = ~unchanged
+    pending = {
+        "keys": keys[changed],
+        "hashes": hashes[changed],
+        # étiquettes des lignes brutes : voir forget_rows
+        "index": df.index[changed].to_numpy(),
+        "watermark": _column_max(df[changed], watermark_col),
+        "new": int((~known).sum()),
+        "modified": int((known & changed).sum()),
+    }
+    return df[changed].copy(), pending
+
+
+def merge_pending(pendings):
+    # Regroupe les empreintes de plusieurs blocs (mode streaming)
+    pendings = list(pendings) or [dict(empty_state(), index=np.empty(0, dtype="int64"), new=0, modified=0)]
+
+    return {
+        "keys": np.concatenate([p["keys"] for p in pendings]),
+        "hashes": np.concatenate([p["hashes"] for p in pendings]),
+        "index": np.concatenate([p["index"] for p in pendings]),
+        "watermark": _max_watermark(*(p["watermark"] for p in pendings)),
+        "new": sum(p["new"] for p in pendings),
+        "modified": sum(p["modified"] for p in pendings),
+    }
+
+
+def forget_rows(pending, labels):
+    """
+    Empreintes en attente sans celles des lignes `labels` (écartées avant le
+    chargement sans être conservées ailleurs) : elles seront retraitées.
+    """
+    if len(labels) == 0:
+        return pending
+    keep = ~pd.Index(pending["index"]).isin(labels)
+    return dict(
+        pending,
+        keys=pending["keys"][keep],
+        hashes=pending["hashes"][keep],
+        index=pending["index"][keep],
+    )
+
+
+def commit_state(name, state, pending, state_dir=None):
+    state_dir = state_dir or STATE_DIR
+    keys = np.concatenate([state["keys"], pending["keys"]])
+    hashes = np.concatenate([state["hashes"], pending["hashes"]])
+
+    # Une seule empreinte par clé : la plus récente l'emporte
+    keep = ~pd.Index(keys).duplicated(keep="last")
+    new_state = {
+        "watermark": _max_watermark(state["watermark"], pending["watermark"]),
+        "keys": keys[keep],
+        "hashes": hashes[keep],
+    }
+
+    os.makedirs(state_dir, exist_ok=True)
+    np.savez(os.path.join(state_dir, f"{name}.npz"), keys=new_state["keys"], hashes=new_state["hashes"])
+
+    with open(os.path.join(state_dir, f"{name}.json"), "w") as f:
+        json.dump({
+            "watermark": new_state["watermark"],
+            "fingerprint": FINGERPRINT_VERSION,
+            "rows": int(len(new_state["keys"])),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }, f, indent=4)
+
+    return new_state
@@ -0,0 +1,166 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ============================
+# Instrumentation des exécutions du pipeline
+# ============================
+# Chaque étape (stage, table) cumule : nombre d'appels, temps mur, lignes,
+# octets lus, allers-retours base et pic de mémoire (RSS) du processus.
+# En mode parallèle les allers-retours sont attribués à l'étape en cours
+# sur l'ensemble du processus : ce sont des ordres de grandeur.
+
+REPORT_DIR = "pipeline/data/reports"
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko sous Linux
+    divisor = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class RunRecorder:
+
+    def __init__(self, argv=None):
+        self.argv = list(argv or [])
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = {}
+        self.counters = {}
+        self.db_round_trips = 0
+        self._lock = threading.Lock()
+
+    def add_round_trips(self, count=1):
+        with self._lock:
+            self.db_round_trips += count
+
+    def add_count(self, name, count):
+        # Compteurs libres du rapport (ex. dates non reconnues)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(count)
+
+    def attach_engine(self, engine):
+        # Chaque requête SQLAlchemy envoyée compte pour un aller-retour
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        if not isinstance(engine, Engine):
+            return
+
+        def _count(*args, **kwargs):
+            self.add_round_trips()
+
+        event.listen(engine, "before_cursor_execute", _count)
+
+    @contextmanager
+    def stage(self, name, table=None):
+        metrics = {"rows": 0, "bytes_read": 0}
+        round_trips = self.db_round_trips
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self.stages.setdefault((name, table), {
+                    "stage": name,
+                    "table": table,
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "rows": 0,
+                    "bytes_read": 0,
+                    "db_round_trips": 0,
+                    "peak_rss_mb": None,
+                })
+                entry["calls"] += 1
+                entry["seconds"] += elapsed
+                entry["rows"] += int(metrics["rows"])
+                entry["bytes_read"] += int(metrics["bytes_read"])
+                entry["db_round_trips"] += self.db_round_trips - round_trips
+                entry["peak_rss_mb"] = peak_rss_mb()
+
+    def report(self):
+        stages = []
+        for entry in self.stages.values():
+            entry = dict(entry)
+            entry["seconds"] = round(entry["seconds"], 4)
+            entry["rows_per_s"] = (
+                round(entry["rows"] / entry["seconds"], 1) if entry["seconds"] > 0 else None
+            )
+            stages.append(entry)
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round((datetime.now(timezone.utc) - self.started_at).total_seconds(), 3),
+            "argv": self.argv,
+            "peak_rss_mb": peak_rss_mb(),
+            "db_round_trips": self.db_round_trips,
+            "counters": dict(self.counters),
+            "stages": stages,
+        }
+
+    def report_path(self, report_dir=None, suffix=".json"):
+        report_dir = report_dir or REPORT_DIR
+        os.makedirs(report_dir, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%dT%H%M%SZ")
+        return os.path.join(report_dir, f"run_{stamp}{suffix}")
+
+    def write_report(self, report_dir=None, status="ok"):
+        path = self.report_path(report_dir)
+        with open(path, "w") as f:
+            json.dump(dict(self.report(), status=status), f, indent=4, default=str)
+        return path
+
+
+# Enregistreur de l'exécution courante (remplacé à chaque start_run)
+_current = RunRecorder()
+
+
+def start_run(argv=None):
+    global _current
+    _current = RunRecorder(argv)
+    return _current
+
+
+def current_run():
+    return _current
+
+
+@contextmanager
+def isolated_run():
+    # Enregistreur propre à une tâche (processus du pool), l'ancien est
+    # rétabli à la sortie : ses compteurs sont renvoyés au processus parent
+    global _current
+    previous, _current = _current, RunRecorder()
+    try:
+        yield _current
+    finally:
+        _current = previous
+
+
+def stage(name, table=None):
+    return _current.stage(name, table)
+
+
+def file_size(path):
+    # Octets lus sur disque (0 si le fichier n'existe pas, ex. lecture simulée)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def add_round_trips(count=1):
+    _current.add_round_trips(count)
+
+
+def add_count(name, count):
+    _current.add_count(name, count)
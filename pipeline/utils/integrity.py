@@ -0,0 +1,41 @@
+import numpy as np
+
+from pipeline.utils.dedup import key_hashes, sorted_unique, contains_hashes
+
+# -----------------------------
+# Intégrité référentielle avant chargement
+# -----------------------------
+# flotteurs et resultats_humain référencent operation (operation_id). Une
+# ligne orpheline fait échouer tout le paquet qui la contient : on la repère
+# avant l'envoi, par jointure sur empreintes entre les clés des lignes
+# enfants et l'union des clés parentes déjà en base (une seule lecture en
+# masse, voir dedup.fetch_known_keys) et de celles en cours de chargement.
+
+
+class ParentKeys:
+    """Empreintes triées des clés d'une table parente."""
+
+    def __init__(self, key_cols, known=None):
+        self.key_cols = list(key_cols)
+        self.hashes = sorted_unique(known) if known is not None else np.empty(0, dtype="uint64")
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, df):
+        # Lignes parentes chargées pendant cette exécution
+        if df is None or df.empty:
+            return
+        new = key_hashes(df, self.key_cols)
+        self.hashes = sorted_unique(np.concatenate([self.hashes, new]))
+
+    def split_orphans(self, df):
+        """(lignes dont la clé parente existe, lignes orphelines)."""
+        if df.empty or not set(self.key_cols) <= set(df.columns):
+            return df, df.iloc[0:0]
+        # Clé étrangère NULL : pas de contrôle côté PostgreSQL non plus
+        complete = df[self.key_cols].notna().all(axis=1).to_numpy()
+        orphan = ~contains_hashes(self.hashes, key_hashes(df, self.key_cols)) & complete
+        if not orphan.any():
+            return df, df.iloc[0:0]
+        return df[~orphan], df[orphan]
@@ -0,0 +1,70 @@
+import io
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from pipeline.utils.csv_reader import read_csv
+
+# -----------------------------
+# Découpage des CSV en partitions d'octets
+# -----------------------------
+# Chaque partition commence au début d'une ligne et finit à la fin d'une
+# ligne : un processus peut la lire (en-tête + octets) sans voir le reste du
+# fichier. Hypothèse : aucun retour à la ligne dans un champ entre guillemets
+# (vrai pour les exports SECMAR).
+
+MIN_PARTITION_BYTES = 1 << 20
+
+
+def byte_partitions(path, n_parts):
+    """Retourne [(début, fin)] en octets, alignés sur les lignes, en-tête exclu."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        header_end = f.tell()
+
+        bounds = [header_end]
+        for k in range(1, n_parts):
+            target = header_end + (size - header_end) * k // n_parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            # Fin de la ligne en cours : la partition suivante commence après
+            f.readline()
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+        bounds.append(size)
+
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def partition_count(path, workers, per_worker=4):
+    # Plusieurs partitions par processus pour équilibrer la charge,
+    # sans descendre sous MIN_PARTITION_BYTES
+    return max(1, min(workers * per_worker, os.path.getsize(path) // MIN_PARTITION_BYTES))
+
+
+def read_partition(path, start, end, usecols=None, dtype=None):
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(end - start)
+    return read_csv(io.BytesIO(header + data), usecols=usecols, dtype=dtype)
+
+
+def concat_partitions(frames):
+    """
+    Concatène les partitions dans l'ordre. Les catégories (profil compact)
+    diffèrent d'une partition à l'autre : on les unifie pour ne pas
+    retomber en object.
+    """
+    frames = list(frames)
+    if len(frames) > 1:
+        for col in frames[0].columns:
+            if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+                categories = union_categoricals([df[col] for df in frames]).categories
+                for df in frames:
+                    df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(frames)
@@ -0,0 +1,147 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+from sqlalchemy import text
+
+from pipeline.utils.instrumentation import add_count
+
+# -----------------------------
+# Quarantaine des lignes invalides
+# -----------------------------
+# Au lieu de faire échouer toute la table, la validation écarte les lignes
+# fautives : les lignes valides sont chargées, les autres sont écrites avec
+# leur motif dans {QUARANTINE_DIR}/{table}.csv (fichier de travail, à corriger
+# puis réinjecter) et dans la table SQL `quarantine` (historique consultable).
+# Les erreurs de colonne (colonne absente, mauvais type) ne se rattachent à
+# aucune ligne : elles font toujours échouer la table.
+
+QUARANTINE_DIR = "pipeline/data/quarantine"
+QUARANTINE_TABLE = "quarantine"
+REASON_COL = "motif"
+
+
+def split_failure_cases(df, failure_cases):
+    """
+    Sépare df selon les cas d'échec Pandera.
+    Retourne (lignes valides, lignes rejetées avec REASON_COL), ou None si
+    un échec ne se rattache à aucune ligne.
+    """
+    if failure_cases["index"].isna().any():
+        return None
+
+    labels = pd.Index(failure_cases["index"]).astype(df.index.dtype)
+    reasons = (
+        failure_cases["column"].astype(str) + ":" + failure_cases["check"].astype(str)
+    ).groupby(labels.to_numpy()).agg(lambda s: "; ".join(dict.fromkeys(s)))
+    return split_rows(df, reasons)
+
+
+def split_rows(df, reasons):
+    # reasons : motif par étiquette d'index des lignes fautives
+    bad = df.index.isin(reasons.index)
+    rejected = df[bad].copy()
+    rejected[REASON_COL] = reasons.reindex(rejected.index).to_numpy()
+    return df[~bad], rejected
+
+
+def row_keys(df, key_cols):
+    # Clé métier lisible ("123" ou "123|1") pour retrouver la ligne en base
+    keys = [df[col].astype(str) for col in key_cols if col in df.columns]
+    if not keys:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    result = keys[0]
+    for key in keys[1:]:
+        result = result + "|" + key
+    return result
+
+
+class Quarantine:
+
+    def __init__(self, root=None, engine=None, key_cols=None):
+        self.root = root or QUARANTINE_DIR
+        self.engine = engine
+        self.key_cols = key_cols or {}
+        self.counts = {}
+        self._taken_at = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        # Stable d'une exécution à l'autre : entre dans les clés de reprise
+        return f"Quarantine({self.root!r})"
+
+    def path(self, table):
+        return os.path.join(self.root, f"{table}.csv")
+
+    def add(self, table, rejected):
+        """Écrit les lignes rejetées (avec REASON_COL) : fichier puis base."""
+        if rejected.empty:
+            return
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            path = self.path(table)
+            rejected.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+            self.counts[table] = self.counts.get(table, 0) + len(rejected)
+        add_count(f"quarantaine:{table}", len(rejected))
+
+        if self.engine is not None:
+            self._insert(table, rejected)
+
+    def _insert(self, table, rejected):
+        lines = rejected.drop(columns=[REASON_COL]).to_json(
+            orient="records", lines=True, date_format="iso"
+        ).splitlines()
+        keys = row_keys(rejected, self.key_cols.get(table, []))
+        records = [
+            {"table_name": table, "cle": key, "motif": reason, "ligne": line}
+            for key, reason, line in zip(keys, rejected[REASON_COL], lines)
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {QUARANTINE_TABLE} (table_name, cle, motif, ligne) "
+                    "VALUES (:table_name, :cle, :motif, CAST(:ligne AS JSONB))"
+                ),
+                records,
+            )
+
+    # -----------------------------
+    # Réinjection
+    # -----------------------------
+
+    def take(self, table):
+        """
+        Lignes en quarantaine à réinjecter (sans REASON_COL), ou None.
+        Le fichier est mis de côté jusqu'à release : une réinjection
+        interrompue est reprise au prochain appel.
+        """
+        path, taken = self.path(table), self.path(table) + ".reinjection"
+        frames = [pd.read_csv(p) for p in (taken, path) if os.path.exists(p)]
+        if not frames:
+            return None
+
+        df = pd.concat(frames, ignore_index=True)
+        df.to_csv(taken, index=False)
+        if os.path.exists(path):
+            os.remove(path)
+        self._taken_at[table] = datetime.now(timezone.utc)
+        return df.drop(columns=[REASON_COL])
+
+    def release(self, table, taken):
+        """
+        Fin de réinjection réussie : les lignes reprises quittent la table
+        `quarantine` (celles de nouveau rejetées viennent d'y être réécrites).
+        """
+        taken_at = self._taken_at.pop(table)
+        if self.engine is not None:
+            keys = row_keys(taken, self.key_cols.get(table, [])).dropna().unique().tolist()
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f"DELETE FROM {QUARANTINE_TABLE} WHERE table_name = :table_name "
+                        "AND cle = ANY(:cles) AND cree_le < :taken_at"
+                    ),
+                    {"table_name": table, "cles": keys, "taken_at": taken_at},
+                )
+        os.remove(self.path(table) + ".reinjection")
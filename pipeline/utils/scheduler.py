@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def run_stages(stages, max_workers=4):
+    """
+    Exécute un graphe d'étapes dans un pool de threads.
+
+    stages : {nom: (fonction, [dépendances])}. Chaque fonction reçoit en
+    arguments les résultats de ses dépendances, dans l'ordre déclaré, et
+    démarre dès que toutes sont terminées. Retourne {nom: résultat}.
+    La première erreur annule les étapes en attente et est relancée.
+    """
+    unknown = {d for _, deps in stages.values() for d in deps} - set(stages)
+    if unknown:
+        raise ValueError(f"Dépendances inconnues : {sorted(unknown)}")
+
+    results = {}
+    pending = dict(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, (fn, deps) in list(pending.items()):
+                if all(d in results for d in deps):
+                    args = [results[d] for d in deps]
+                    running[pool.submit(fn, *args)] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Dépendances cycliques : {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+
+    return results
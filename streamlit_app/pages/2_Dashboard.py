@@ -1,4 +1,8 @@
 from utils.auth_ui import render_auth_widget
+from utils.dashboard import (
+    DASHBOARD_TABLES, MAP_ZOOM_LEVELS, cell_bbox, dashboard_filters, dashboard_stats, map_cells,
+)
+from utils.db import cached_query
 
 # Cela affiche le bouton "Déconnexion" si déjà connecté, 
 # ou le formulaire si ce n'est pas le cas.
@@ -8,7 +12,6 @@ import streamlit as st
 from supabase import create_client
 from dotenv import load_dotenv
 import os
-import pandas as pd
 import matplotlib.pyplot as plt
 
 # -------------------------
@@ -25,54 +28,31 @@ supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 # -------------------------
 st.title("📊 Dashboard – Opérations de secours")
 
-# -------------------------
-# Chargement des données
-# -------------------------
-def load_table(name):
-    return pd.DataFrame(supabase.table(name).select("*").execute().data)
-
-df_op = load_table("operation")
-df_fl = load_table("flotteurs")
-df_res = load_table("resultats_humain")
-
 # -------------------------
 # Filtres
 # -------------------------
-st.sidebar.header("🔎 Filtres")
+# Les agrégats sont calculés en base (support_tools/sql_scripts/dashboard.sql) :
+# aucune table n'est téléchargée, seuls les résultats des filtres transitent.
+# Résultats en cache jusqu'au prochain chargement ou écriture CRUD
+filters = cached_query(("dashboard_filtres",), DASHBOARD_TABLES, lambda: dashboard_filters(supabase))
 
-# Années
-if "date_heure_reception_alerte" in df_op.columns:
-    df_op["year"] = df_op["date_heure_reception_alerte"].astype(str).str[:4]
-    years = sorted(df_op["year"].dropna().unique())
-else:
-    years = []
-
-year_filter = st.sidebar.selectbox("Année", ["Toutes"] + years)
-
-# Département
-dept_filter = st.sidebar.selectbox(
-    "Département",
-    ["Tous"] + sorted(df_op["departement"].dropna().unique())
-)
+st.sidebar.header("🔎 Filtres")
 
-# Type d'opération
-type_filter = st.sidebar.selectbox(
-    "Type d'opération",
-    ["Tous"] + sorted(df_op["type_operation"].dropna().unique())
+year_filter = st.sidebar.selectbox("Année", ["Toutes"] + filters["annees"])
+dept_filter = st.sidebar.selectbox("Département", ["Tous"] + filters["departements"])
+type_filter = st.sidebar.selectbox("Type d'opération", ["Tous"] + filters["types"])
+
+selection = {
+    "annee": None if year_filter == "Toutes" else int(year_filter),
+    "departement": None if dept_filter == "Tous" else dept_filter,
+    "type_operation": None if type_filter == "Tous" else type_filter,
+}
+selection_key = tuple(selection.values())
+stats = cached_query(
+    ("dashboard_stats",) + selection_key, DASHBOARD_TABLES,
+    lambda: dashboard_stats(supabase, **selection),
 )
 
-# Application des filtres
-df_filtered = df_op.copy()
-
-if year_filter != "Toutes":
-    df_filtered = df_filtered[df_filtered["year"] == year_filter]
-
-if dept_filter != "Tous":
-    df_filtered = df_filtered[df_filtered["departement"] == dept_filter]
-
-if type_filter != "Tous":
-    df_filtered = df_filtered[df_filtered["type_operation"] == type_filter]
-
 # -------------------------
 # Section KPI
 # -------------------------
@@ -81,44 +61,29 @@ st.header("📌 Indicateurs clés")
 col1, col2, col3, col4 = st.columns(4)
 
 # KPI 1 : Nombre d'opérations
-col1.metric("Nombre d'opérations", len(df_filtered))
+col1.metric("Nombre d'opérations", stats["nb_operations"])
 
 # KPI 2 : Durée moyenne
-if "date_heure_fin_operation" in df_filtered.columns:
-    try:
-        df_filtered["start"] = pd.to_datetime(df_filtered["date_heure_reception_alerte"])
-        df_filtered["end"] = pd.to_datetime(df_filtered["date_heure_fin_operation"])
-        df_filtered["duration"] = (df_filtered["end"] - df_filtered["start"]).dt.total_seconds() / 3600
-        col2.metric("Durée moyenne (h)", round(df_filtered["duration"].mean(), 2))
-    except:
-        col2.metric("Durée moyenne (h)", "N/A")
-else:
-    col2.metric("Durée moyenne (h)", "N/A")
+duree = stats.get("duree_moyenne_h")
+col2.metric("Durée moyenne (h)", "N/A" if duree is None else duree)
 
 # KPI 3 : Blessés (%)
-if not df_res.empty and df_res["nombre"].sum() > 0:
-    taux = round((df_res["dont_nombre_blesse"].sum() / df_res["nombre"].sum()) * 100, 2)
-    col3.metric("Blessés (%)", taux)
-else:
-    col3.metric("Blessés (%)", "N/A")
+taux = stats.get("taux_blesses")
+col3.metric("Blessés (%)", "N/A" if taux is None else taux)
 
-# KPI 4 : Météo difficile
-if "vent_force" in df_filtered.columns and "mer_force" in df_filtered.columns:
-    meteo_diff = df_filtered[(df_filtered["vent_force"] >= 7) | (df_filtered["mer_force"] >= 5)]
-    col4.metric("Météo difficile", len(meteo_diff))
-else:
-    col4.metric("Météo difficile", "N/A")
+# KPI 4 : Météo difficile (vent >= 7 ou mer >= 5)
+col4.metric("Météo difficile", stats["meteo_difficile"])
 
 # -------------------------
 # Graphique : répartition des types d'opérations
 # -------------------------
 st.header("📊 Répartition des types d'opérations")
 
-if df_filtered["type_operation"].dropna().empty:
+if stats["types"].empty:
     st.info("Aucune donnée disponible pour ce graphique.")
 else:
     fig, ax = plt.subplots()
-    df_filtered["type_operation"].value_counts().plot(kind="bar", ax=ax)
+    stats["types"].plot(kind="bar", ax=ax)
     ax.set_title("Types d'opérations")
     ax.set_xlabel("Type")
     ax.set_ylabel("Nombre")
@@ -129,11 +94,11 @@ else:
 # -------------------------
 st.header("📍 Opérations par département")
 
-if df_filtered["departement"].dropna().empty:
+if stats["departements"].empty:
     st.info("Aucune donnée disponible pour ce graphique.")
 else:
     fig, ax = plt.subplots()
-    df_filtered["departement"].value_counts().plot(kind="bar", ax=ax, color="orange")
+    stats["departements"].plot(kind="bar", ax=ax, color="orange")
     ax.set_title("Opérations par département")
     st.pyplot(fig)
 
@@ -142,25 +107,68 @@ else:
 # -------------------------
 st.header("🗺️ Carte des opérations")
 
-if "latitude" in df_filtered.columns and "longitude" in df_filtered.columns:
-    df_map = df_filtered[["latitude", "longitude"]].dropna()
-    if not df_map.empty:
-        st.map(df_map)
-    else:
-        st.info("Pas de coordonnées disponibles.")
+# Mailles calculées en base : une ligne par maille visible, quel que soit le
+# nombre d'opérations ; points individuels quand la fenêtre en compte peu.
+# Vue courante : (zoom, fenêtre) ; une pile permet de revenir en arrière.
+views = st.session_state.setdefault("map_views", [])
+if st.session_state.get("map_selection") != selection:
+    # Nouveaux filtres : retour à la vue d'ensemble
+    views.clear()
+    st.session_state.pop("map_cell_0", None)
+    st.session_state["map_selection"] = selection
+
+if views:
+    zoom, bbox = views[-1]
+else:
+    zoom = st.select_slider("Niveau de zoom", options=list(range(MAP_ZOOM_LEVELS)), value=1)
+    bbox = None
+
+df_map = cached_query(
+    ("dashboard_carte", zoom, bbox) + selection_key, ["operation"],
+    lambda: map_cells(supabase, zoom=zoom, bbox=bbox, **selection),
+)
+
+if df_map.empty:
+    st.info("Pas de coordonnées disponibles.")
 else:
-    st.info("Colonnes latitude/longitude manquantes.")
+    st.map(df_map, latitude="latitude", longitude="longitude", size="size")
+    if df_map.attrs["mode"] == "points":
+        st.caption(f"{df_map.attrs['total']} opération(s) dans cette zone (détail).")
+    else:
+        st.caption(
+            f"{df_map.attrs['total']} opération(s) en {len(df_map)} maille(s) "
+            f"de {df_map.attrs['taille']:g}°."
+        )
+
+        # Détail : zoom sur une des mailles les plus chargées
+        top = df_map.head(20)
+        labels = [
+            f"{row.latitude:.2f}, {row.longitude:.2f} ({row.nb} opérations)"
+            for row in top.itertuples()
+        ]
+        picked = st.selectbox("Zoomer sur une maille", ["—"] + labels, key=f"map_cell_{len(views)}")
+        if picked != "—":
+            row = top.iloc[labels.index(picked)]
+            next_zoom = min(zoom + 2, MAP_ZOOM_LEVELS - 1)
+            views.append((next_zoom, cell_bbox(row.latitude, row.longitude, df_map.attrs["taille"])))
+            st.rerun()
+
+if views and st.button("⬅️ Vue précédente"):
+    views.pop()
+    # Choix de maille de la vue retrouvée : remis à zéro
+    st.session_state.pop(f"map_cell_{len(views)}", None)
+    st.rerun()
 
 # -------------------------
 # Analyse flotteurs
 # -------------------------
 st.header("🛟 Analyse des flotteurs")
 
-if df_fl["type_flotteur"].dropna().empty:
+if stats["flotteurs"].empty:
     st.info("Aucun flotteur enregistré.")
 else:
     fig, ax = plt.subplots()
-    df_fl["type_flotteur"].value_counts().plot(kind="bar", ax=ax, color="green")
+    stats["flotteurs"].plot(kind="bar", ax=ax, color="green")
     ax.set_title("Types de flotteurs utilisés")
     st.pyplot(fig)
 
@@ -169,17 +177,17 @@ else:
 # -------------------------
 st.header("🧍 Résultats humains")
 
-if df_res.empty:
+if not stats["nb_resultats"]:
     st.info("Aucun résultat humain enregistré.")
 else:
     colA, colB = st.columns(2)
-    colA.metric("Total sauvés", df_res["nombre"].sum())
-    colB.metric("Total blessés", df_res["dont_nombre_blesse"].sum())
+    colA.metric("Total sauvés", stats["total_personnes"])
+    colB.metric("Total blessés", stats["total_blesses"])
 
-    if df_res["categorie_personne"].dropna().empty:
+    if stats["categories"].empty:
         st.info("Aucune catégorie disponible.")
     else:
         fig, ax = plt.subplots()
-        df_res["categorie_personne"].value_counts().plot(kind="bar", ax=ax, color="red")
+        stats["categories"].plot(kind="bar", ax=ax, color="red")
         ax.set_title("Catégories de personnes")
-        st.pyplot(fig)
\ No newline at end of file
+        st.pyplot(fig)
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import random
 from datetime import datetime
-from utils.db import fetch_data, insert_row, update_row, delete_row
+from utils.db import fetch_data, fetch_table, insert_row, update_row, delete_row
 from utils.auth_ui import render_auth_widget 
 
 # --------------------
@@ -74,8 +74,7 @@ pk = TABLE_KEYS[selected_table]
 # Chargement des données
 # --------------------
 try:
-    raw_data = fetch_data(selected_table, order_by=pk[0])
-    df = pd.DataFrame(raw_data)
+    df = fetch_table(selected_table, order_by=pk[0])
     
     for col in df.columns:
         if df[col].dtype == "object":
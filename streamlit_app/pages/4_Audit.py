@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.db import get_supabase_client
+from utils.db import fetch_table
 import pandas as pd
 import json
 import os
@@ -13,14 +13,12 @@ user = render_auth_widget()
 
 st.title("🔍 Audit des Données – Historique & Qualité")
 
-supabase = get_supabase_client()
-
 # ---------------------------------------------------------
 # 1) Charger les tables
 # ---------------------------------------------------------
 def load_table(name):
-    response = supabase.table(name).select("*").execute()
-    return pd.DataFrame(response.data)
+    # Servi depuis le cache partagé tant que la table n'a pas changé
+    return fetch_table(name)
 
 tables = {
     "operation": load_table("operation"),
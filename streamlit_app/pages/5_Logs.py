@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import json
-from utils.db import fetch_data
+from utils.db import load_columns
 from utils.auth_ui import render_auth_widget
 
 # --------------------
@@ -23,16 +23,20 @@ Cette page recense toutes les actions effectuées sur la base de données (Ajout
 try:
     # On récupère les logs triés par date décroissante (le plus récent en premier)
     # Note : Assure-toi que la table s'appelle bien 'user_logs' dans ta BDD
-    logs_data = fetch_data("user_logs", order_by="created_at")
+    # Colonnes affichées seulement ; created_at arrive déjà en datetime
+    df_logs = load_columns(
+        "user_logs",
+        ["created_at", "user_email", "action_type", "table_name", "record_id", "details"],
+        order_by="created_at",
+    )
     
-    if not logs_data:
+    if df_logs.empty:
         st.info("Aucun log n'a encore été enregistré.")
     else:
-        df_logs = pd.DataFrame(logs_data)
 
         # 1. Nettoyage et Formatage
-        # Conversion de la colonne created_at en datetime local
-        df_logs["created_at"] = pd.to_datetime(df_logs["created_at"]).dt.strftime('%d/%m/%Y %H:%M:%S')
+        # Formatage de la date (déjà décodée au chargement)
+        df_logs["created_at"] = df_logs["created_at"].dt.strftime('%d/%m/%Y %H:%M:%S')
 
         # 2. Filtres en haut de page
         st.write("### 🔍 Filtres")
@@ -12,6 +12,7 @@ import pandas as pd
 import altair as alt
 
 from utils.auth_ui import render_auth_widget
+from utils.db import bump_data_version, cached_query
 
 # -------------------------
 # Authentification
@@ -32,6 +33,16 @@ supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
 # Client admin pour les opérations RPC
 supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
+# Les vues graph_* ne changent qu'au rafraîchissement : clé de cache dédiée
+GRAPH_VERSION = "graph_operations"
+
+
+def load_graph(function_name):
+    return cached_query(
+        ("rpc", function_name), [GRAPH_VERSION],
+        lambda: supabase.rpc(function_name).execute().data,
+    )
+
 # -------------------------
 # UI
 # -------------------------
@@ -43,16 +54,18 @@ st.title("📈 Visualisations des opérations")
 if st.button("🔄 Rafraîchir les données"):
     try:
         supabase_admin.rpc("refresh_graph_operations").execute()
+        # Vues recalculées : les graphiques en cache sont périmés
+        bump_data_version(GRAPH_VERSION)
         st.success("✅ Les données ont été rafraîchies côté Supabase !")
 
         # Recharger immédiatement les données pour les graphiques
-        data_type = supabase.rpc("graph_operations_par_type").execute().data
+        data_type = load_graph("graph_operations_par_type")
         df_type = pd.DataFrame(data_type)
 
-        data_dep = supabase.rpc("graph_operations_par_departement").execute().data
+        data_dep = load_graph("graph_operations_par_departement")
         df_dep = pd.DataFrame(data_dep)
 
-        data_flot = supabase.rpc("graph_resultat_flotteurs").execute().data
+        data_flot = load_graph("graph_resultat_flotteurs")
         df_flot = pd.DataFrame(data_flot)
 
     except Exception as e:
@@ -64,7 +77,7 @@ if st.button("🔄 Rafraîchir les données"):
 # -------------------------
 st.subheader("Répartition des opérations par type")
 try:
-    data_type = supabase.rpc("graph_operations_par_type").execute().data
+    data_type = load_graph("graph_operations_par_type")
     df_type = pd.DataFrame(data_type)
 
     if not df_type.empty:
@@ -84,7 +97,7 @@ except Exception as e:
 # -------------------------
 st.subheader("Opérations par département")
 try:
-    data_dep = supabase.rpc("graph_operations_par_departement").execute().data
+    data_dep = load_graph("graph_operations_par_departement")
     df_dep = pd.DataFrame(data_dep)
 
     if not df_dep.empty:
@@ -104,7 +117,7 @@ except Exception as e:
 # -------------------------
 st.subheader("Résultat des flotteurs")
 try:
-    data_flot = supabase.rpc("graph_resultat_flotteurs").execute().data
+    data_flot = load_graph("graph_resultat_flotteurs")
     df_flot = pd.DataFrame(data_flot)
 
     if not df_flot.empty:
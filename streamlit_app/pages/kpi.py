@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 import os
 
 from utils.auth_ui import render_auth_widget
+from utils.db import bump_data_version, cached_query
 
 # -------------------------
 # Auth
@@ -24,6 +25,14 @@ supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
 # Client admin pour recalculer les KPI
 supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
+
+def load_kpi():
+    # En cache jusqu'au prochain recalcul
+    return cached_query(
+        ("kpi_global",), ["kpi_global"],
+        lambda: supabase.table("kpi_global").select("*").eq("id", 1).execute().data,
+    )
+
 # -------------------------
 # UI
 # -------------------------
@@ -35,9 +44,10 @@ st.title("📊 KPI – Opérations de secours")
 if st.button("🔄 Recalculer les KPI"):
     try:
         supabase_admin.rpc("refresh_kpi_global").execute()
+        bump_data_version("kpi_global")
         st.success("✅ KPIs recalculés")
         # Relire les KPI après recalcul
-        kpi = supabase.table("kpi_global").select("*").eq("id", 1).execute().data
+        kpi = load_kpi()
     except Exception as e:
         st.error(f"❌ Erreur lors du recalcul des KPI : {e}")
 
@@ -46,7 +56,7 @@ if st.button("🔄 Recalculer les KPI"):
 # Lecture KPI
 # -------------------------
 try:
-    kpi = supabase.table("kpi_global").select("*").eq("id", 1).execute().data
+    kpi = load_kpi()
 
     if not kpi:
         st.warning("KPIs non disponibles")
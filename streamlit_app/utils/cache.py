@@ -0,0 +1,171 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# -----------------------------
+# Cache de données partagé entre les pages
+# -----------------------------
+# Une entrée est indexée par (requête, versions des tables lues). La version
+# d'une table est un compteur de la table data_version, incrémenté par le
+# pipeline après un chargement et par les écritures du CRUD : tant qu'il ne
+# bouge pas, la même requête est servie depuis la mémoire ; dès qu'il bouge,
+# la clé change et la requête repart en base.
+#
+# Les versions sont relues au plus une fois toutes les CACHE_VERSION_POLL
+# secondes (une seule petite requête pour toutes les tables). Une écriture
+# faite depuis l'application invalide tout de suite les entrées concernées.
+# Le TTL reste un filet de sécurité (écriture hors pipeline et hors CRUD,
+# table data_version absente). La mémoire est bornée en nombre d'entrées et
+# en octets, avec éviction LRU.
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_MB = 256
+DEFAULT_TTL = 600
+DEFAULT_VERSION_POLL = 2.0
+
+
+def _sizeof(value):
+    # Estimation de l'empreinte mémoire d'une entrée
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    # Les pages modifient leurs DataFrames : chacune reçoit sa copie
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+
+class DataCache:
+    """
+    Cache LRU indexé sur les versions de données des tables lues.
+    version_source(tables) -> {table: version} ; None = versions indisponibles
+    (le TTL seul s'applique alors).
+    """
+
+    def __init__(
+        self,
+        version_source=None,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_MB * 1024 * 1024,
+        ttl=DEFAULT_TTL,
+        version_poll=DEFAULT_VERSION_POLL,
+        clock=time.monotonic,
+    ):
+        self.version_source = version_source
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_poll = version_poll
+        self.clock = clock
+        self._entries = OrderedDict()  # clé -> (valeur, tables, taille, expire_le)
+        self._bytes = 0
+        self._versions = {}
+        self._polled_at = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def versions(self, tables):
+        """Versions courantes des tables, relues au plus toutes les version_poll s."""
+        now = self.clock()
+        with self._lock:
+            fresh = self._polled_at is not None and now - self._polled_at < self.version_poll
+            if fresh and all(t in self._versions for t in tables):
+                return tuple(self._versions[t] for t in tables)
+            # Une seule lecture pour toutes les tables déjà suivies
+            tracked = sorted(set(self._versions) | set(tables))
+        polled = None
+        if self.version_source is not None:
+            try:
+                polled = self.version_source(tracked)
+            except Exception as exc:
+                logging.warning(f"Versions de données indisponibles, TTL seul : {exc}")
+        with self._lock:
+            # table absente de data_version : version None (jamais incrémentée)
+            self._versions = {t: (polled or {}).get(t) for t in tracked}
+            self._polled_at = now
+            return tuple(self._versions.get(t) for t in tables)
+
+    def get(self, key, tables, loader, ttl=None):
+        """Valeur de key pour les versions courantes de tables ; loader() sinon."""
+        tables = tuple(sorted(tables))
+        full_key = (key, tables, self.versions(tables))
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[3] > now:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return _copy(entry[0])
+            if entry is not None:
+                self._discard(full_key)
+            self.misses += 1
+
+        # Chargement hors verrou : les autres sessions ne sont pas bloquées
+        value = loader()
+        size = _sizeof(value)
+        with self._lock:
+            if full_key in self._entries:
+                self._discard(full_key)
+            if size <= self.max_bytes:
+                expires = now + (self.ttl if ttl is None else ttl)
+                self._entries[full_key] = (value, tables, size, expires)
+                self._bytes += size
+                self._evict()
+        return _copy(value)
+
+    def bump(self, *tables):
+        """Écriture faite par l'application : les entrées de ces tables sont périmées."""
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if set(entry[1]) & set(tables)]
+            for key in stale:
+                self._discard(key)
+            # prochaine lecture : versions relues en base
+            self._polled_at = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._versions.clear()
+            self._polled_at = None
+
+    def _discard(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._discard(next(iter(self._entries)))
+
+
+def cache_settings():
+    """
+    Réglages du cache (variables d'environnement CACHE_*).
+    """
+    return {
+        "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        "max_bytes": int(float(os.getenv("CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+        "ttl": float(os.getenv("CACHE_TTL", DEFAULT_TTL)),
+        "version_poll": float(os.getenv("CACHE_VERSION_POLL", DEFAULT_VERSION_POLL)),
+    }
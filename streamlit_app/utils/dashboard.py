@@ -0,0 +1,114 @@
+import pandas as pd
+
+# -----------------------------
+# Agrégats du Dashboard calculés en base
+# -----------------------------
+# Fonctions SQL de support_tools/sql_scripts/dashboard.sql, appelées en RPC :
+# chaque changement de filtre ne transfère que quelques Ko d'agrégats.
+
+# Tables lues par les agrégats : clé de cache (utils/cache.py)
+DASHBOARD_TABLES = ("operation", "flotteurs", "resultats_humain")
+
+
+def dashboard_filters(client):
+    """
+    Valeurs proposées dans les filtres : {"annees", "departements", "types"}.
+    """
+    response = client.rpc("dashboard_filtres").execute()
+    return response.data or {"annees": [], "departements": [], "types": []}
+
+
+def dashboard_stats(client, annee=None, departement=None, type_operation=None):
+    """
+    Indicateurs du Dashboard pour les filtres donnés (None = pas de filtre).
+    Les comptages par valeur sont rendus en Series triées, prêtes pour .plot.
+    """
+    response = client.rpc("dashboard_stats", {
+        "p_annee": annee,
+        "p_departement": departement,
+        "p_type_operation": type_operation,
+    }).execute()
+    stats = dict(response.data or {})
+    for key in ("types", "departements", "categories", "flotteurs"):
+        stats[key] = counts_series(stats.get(key))
+    return stats
+
+
+def counts_series(pairs):
+    """
+    [[valeur, nombre], ...] -> Series nombre indexée par valeur.
+    """
+    pairs = pairs or []
+    return pd.Series(
+        [nb for _, nb in pairs],
+        index=[str(value) for value, _ in pairs],
+        dtype="int64",
+    )
+
+
+# Niveaux de zoom de la carte : maille de MAP_CELL_DEG / 2^zoom degrés
+MAP_CELL_DEG = 8.0
+MAP_ZOOM_LEVELS = 7
+# En dessous de ce nombre d'opérations dans la fenêtre : points individuels
+MAP_DETAIL_MAX = 500
+# Rayon d'un point individuel (mètres)
+MAP_POINT_RADIUS = 300
+
+
+def map_cells(client, zoom=0, bbox=None, annee=None, departement=None, type_operation=None):
+    """
+    Opérations filtrées regroupées en mailles (ou points si peu nombreuses)
+    dans la fenêtre bbox = (lat_min, lat_max, lon_min, lon_max).
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox or (None, None, None, None)
+    response = client.rpc("dashboard_carte", {
+        "p_annee": annee,
+        "p_departement": departement,
+        "p_type_operation": type_operation,
+        "p_zoom": zoom,
+        "p_lat_min": lat_min,
+        "p_lat_max": lat_max,
+        "p_lon_min": lon_min,
+        "p_lon_max": lon_max,
+        "p_detail_max": MAP_DETAIL_MAX,
+    }).execute()
+    return cells_frame(response.data)
+
+
+def cells_frame(payload):
+    """
+    Réponse de dashboard_carte -> DataFrame latitude, longitude, nb, size
+    (rayon en mètres, proportionnel à la racine du nombre d'opérations).
+    Attributs : mode ("mailles" ou "points"), taille (degrés), total.
+    """
+    payload = payload or {}
+    cells = payload.get("mailles") or []
+    df = pd.DataFrame(
+        [row[:3] for row in cells], columns=["latitude", "longitude", "nb"]
+    ).astype({"latitude": "float64", "longitude": "float64", "nb": "int64"})
+    if cells and len(cells[0]) > 3:
+        df["operation_id"] = [row[3] for row in cells]
+
+    mode = payload.get("mode", "mailles")
+    size_deg = float(payload.get("taille") or MAP_CELL_DEG)
+    if mode == "points":
+        df["size"] = MAP_POINT_RADIUS
+    else:
+        # Plus grosse maille : un demi-côté de maille (1° ~ 111 km)
+        largest = max(int(df["nb"].max()), 1) if not df.empty else 1
+        df["size"] = (df["nb"] / largest) ** 0.5 * size_deg * 111_000 / 2
+    df.attrs.update(
+        mode=mode,
+        taille=size_deg,
+        total=int(payload.get("total") or 0),
+    )
+    return df
+
+
+def cell_bbox(latitude, longitude, size_deg):
+    """
+    Fenêtre (lat_min, lat_max, lon_min, lon_max) de la maille centrée en
+    (latitude, longitude).
+    """
+    half = size_deg / 2
+    return (latitude - half, latitude + half, longitude - half, longitude + half)
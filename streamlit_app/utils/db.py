@@ -1,9 +1,18 @@
+import logging
 import os
-from typing import List, Dict, Optional, Any, Union
+import threading
+from typing import Callable, Iterable, List, Dict, Optional, Any, Union
 
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+import pandas as pd
+
+from utils import pagination
+# utils.helpers met la racine du projet sur le path (types du pipeline)
+from utils.helpers import apply_dtypes, column_types
+from utils.cache import DataCache, cache_settings
+
 def get_supabase_client() -> Client:
     """
     Initialise et retourne un client Supabase.
@@ -21,6 +30,99 @@ def get_supabase_client() -> Client:
     return create_client(url, key)
 
 
+# --------------------
+# Cache partagé (voir utils/cache.py)
+# --------------------
+def _data_versions(tables: List[str]) -> Dict[str, int]:
+    """
+    Versions courantes des tables (table data_version), en une requête.
+    """
+    response = (
+        get_supabase_client()
+        .table("data_version")
+        .select("table_name,version")
+        .in_("table_name", list(tables))
+        .execute()
+    )
+    return {row["table_name"]: row["version"] for row in response.data or []}
+
+
+# Tables vidées par ON DELETE CASCADE (script_tables.sql)
+CASCADE_TABLES = {"operation": ["flotteurs", "resultats_humain"]}
+
+data_cache = DataCache(version_source=_data_versions, **cache_settings())
+
+
+def cached_query(key: Any, tables: Iterable[str], loader: Callable[[], Any]) -> Any:
+    """
+    Résultat de loader() servi depuis le cache tant que les tables lues
+    n'ont pas changé de version.
+    """
+    return data_cache.get(key, tables, loader)
+
+
+def bump_data_version(*tables: str) -> None:
+    """
+    Signale une écriture : version incrémentée en base (autres sessions,
+    autres instances) et entrées locales invalidées tout de suite.
+    """
+    try:
+        get_supabase_client().rpc("bump_data_version", {"p_tables": list(tables)}).execute()
+    except Exception as e:
+        # Les entrées locales sont tout de même invalidées ; le TTL couvre le reste
+        logging.warning(f"bump_data_version indisponible : {e}")
+    data_cache.bump(*tables)
+
+
+# Tri de pagination par défaut : clé primaire (ordre stable entre les pages)
+PAGE_ORDER = {
+    "operation": "operation_id",
+    "flotteurs": "flotteur_id",
+    "resultats_humain": "resultat_id",
+}
+
+_local = threading.local()
+
+
+def _thread_client() -> Client:
+    """
+    Un client par thread de lecture : chaque thread garde sa connexion HTTP.
+    """
+    if getattr(_local, "client", None) is None:
+        _local.client = get_supabase_client()
+    return _local.client
+
+
+def _page_query(table_name: str, columns: str, order_by: Optional[str]) -> Callable:
+    order = [c for c in (order_by, PAGE_ORDER.get(table_name)) if c]
+
+    def make_query(count: bool):
+        query = _thread_client().table(table_name).select(columns, count="exact" if count else None)
+        for col in dict.fromkeys(order):
+            query = query.order(col)
+        return query
+
+    return make_query
+
+
+def fetch_pages(
+    table_name: str,
+    columns: str = "*",
+    limit: Optional[int] = None,
+    order_by: Optional[str] = None,
+    on_page: Optional[Callable[[int, List[Dict]], None]] = None,
+) -> List[List[Dict]]:
+    """
+    Lit la table complète par pages parallèles (voir utils/pagination.py).
+    """
+    return pagination.fetch_pages(
+        _page_query(table_name, columns, order_by),
+        limit=limit,
+        on_page=on_page,
+        **pagination.fetch_settings(),
+    )
+
+
 def fetch_data(
     table_name: str,
     columns: str = "*",
@@ -29,22 +131,63 @@ def fetch_data(
 ) -> List[Dict]:
     """
     Récupère des données avec un tri optionnel pour stabiliser l'affichage.
+    Lecture paginée : le résultat n'est pas tronqué par le max-rows du serveur.
+    Résultat mis en cache jusqu'à la prochaine écriture sur la table.
     """
-    supabase = get_supabase_client()
-    query = supabase.table(table_name).select(columns)
+    return cached_query(
+        ("fetch_data", table_name, columns, limit, order_by),
+        [table_name],
+        lambda: [row for page in fetch_pages(table_name, columns, limit, order_by) for row in page],
+    )
 
-    if order_by:
-        query = query.order(order_by)
-    
-    if limit is not None:
-        query = query.limit(limit)
 
-    response = query.execute()
+def fetch_table(
+    table_name: str,
+    columns: str = "*",
+    limit: Optional[int] = None,
+    order_by: Optional[str] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+    date_cols: Iterable[str] = (),
+    on_page: Optional[Callable[[int, List[Dict]], None]] = None,
+) -> pd.DataFrame:
+    """
+    Comme fetch_data, assemblé directement en DataFrame typé
+    (apply_dtypes du pipeline : dtypes, colonnes date ISO 8601 en UTC).
+    on_page reçoit les pages au fil de l'eau ; la lecture ne passe alors
+    pas par le cache.
+    """
+    dtypes, date_cols = dict(dtypes or {}), tuple(date_cols)
 
-    if response.data is None:
-        raise RuntimeError(f"Supabase fetch error ({table_name})")
+    def load():
+        pages = fetch_pages(table_name, columns, limit, order_by, on_page=on_page)
+        names = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return pagination.pages_frame(
+            pages, columns=names, dtypes=lambda df: apply_dtypes(df, dtypes, date_cols, date_format="ISO8601")
+        )
 
-    return response.data
+    if on_page is not None:
+        return load()
+    # Les types font partie de la clé : la version décodée est mise en cache
+    key = ("fetch_table", table_name, columns, limit, order_by, tuple(dtypes.items()), date_cols)
+    return cached_query(key, [table_name], load)
+
+
+def load_columns(
+    table_name: str,
+    columns: List[str],
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Colonnes déclarées par une page, décodées une seule fois : dates en
+    datetime UTC, nombres et catégories selon le profil de la table
+    (utils/helpers.table_dtypes). Seules ces colonnes sont transférées.
+    """
+    dtypes, date_cols = column_types(table_name, columns)
+    return fetch_table(
+        table_name, ",".join(columns), limit=limit, order_by=order_by,
+        dtypes=dtypes, date_cols=date_cols,
+    )
 
 
 def insert_row(table_name: str, data: Dict) -> Dict:
@@ -57,6 +200,7 @@ def insert_row(table_name: str, data: Dict) -> Dict:
     if not response.data:
         raise RuntimeError(f"Supabase insert error ({table_name})")
 
+    bump_data_version(table_name)
     return response.data[0]
 
 
@@ -90,6 +234,7 @@ def update_row(
     if not response.data:
         raise RuntimeError(f"Supabase update error ({table_name}) - Row not found or error")
 
+    bump_data_version(table_name)
     return response.data[0]
 
 
@@ -116,4 +261,6 @@ def delete_row(
     if response.data is None:
         raise RuntimeError(f"Supabase delete error ({table_name})")
 
+    # ON DELETE CASCADE : les lignes filles disparaissent aussi
+    bump_data_version(table_name, *CASCADE_TABLES.get(table_name, []))
     return response.data
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import sys
+
+# Racine du projet sur le path : les pages partagent les types du pipeline
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.data_types import (
+    apply_dtypes,
+    operations_date_cols,
+    compact_operations_dtypes,
+    compact_flotteurs_dtypes,
+    compact_resultats_humain_dtypes,
+)
+
+COMPACT_TABLE_DTYPES = {
+    "operation": compact_operations_dtypes,
+    "flotteurs": compact_flotteurs_dtypes,
+    "resultats_humain": compact_resultats_humain_dtypes,
+}
+
+
+# Tables de l'application seule (hors pipeline)
+APP_TABLE_DTYPES = {
+    "user_logs": {
+        "user_email": "category",
+        "action_type": "category",
+        "table_name": "category",
+        "record_id": "string",
+    },
+}
+
+TABLE_DATE_COLS = {
+    "operation": operations_date_cols,
+    "user_logs": ["created_at"],
+}
+
+
+def table_dtypes(table_name):
+    """
+    Types d'une table lue en base : profil compact du pipeline.
+    operation_id est laissé tel quel : c'est un VARCHAR côté base.
+    """
+    if table_name in APP_TABLE_DTYPES:
+        return dict(APP_TABLE_DTYPES[table_name])
+    return {
+        col: dtype
+        for col, dtype in COMPACT_TABLE_DTYPES.get(table_name, {}).items()
+        if col != "operation_id"
+    }
+
+
+def column_types(table_name, columns):
+    """
+    (dtypes, date_cols) de la table, restreints aux colonnes demandées.
+    """
+    dtypes = {col: dtype for col, dtype in table_dtypes(table_name).items() if col in columns}
+    date_cols = [col for col in TABLE_DATE_COLS.get(table_name, ()) if col in columns]
+    return dtypes, date_cols
+
+
+def to_compact(df, table_name):
+    """
+    Applique le profil de types compact du pipeline à une table lue en base
+    (catégories, chaînes Arrow, petits entiers).
+    """
+    return apply_dtypes(df, table_dtypes(table_name))
+
+
+def value_counts(series):
+    """
+    value_counts sans les catégories absentes du filtre courant.
+    """
+    counts = series.value_counts()
+    return counts[counts > 0]
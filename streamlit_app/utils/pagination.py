@@ -0,0 +1,77 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+
+import pandas as pd
+
+# -----------------------------
+# Lecture paginée (PostgREST range)
+# -----------------------------
+# Un select PostgREST est plafonné par le max-rows du serveur (1000 par
+# défaut sur Supabase) : au-delà, le résultat est tronqué sans erreur. On lit
+# donc la table par pages range(début, fin) de taille fixe, avec un tri
+# stable. La première page donne le nombre total de lignes (count=exact) ;
+# les suivantes partent en parallèle, au plus FETCH_WORKERS à la fois : la
+# durée dépend du nombre de pages / concurrence, plus de la latence cumulée.
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_WORKERS = 4
+
+
+def fetch_settings():
+    """
+    Réglages de la lecture paginée (variables d'environnement FETCH_*).
+    """
+    return {
+        "page_size": int(os.getenv("FETCH_PAGE_SIZE", DEFAULT_PAGE_SIZE)),
+        "max_workers": int(os.getenv("FETCH_WORKERS", DEFAULT_WORKERS)),
+    }
+
+
+def fetch_pages(make_query, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_WORKERS, limit=None, on_page=None):
+    """
+    Toutes les pages d'une requête, dans l'ordre du tri.
+    make_query(count) -> requête PostgREST triée (count=True : avec le total).
+    on_page(numero, lignes) est appelé à l'arrivée de chaque page.
+    """
+    first = make_query(count=True).range(0, page_size - 1).execute()
+    rows = first.data or []
+    total = first.count if first.count is not None else len(rows)
+    if limit is not None:
+        total = min(total, limit)
+        rows = rows[:total]
+    if on_page:
+        on_page(0, rows)
+
+    # Plafond serveur plus petit que la page demandée : on s'y aligne
+    step = len(rows) if 0 < len(rows) < min(page_size, total) else page_size
+    starts = list(range(step, total, step))
+    pages = [rows] + [None] * len(starts)
+
+    def fetch(start):
+        end = min(start + step, total) - 1
+        return make_query(count=False).range(start, end).execute().data or []
+
+    if starts:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(starts)))) as executor:
+            futures = {executor.submit(fetch, start): i for i, start in enumerate(starts, start=1)}
+            for future in as_completed(futures):
+                number = futures[future]
+                pages[number] = future.result()
+                if on_page:
+                    on_page(number, pages[number])
+
+    received = sum(len(page) for page in pages)
+    if received != total:
+        # Écritures concurrentes pendant la lecture
+        logging.warning(f"Lecture paginée : {received} ligne(s) reçue(s) pour {total} annoncée(s)")
+    return pages
+
+
+def pages_frame(pages, columns=None, dtypes=None):
+    """
+    Pages de lignes JSON -> un seul DataFrame, typé par dtypes(df) si fourni.
+    """
+    df = pd.DataFrame.from_records(list(chain.from_iterable(pages)), columns=columns)
+    return dtypes(df) if dtypes else df
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.main import TABLES, apply_dtypes, validate_df, raw_read_options, VALIDATION_MODES
+from pipeline.utils.csv_reader import read_csv, CSV_ENGINE
+from pipeline.utils.connection import get_engine
+from pipeline.utils.db_utils import insert_dataframe, invalidate_table_cache, LOAD_METHODS
+from support_tools.generate_data import generate_dataset
+
+# ============================================================
+# Banc de mesure du pipeline
+# ============================================================
+# Mesure clean_*, apply_dtypes, validate_df (pandera et fast) et, avec --db,
+# insert_dataframe contre le PostgreSQL de docker-compose (schéma isolé
+# "benchmark"). Chaque exécution est ajoutée à RESULTS_PATH avec le commit
+# courant ; une étape plus lente que la dernière mesure d'un autre commit
+# (même volume, même machine) au-delà du seuil est signalée comme régression.
+
+RESULTS_PATH = "support_tools/benchmarks/results.jsonl"
+BENCH_SCHEMA = "benchmark"
+DEFAULT_THRESHOLD = 0.20
+
+
+# ============================================================
+# Mesures
+# ============================================================
+
+def best_time(fn, repeat):
+    # Meilleur temps sur `repeat` essais (le moins bruité)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def prepare_frame(name, raw):
+    cfg = TABLES[name]
+    df = cfg["clean"](raw.copy())
+    return apply_dtypes(df, cfg["dtypes"], cfg["date_cols"])
+
+
+def bench_tables(data_dir, repeat):
+    timings, rows, frames = {}, {}, {}
+
+    for name, cfg in TABLES.items():
+        path = os.path.join(data_dir, cfg["file"])
+        options = raw_read_options(name, path)
+        timings[f"read_csv:{name}"] = best_time(lambda: pd.read_csv(path, low_memory=False), repeat)
+        # Lecture du pipeline : colonnes du schéma, moteur pyarrow si disponible
+        timings[f"read_csv[{CSV_ENGINE}]:{name}"] = best_time(lambda: read_csv(path, **options), repeat)
+        raw = read_csv(path, **options)
+        rows[name] = len(raw)
+
+        clean = cfg["clean"]
+        timings[f"{clean.__name__}:{name}"] = best_time(lambda: clean(raw.copy()), repeat)
+
+        cleaned = clean(raw.copy())
+        timings[f"apply_dtypes:{name}"] = best_time(
+            lambda: apply_dtypes(cleaned.copy(), cfg["dtypes"], cfg["date_cols"]), repeat
+        )
+
+        frames[name] = prepare_frame(name, raw)
+        for mode in VALIDATION_MODES:
+            timings[f"validate_df[{mode}]:{name}"] = best_time(
+                lambda: validate_df(frames[name], cfg["schema"], name, mode=mode), repeat
+            )
+
+    return timings, rows, frames
+
+
+# ============================================================
+# Chargement PostgreSQL (docker-compose)
+# ============================================================
+
+def bench_database_url():
+    # BENCH_DATABASE_URL, sinon les variables POSTGRES_* du .env de docker-compose
+    load_dotenv()
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    return (
+        f"postgresql+psycopg://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"@localhost:{os.getenv('POSTGRES_PORT', '5432')}/{os.getenv('POSTGRES_DB')}"
+    )
+
+
+def reset_bench_schema(engine):
+    with open(os.path.join(PROJECT_ROOT, "support_tools/sql_scripts/script_tables.sql")) as f:
+        statements = [s.strip() for s in f.read().split(";") if s.strip()]
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+        conn.execute(text(f"SET LOCAL search_path TO {BENCH_SCHEMA}"))
+        for stmt in statements:
+            conn.execute(text(stmt))
+    invalidate_table_cache()
+
+
+def bench_inserts(frames, repeat, load_method):
+    engine = get_engine(url=bench_database_url())
+    timings = {}
+    try:
+        def load_all():
+            reset_bench_schema(engine)
+            # Ordre des clés étrangères : operation d'abord
+            for name, cfg in TABLES.items():
+                start = time.perf_counter()
+                insert_dataframe(
+                    frames[name].copy(),
+                    cfg["table"],
+                    engine,
+                    schema=BENCH_SCHEMA,
+                    conflict_cols=cfg["conflict_cols"],
+                    conflict_constraint=cfg["conflict_constraint"],
+                    method=load_method,
+                )
+                key = f"insert_dataframe[{load_method}]:{name}"
+                timings[key] = min(timings.get(key, float("inf")), time.perf_counter() - start)
+
+        for _ in range(repeat):
+            load_all()
+    finally:
+        engine.dispose()
+    return timings
+
+
+# ============================================================
+# Historique et régressions
+# ============================================================
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_result(result, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(result) + "\n")
+
+
+def find_regressions(result, history, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare aux dernières mesures d'un autre commit (même volume, même machine).
+    Retourne [(étape, secondes avant, secondes maintenant, commit de référence)].
+    """
+    baseline = None
+    for previous in reversed(history):
+        if (
+            previous["operations"] == result["operations"]
+            and previous["host"] == result["host"]
+            and previous["commit"] != result["commit"]
+        ):
+            baseline = previous
+            break
+    if baseline is None:
+        return []
+
+    regressions = []
+    for step, seconds in result["timings"].items():
+        before = baseline["timings"].get(step)
+        if before and seconds > before * (1 + threshold):
+            regressions.append((step, before, seconds, baseline["commit"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure du pipeline SECMAR")
+    parser.add_argument("--operations", type=int, default=100_000, help="volume généré (ignoré avec --data-dir)")
+    parser.add_argument("--data-dir", default=None, help="utiliser des CSV existants au lieu de les générer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="nombre d'essais par étape (meilleur temps retenu)")
+    parser.add_argument("--db", action="store_true", help="mesurer aussi insert_dataframe (PostgreSQL docker-compose)")
+    parser.add_argument("--load-method", choices=LOAD_METHODS, default="insert")
+    parser.add_argument("--results", default=RESULTS_PATH, help="historique JSON Lines des mesures")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="ralentissement toléré avant de signaler une régression (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = tmp_dir
+            print(f"⚙️ Génération de {args.operations} opérations synthétiques...")
+            generate_dataset(data_dir, args.operations, seed=args.seed)
+
+        timings, rows, frames = bench_tables(data_dir, args.repeat)
+
+    if args.db:
+        timings.update(bench_inserts(frames, args.repeat, args.load_method))
+
+    result = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "operations": rows["operations"],
+        "rows": rows,
+        "repeat": args.repeat,
+        "timings": {step: round(seconds, 4) for step, seconds in timings.items()},
+    }
+
+    print(f"📊 Mesures ({result['commit']}, {rows['operations']} opérations) :")
+    for step, seconds in result["timings"].items():
+        print(f"  {step:<45} {seconds:>9.4f} s")
+
+    regressions = find_regressions(result, load_results(args.results), args.threshold)
+    append_result(result, args.results)
+    print(f"✔ Résultat ajouté à {args.results}")
+
+    for step, before, now, commit in regressions:
+        print(f"❌ Régression {step} : {before:.4f} s ({commit}) → {now:.4f} s")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Générateur de données SECMAR synthétiques
+# ============================================================
+# Produit operations.csv, flotteurs.csv et resultats_humain.csv avec les
+# colonnes des extraits réels, des cardinalités et des taux de valeurs
+# manquantes calqués sur l'audit de chargement.ipynb (385 782 opérations),
+# plus une petite part de valeurs aberrantes que le nettoyage doit absorber.
+# La génération se fait par blocs : 10 millions d'opérations tiennent en mémoire.
+
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_GARBAGE_RATE = 0.001
+
+# Ratios observés sur l'extrait réel
+FLOTTEURS_PER_OPERATION = 315_191 / 385_782
+RESULTATS_PER_OPERATION = 290_544 / 385_782
+FLOTTEURS_DUPLICATE_RATE = 189 / 315_191
+
+# (CROSS, fuseau horaire, métropole, poids)
+CROSS = [
+    ("Étel", "Europe/Paris", True, 94_798),
+    ("Gris-Nez", "Europe/Paris", True, 52_000),
+    ("Jobourg", "Europe/Paris", True, 48_000),
+    ("Corsen", "Europe/Paris", True, 61_000),
+    ("La Garde", "Europe/Paris", True, 58_000),
+    ("Corse", "Europe/Paris", True, 20_671),
+    ("Antilles-Guyane", "America/Martinique", False, 14_000),
+    ("Guadeloupe", "America/Guadeloupe", False, 4_000),
+    ("Guyane", "America/Cayenne", False, 2_500),
+    ("La Réunion", "Indian/Reunion", False, 12_000),
+    ("Mayotte", "Indian/Mayotte", False, 3_000),
+    ("Nouvelle-Calédonie", "Pacific/Noumea", False, 7_500),
+    ("Polynésie", "Pacific/Tahiti", False, 5_000),
+    ("Saint-Pierre-et-Miquelon", "America/Miquelon", False, 1_200),
+    ("Gris-Nez Manche Est", "Europe/Paris", True, 900),
+    ("Étel Atlantique Sud", "Europe/Paris", True, 700),
+    ("Soulanger", "Europe/Paris", True, 313),
+]
+
+# (colonne, valeurs connues, cardinalité, taux de valeurs manquantes)
+OPERATIONS_VOCAB = [
+    ("type_operation", ["SAR", "MAS", "DIV", "SUR"], 4, 0.457),
+    ("pourquoi_alerte", ["Événement reconnu", "Doute", "Fausse alerte", "Inquiétude"], 11, 0.543),
+    ("moyen_alerte", ["Téléphone à terre", "VHF phonie", "Téléphone mobile à terre",
+                      "Téléphone fixe", "Balise de détresse"], 33, 0.0049),
+    ("qui_alerte", ["Navire impliqué", "CROSS / MRCC", "CORG / Gendarmerie nationale",
+                    "Autre organisme ou personne privée"], 82, 0.0045),
+    ("categorie_qui_alerte", ["Navire à la mer", "Autorité civile française à terre",
+                              "Autorité militaire française à terre",
+                              "Organisme ou personne privée"], 7, 0.0),  # manque avec qui_alerte
+    ("departement", ["Var", "Finistère", "Morbihan", "Manche", "Pas-de-Calais"], 38, 0.198),
+    ("evenement", ["Toutes fausses alertes", "Avarie du système de propulsion",
+                   "Baignade", "Échouement"], 68, 0.0102),
+    ("categorie_evenement", ["Accident individuel", "Avarie", "Fausse alerte"], 12, 0.0),  # manque avec evenement
+    ("autorite", ["Préfet maritime", "Préfet de département", "Maire"], 9, 0.208),
+    ("seconde_autorite", ["Préfet de département", "Maire"], 6, 0.961),
+    ("zone_responsabilite", ["Eaux territoriales", "Plage et 300 mètres",
+                             "Responsabilité française"], 5, 0.0019),
+]
+
+VENT_CATEGORIES = ["nord", "nord-est", "est", "sud-est", "sud", "sud-ouest", "ouest", "nord-ouest"]
+
+FLOTTEURS_VOCAB = [
+    ("pavillon", ["Français", "Étranger"], 2, 0.069),
+    ("resultat_flotteur", ["Remorqué", "Assisté", "Retrouvé", "Perdu"], 16, 0.0128),
+    ("type_flotteur", ["Plaisance à voile", "Plaisance à moteur", "Pêche", "Commerce"], 31, 0.0083),
+    ("categorie_flotteur", ["Plaisance", "Pêche", "Commerce", "Loisir nautique"], 6, 0.0),  # manque avec type_flotteur
+]
+
+CATEGORIES_PERSONNE = [
+    "Toutes catégories", "Plaisancier français", "Pêcheur français", "Marin étranger",
+    "Plaisancier étranger", "Baigneur", "Pêcheur étranger", "Marin français",
+    "Autre", "Migrant",
+]
+RESULTATS_HUMAIN = [
+    "Personne secourue", "Personne assistée", "Personne tirée d'affaire seule",
+    "Personne impliquée dans fausse alerte", "Personne décédée", "Personne disparue",
+    "Personne retrouvée", "Personne évacuée", "Personne transportée",
+    "Personne décédée naturellement", "Personne blessée", "Personne saine et sauve",
+    "Personne non retrouvée",
+]
+
+# Valeurs aberrantes rencontrées dans les exports bruts
+NUMERIC_GARBAGE = np.array(["NC", "n/a", "12,5", "-", "?"], dtype=object)
+DATE_GARBAGE = np.array(["0000-00-00 00:00:00", "31/02/2020 25:61", "inconnu"], dtype=object)
+
+
+def _vocab(known, size, column):
+    # Valeurs connues complétées par des valeurs synthétiques jusqu'à la cardinalité réelle
+    return np.array(known + [f"{column} {i}" for i in range(len(known) + 1, size + 1)], dtype=object)
+
+
+def _zipf_choice(rng, values, n, skew=1.1):
+    # Distribution très déséquilibrée, comme les modalités réelles
+    weights = 1.0 / np.arange(1, len(values) + 1) ** skew
+    return values[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _with_nulls(rng, values, rate):
+    values = values.astype(object)
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def _with_garbage(rng, values, garbage, rate):
+    values = values.astype(object)
+    mask = rng.random(len(values)) < rate
+    values[mask] = rng.choice(garbage, size=int(mask.sum()))
+    return values
+
+
+def _nullable_ints(rng, values, null_rate):
+    values = pd.array(values, dtype="Int64")
+    values[rng.random(len(values)) < null_rate] = pd.NA
+    return values
+
+
+def generate_operations(rng, first_id, n, garbage_rate=DEFAULT_GARBAGE_RATE):
+    operation_id = np.arange(first_id, first_id + n, dtype="int64")
+
+    cross_weights = np.array([w for *_, w in CROSS], dtype=float)
+    cross_idx = rng.choice(len(CROSS), size=n, p=cross_weights / cross_weights.sum())
+    cross = np.array([c[0] for c in CROSS], dtype=object)[cross_idx]
+    fuseau = np.array([c[1] for c in CROSS], dtype=object)[cross_idx]
+    metropole = np.array([c[2] for c in CROSS])[cross_idx]
+
+    df = pd.DataFrame({"operation_id": operation_id})
+    for column, known, size, null_rate in OPERATIONS_VOCAB[:5]:
+        df[column] = _with_nulls(rng, _zipf_choice(rng, _vocab(known, size, column), n), null_rate)
+    # qui_alerte et categorie_qui_alerte manquent sur les mêmes lignes
+    df.loc[df["qui_alerte"].isna(), "categorie_qui_alerte"] = None
+
+    df["cross"] = cross
+    column, known, size, null_rate = OPERATIONS_VOCAB[5]
+    df[column] = _with_nulls(rng, _zipf_choice(rng, _vocab(known, size, column), n), null_rate)
+    df["est_metropolitain"] = metropole
+
+    for column, known, size, null_rate in OPERATIONS_VOCAB[6:]:
+        df[column] = _with_nulls(rng, _zipf_choice(rng, _vocab(known, size, column), n), null_rate)
+    df.loc[df["evenement"].isna(), "categorie_evenement"] = None
+
+    # Positions : métropole autour des côtes françaises, absentes sur 14 % des lignes
+    no_position = rng.random(n) < 0.141
+    latitude = np.round(rng.normal(46.5, 3.0, n), 5)
+    longitude = np.round(rng.normal(-1.0, 4.0, n), 5)
+    latitude[no_position] = np.nan
+    longitude[no_position] = np.nan
+    df["latitude"] = _with_garbage(rng, latitude, NUMERIC_GARBAGE, garbage_rate)
+    df["longitude"] = _with_garbage(rng, longitude, NUMERIC_GARBAGE, garbage_rate)
+
+    vent_direction = _nullable_ints(rng, rng.integers(0, 361, n), 0.27)
+    df["vent_direction"] = _with_garbage(rng, vent_direction.astype(object), NUMERIC_GARBAGE, garbage_rate)
+    categorie = np.array(VENT_CATEGORIES, dtype=object)[
+        ((vent_direction.fillna(0).to_numpy(dtype="int64") + 22) % 360 // 45)
+    ]
+    categorie[np.asarray(vent_direction.isna()) | (rng.random(n) < 0.04)] = None
+    df["vent_direction_categorie"] = categorie
+    df["vent_force"] = _nullable_ints(rng, np.clip(rng.normal(3.5, 1.7, n).round(), 0, 12), 0.269)
+    df["mer_force"] = _nullable_ints(rng, np.clip(rng.normal(2.7, 1.1, n).round(), 0, 9), 0.288)
+
+    # Dates de 1985 à 2025, fin d'opération quelques heures après l'alerte
+    start = pd.Timestamp("1985-01-01", tz="UTC").value // 10**9
+    end = pd.Timestamp("2025-12-31", tz="UTC").value // 10**9
+    reception = pd.to_datetime(rng.integers(start, end, n) // 60 * 60, unit="s", utc=True)
+    fin = reception + pd.to_timedelta(rng.exponential(3 * 3600, n).astype("int64") // 60 * 60, unit="s")
+    df["date_heure_reception_alerte"] = reception.strftime("%Y-%m-%d %H:%M:%S+00:00").to_numpy(dtype=object)
+    df["date_heure_fin_operation"] = _with_garbage(
+        rng, fin.strftime("%Y-%m-%d %H:%M:%S+00:00").to_numpy(dtype=object), DATE_GARBAGE, garbage_rate
+    )
+
+    numero_sitrep = rng.geometric(1 / 1050, n)
+    df["numero_sitrep"] = numero_sitrep
+    type_sitrep = df["type_operation"].fillna("SAR").to_numpy(dtype=object)
+    df["cross_sitrep"] = cross + " " + type_sitrep + " " + reception.year.astype(str).to_numpy(dtype=object) \
+        + "/" + numero_sitrep.astype(str).astype(object)
+    df["fuseau_horaire"] = fuseau
+    df["systeme_source"] = np.where(rng.random(n) < 0.79, "secmarweb", "seamis")
+    return df
+
+
+def generate_flotteurs(rng, operation_ids, garbage_rate=DEFAULT_GARBAGE_RATE):
+    n = int(round(len(operation_ids) * FLOTTEURS_PER_OPERATION))
+    df = pd.DataFrame({"operation_id": np.sort(rng.choice(operation_ids, size=n))})
+
+    # numero_ordre : rang du flotteur dans l'opération (1 dans 97 % des cas)
+    numero_ordre = df.groupby("operation_id").cumcount().to_numpy() + 1
+    df["numero_ordre"] = _with_garbage(
+        rng, _nullable_ints(rng, numero_ordre, 0.223).astype(object), NUMERIC_GARBAGE, garbage_rate
+    )
+
+    for column, known, size, null_rate in FLOTTEURS_VOCAB:
+        df[column] = _with_nulls(rng, _zipf_choice(rng, _vocab(known, size, column), n), null_rate)
+    df.loc[df["type_flotteur"].isna(), "categorie_flotteur"] = None
+
+    # Immatriculations hachées : ~0,63 valeur distincte par valeur renseignée
+    pool = max(1, int(n * 0.433 * 0.63))
+    ids = rng.integers(0, pool, n)
+    df["numero_immatriculation"] = _with_nulls(
+        rng,
+        np.array([hashlib.sha1(str(i).encode()).hexdigest() for i in ids], dtype=object),
+        0.567,
+    )
+
+    # Quelques lignes exactement dupliquées, comme dans l'export réel
+    duplicates = df.sample(frac=FLOTTEURS_DUPLICATE_RATE, random_state=rng.integers(2**31))
+    return pd.concat([df, duplicates]).sort_values("operation_id", kind="stable").reset_index(drop=True)
+
+
+def generate_resultats_humain(rng, operation_ids):
+    n = int(round(len(operation_ids) * RESULTATS_PER_OPERATION))
+    # (operation_id, categorie_personne) est unique : tirage sans remise des couples
+    pairs = rng.choice(len(operation_ids) * len(CATEGORIES_PERSONNE), size=n, replace=False)
+    df = pd.DataFrame({
+        "operation_id": operation_ids[pairs // len(CATEGORIES_PERSONNE)],
+        "categorie_personne": np.array(CATEGORIES_PERSONNE, dtype=object)[pairs % len(CATEGORIES_PERSONNE)],
+    })
+    df["resultat_humain"] = _zipf_choice(rng, np.array(RESULTATS_HUMAIN, dtype=object), n)
+    df["nombre"] = np.minimum(rng.geometric(0.3, n) - 1 + (rng.random(n) < 0.9), 3237)
+    df["dont_nombre_blesse"] = np.minimum(rng.poisson(0.1, n), df["nombre"])
+    return df.sort_values("operation_id", kind="stable").reset_index(drop=True)
+
+
+def generate_dataset(
+    out_dir,
+    n_operations,
+    seed=0,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    garbage_rate=DEFAULT_GARBAGE_RATE,
+):
+    """Écrit les trois CSV bruts dans out_dir et retourne le nombre de lignes par fichier."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {
+        name: os.path.join(out_dir, f"{name}.csv")
+        for name in ("operations", "flotteurs", "resultats_humain")
+    }
+    counts = dict.fromkeys(paths, 0)
+
+    for start in range(0, n_operations, chunk_size):
+        n = min(chunk_size, n_operations - start)
+        # Identifiants négatifs pour l'historique, comme dans l'extrait réel
+        ops = generate_operations(rng, start - n_operations // 3, n, garbage_rate)
+        frames = {
+            "operations": ops,
+            "flotteurs": generate_flotteurs(rng, ops["operation_id"].to_numpy(), garbage_rate),
+            "resultats_humain": generate_resultats_humain(rng, ops["operation_id"].to_numpy()),
+        }
+        for name, df in frames.items():
+            df.to_csv(paths[name], mode="w" if start == 0 else "a", header=start == 0, index=False)
+            counts[name] += len(df)
+
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des CSV SECMAR synthétiques")
+    parser.add_argument("--operations", type=int, default=10_000, help="nombre d'opérations (10k à 10M)")
+    parser.add_argument("--out", default="pipeline/data/synthetic", help="dossier de sortie")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--garbage-rate", type=float, default=DEFAULT_GARBAGE_RATE,
+                        help="part de valeurs aberrantes dans les colonnes numériques et dates")
+    args = parser.parse_args()
+
+    counts = generate_dataset(args.out, args.operations, args.seed, args.chunk_size, args.garbage_rate)
+    for name, rows in counts.items():
+        print(f"✔ {name} : {rows} lignes → {args.out}/{name}.csv")
@@ -1,54 +1,43 @@
 import os
-import psycopg
+import sys
 import pandas as pd
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.utils.connection import pg_connection
+
 # ============================================================
 # Chargement des variables d'environnement
 # ============================================================
 
 load_dotenv()
 
-DB_USER = os.getenv("user")
-DB_PASSWORD = os.getenv("password")
-DB_HOST = os.getenv("host")
-DB_PORT = os.getenv("port")
-DB_NAME = os.getenv("dbname")
-
-if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]):
+if not all(os.getenv(var) for var in ("user", "password", "host", "port", "dbname")):
     raise RuntimeError(" Variables .env manquantes. Vérifie ton fichier .env")
 
-# ============================================================
-# Connexion PostgreSQL Supabase
-# ============================================================
-
-print(" Connexion à la base Supabase...")
-
-conn = psycopg.connect(
-    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=require"
-)
-
-print(" Connexion établie\n")
-
 
 # ============================================================
 # Fonction utilitaire : COPY FROM STDIN
 # ============================================================
+# Chaque import emprunte une connexion au pool partagé du pipeline
+# (réglages DB_* du .env) : la même connexion sert aux trois tables.
 
 def copy_csv_to_table(csv_path: str, table_name: str):
     print(f" Import de {csv_path} → table {table_name}...")
 
-    try:
-        with conn.cursor() as cur:
-            with open(csv_path, "r") as f:
-                cur.copy(f"COPY {table_name} FROM STDIN WITH CSV HEADER", f)
+    with pg_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                with open(csv_path, "r") as f:
+                    cur.copy(f"COPY {table_name} FROM STDIN WITH CSV HEADER", f)
 
-        conn.commit()
-        print(f" Import terminé pour {table_name}\n")
+            conn.commit()
+            print(f" Import terminé pour {table_name}\n")
 
-    except Exception as e:
-        print(f"❌ ERREUR COPY pour la table {table_name} : {e}\n")
-        conn.rollback()
+        except Exception as e:
+            print(f"❌ ERREUR COPY pour la table {table_name} : {e}\n")
+            conn.rollback()
 
 
 # ============================================================
@@ -59,9 +48,10 @@ print("=== 1. Préparation du fichier operations ===")
 
 ops = pd.read_csv("pipeline/data/operations_clean.csv")
 
-# Vérification colonne cross
-if "cross" not in ops.columns:
-    raise RuntimeError(" La colonne 'cross' est absente de operations_clean.csv")
+# Vérification colonne cross_type (déjà renommée par clean_operations ;
+# "cross" pour les fichiers nettoyés avant ce renommage)
+if "cross_type" not in ops.columns and "cross" not in ops.columns:
+    raise RuntimeError(" La colonne 'cross_type' est absente de operations_clean.csv")
 
 # Renommage pour correspondre au SQL
 ops = ops.rename(columns={"cross": "cross_type"})
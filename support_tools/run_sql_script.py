@@ -1,33 +1,31 @@
 import os
-import psycopg
-from dotenv import load_dotenv
+import sys
 
-# Charger .env
-load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-DB_USER = os.getenv("user")
-DB_PASSWORD = os.getenv("password")
-DB_HOST = os.getenv("host")
-DB_PORT = os.getenv("port")
-DB_NAME = os.getenv("dbname")
+from pipeline.utils.connection import pg_connection
+from pipeline.utils.db_utils import SCHEMA_SQL_PATH
 
-conn = psycopg.connect(
-    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode=require"
-)
-
-print("Connexion établie à Supabase")
-
-# Lire le fichier SQL
-with open("base_de_donnees/script_tables.sql", "r") as f:
+# Lire le fichier SQL (schéma par défaut, ou chemin passé en argument)
+script_path = sys.argv[1] if len(sys.argv) > 1 else SCHEMA_SQL_PATH
+with open(script_path, "r") as f:
     sql_script = f.read()
 
-# Découper les commandes SQL
-statements = [s.strip() for s in sql_script.split(";") if s.strip()]
-
-with conn.cursor() as cur:
-    for stmt in statements:
-        print(f" Exécution : {stmt[:50]}...")
-        cur.execute(stmt + ";")
-    conn.commit()
+# Découper les commandes SQL ; un script avec des corps de fonction ($$ ... $$)
+# contient des ";" internes : il est envoyé d'un bloc
+if "$$" in sql_script:
+    statements = [sql_script.strip().rstrip(";")]
+else:
+    statements = [s.strip() for s in sql_script.split(";") if s.strip()]
+
+# Connexion du pool partagé (réglages DB_* du .env)
+with pg_connection() as conn:
+    print("Connexion établie à Supabase")
+
+    with conn.cursor() as cur:
+        for stmt in statements:
+            print(f" Exécution : {stmt[:50]}...")
+            cur.execute(stmt + ";")
+        conn.commit()
 
 print(" Script SQL exécuté avec succès !")
@@ -0,0 +1,183 @@
+-- =====================================================
+-- Agrégats du Dashboard (streamlit_app/pages/2_Dashboard.py)
+-- =====================================================
+-- Appelées en RPC à chaque interaction : seuls les agrégats (quelques Ko)
+-- quittent la base, jamais les tables. Un paramètre NULL = pas de filtre.
+-- Les comptages par valeur sont des listes [valeur, nombre] triées par
+-- nombre décroissant (un objet JSONB ne garde pas l'ordre des clés).
+
+-- Filtre par année en intervalle : l'index reste utilisable
+CREATE INDEX IF NOT EXISTS operation_reception_idx
+    ON operation (date_heure_reception_alerte);
+
+CREATE INDEX IF NOT EXISTS operation_departement_type_idx
+    ON operation (departement, type_operation);
+
+
+-- =====================================================
+-- Valeurs proposées dans les filtres
+-- =====================================================
+CREATE OR REPLACE FUNCTION dashboard_filtres()
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'annees', (
+            SELECT COALESCE(jsonb_agg(annee ORDER BY annee), '[]'::JSONB)
+            FROM (
+                SELECT DISTINCT EXTRACT(YEAR FROM date_heure_reception_alerte)::INTEGER AS annee
+                FROM operation
+                WHERE date_heure_reception_alerte IS NOT NULL
+            ) a
+        ),
+        'departements', (
+            SELECT COALESCE(jsonb_agg(departement ORDER BY departement), '[]'::JSONB)
+            FROM (SELECT DISTINCT departement FROM operation WHERE departement IS NOT NULL) d
+        ),
+        'types', (
+            SELECT COALESCE(jsonb_agg(type_operation ORDER BY type_operation), '[]'::JSONB)
+            FROM (SELECT DISTINCT type_operation FROM operation WHERE type_operation IS NOT NULL) t
+        )
+    );
+$$;
+
+
+-- =====================================================
+-- Indicateurs et comptages des graphiques
+-- =====================================================
+CREATE OR REPLACE FUNCTION dashboard_stats(
+    p_annee INTEGER DEFAULT NULL,
+    p_departement TEXT DEFAULT NULL,
+    p_type_operation TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    WITH ops AS (
+        SELECT type_operation, departement, vent_force, mer_force,
+               date_heure_reception_alerte AS debut,
+               date_heure_fin_operation AS fin
+        FROM operation
+        WHERE (p_annee IS NULL OR (
+                  date_heure_reception_alerte >= make_date(p_annee, 1, 1)
+              AND date_heure_reception_alerte < make_date(p_annee + 1, 1, 1)))
+          AND (p_departement IS NULL OR departement = p_departement)
+          AND (p_type_operation IS NULL OR type_operation = p_type_operation)
+    )
+    SELECT jsonb_build_object(
+        'nb_operations', (SELECT COUNT(*) FROM ops),
+        'duree_moyenne_h', (
+            SELECT ROUND((AVG(EXTRACT(EPOCH FROM fin - debut)) / 3600)::NUMERIC, 2) FROM ops
+        ),
+        -- une force inconnue ne compte pas comme météo difficile
+        'meteo_difficile', (SELECT COUNT(*) FROM ops WHERE vent_force >= 7 OR mer_force >= 5),
+        'types', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_array(type_operation, nb) ORDER BY nb DESC, type_operation), '[]'::JSONB)
+            FROM (SELECT type_operation, COUNT(*) AS nb FROM ops WHERE type_operation IS NOT NULL GROUP BY 1) t
+        ),
+        'departements', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_array(departement, nb) ORDER BY nb DESC, departement), '[]'::JSONB)
+            FROM (SELECT departement, COUNT(*) AS nb FROM ops WHERE departement IS NOT NULL GROUP BY 1) d
+        ),
+        -- flotteurs et résultats humains : sur l'ensemble des données,
+        -- comme l'affichait la page
+        'taux_blesses', (
+            SELECT ROUND(SUM(dont_nombre_blesse)::NUMERIC / NULLIF(SUM(nombre), 0) * 100, 2)
+            FROM resultats_humain
+        ),
+        'nb_resultats', (SELECT COUNT(*) FROM resultats_humain),
+        'total_personnes', (SELECT COALESCE(SUM(nombre), 0) FROM resultats_humain),
+        'total_blesses', (SELECT COALESCE(SUM(dont_nombre_blesse), 0) FROM resultats_humain),
+        'categories', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_array(categorie_personne, nb) ORDER BY nb DESC, categorie_personne), '[]'::JSONB)
+            FROM (
+                SELECT categorie_personne, COUNT(*) AS nb
+                FROM resultats_humain WHERE categorie_personne IS NOT NULL GROUP BY 1
+            ) c
+        ),
+        'flotteurs', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_array(type_flotteur, nb) ORDER BY nb DESC, type_flotteur), '[]'::JSONB)
+            FROM (
+                SELECT type_flotteur, COUNT(*) AS nb
+                FROM flotteurs WHERE type_flotteur IS NOT NULL GROUP BY 1
+            ) f
+        )
+    );
+$$;
+
+
+-- =====================================================
+-- Carte : opérations regroupées en mailles
+-- =====================================================
+-- Maille de 8° / 2^p_zoom de côté (zoom 0 : 8°, zoom 6 : 0,125°), limitée à
+-- la fenêtre p_lat_min..p_lon_max si elle est donnée : la réponse contient au
+-- plus une ligne par maille visible, quel que soit le nombre d'opérations.
+-- Dans une fenêtre de moins de p_detail_max opérations, les points
+-- eux-mêmes sont renvoyés (détail).
+CREATE INDEX IF NOT EXISTS operation_position_idx
+    ON operation (latitude, longitude);
+
+CREATE OR REPLACE FUNCTION dashboard_carte(
+    p_annee INTEGER DEFAULT NULL,
+    p_departement TEXT DEFAULT NULL,
+    p_type_operation TEXT DEFAULT NULL,
+    p_zoom INTEGER DEFAULT 0,
+    p_lat_min DOUBLE PRECISION DEFAULT NULL,
+    p_lat_max DOUBLE PRECISION DEFAULT NULL,
+    p_lon_min DOUBLE PRECISION DEFAULT NULL,
+    p_lon_max DOUBLE PRECISION DEFAULT NULL,
+    p_detail_max INTEGER DEFAULT 500
+)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    WITH pts AS (
+        SELECT operation_id, latitude, longitude
+        FROM operation
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+          AND (p_annee IS NULL OR (
+                  date_heure_reception_alerte >= make_date(p_annee, 1, 1)
+              AND date_heure_reception_alerte < make_date(p_annee + 1, 1, 1)))
+          AND (p_departement IS NULL OR departement = p_departement)
+          AND (p_type_operation IS NULL OR type_operation = p_type_operation)
+          AND (p_lat_min IS NULL OR latitude >= p_lat_min)
+          AND (p_lat_max IS NULL OR latitude < p_lat_max)
+          AND (p_lon_min IS NULL OR longitude >= p_lon_min)
+          AND (p_lon_max IS NULL OR longitude < p_lon_max)
+    ),
+    taille AS (
+        SELECT 8.0 / power(2, GREATEST(p_zoom, 0)) AS cote
+    ),
+    total AS (
+        SELECT COUNT(*) AS nb FROM pts
+    )
+    SELECT CASE
+        WHEN (SELECT nb FROM total) <= p_detail_max THEN jsonb_build_object(
+            'mode', 'points',
+            'taille', (SELECT cote FROM taille),
+            'total', (SELECT nb FROM total),
+            'mailles', (
+                SELECT COALESCE(jsonb_agg(jsonb_build_array(latitude, longitude, 1, operation_id)), '[]'::JSONB)
+                FROM pts
+            )
+        )
+        ELSE jsonb_build_object(
+            'mode', 'mailles',
+            'taille', (SELECT cote FROM taille),
+            'total', (SELECT nb FROM total),
+            'mailles', (
+                -- centre de la maille, nombre d'opérations
+                SELECT jsonb_agg(jsonb_build_array(
+                    (i + 0.5) * cote, (j + 0.5) * cote, nb
+                ) ORDER BY nb DESC)
+                FROM (
+                    SELECT floor(latitude / cote)::INTEGER AS i,
+                           floor(longitude / cote)::INTEGER AS j,
+                           COUNT(*) AS nb
+                    FROM pts, taille
+                    GROUP BY 1, 2
+                ) m, taille
+            )
+        )
+    END;
+$$;
@@ -27,7 +27,8 @@ CREATE TABLE IF NOT EXISTS operation (
     numero_sitrep VARCHAR(50),
     cross_sitrep VARCHAR(50),
     fuseau_horaire VARCHAR(50),
-    systeme_source VARCHAR(50)
+    systeme_source VARCHAR(50),
+    row_hash BIGINT -- empreinte du contenu (--on-conflict update)
 );
 
 -- =====================================================
@@ -42,6 +43,7 @@ CREATE TABLE IF NOT EXISTS flotteurs (
     type_flotteur VARCHAR(50),
     categorie_flotteur VARCHAR(30),
     numero_immatriculation VARCHAR(60),
+    row_hash BIGINT,
 
     CONSTRAINT flotteurs_unique
         UNIQUE (operation_id, numero_ordre),
@@ -62,6 +64,7 @@ CREATE TABLE IF NOT EXISTS resultats_humain (
     resultat_humain VARCHAR(70),
     nombre INTEGER,
     dont_nombre_blesse INTEGER,
+    row_hash BIGINT,
 
     CONSTRAINT resultats_humain_unique
         UNIQUE (operation_id, categorie_personne),
@@ -71,3 +74,48 @@ CREATE TABLE IF NOT EXISTS resultats_humain (
         REFERENCES operation (operation_id)
         ON DELETE CASCADE
 );
+
+-- =====================================================
+-- Empreintes de contenu (bases créées avant row_hash)
+-- =====================================================
+ALTER TABLE operation ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+ALTER TABLE flotteurs ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+ALTER TABLE resultats_humain ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+
+-- =====================================================
+-- Table : quarantine (lignes rejetées par la validation)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS quarantine (
+    quarantine_id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(50) NOT NULL,
+    cle VARCHAR(120),
+    motif TEXT NOT NULL,
+    ligne JSONB NOT NULL,
+    cree_le TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS quarantine_table_cle_idx
+    ON quarantine (table_name, cle);
+
+-- =====================================================
+-- Table : data_version (versions de données pour les caches)
+-- =====================================================
+-- Un compteur par table, incrémenté par le pipeline après un chargement et
+-- par les écritures du CRUD : le cache de l'application (streamlit_app/
+-- utils/cache.py) garde ses résultats tant que la version ne bouge pas.
+CREATE TABLE IF NOT EXISTS data_version (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Corps sans point-virgule : le script reste découpable sur ";"
+CREATE OR REPLACE FUNCTION bump_data_version(p_tables TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS '
+    INSERT INTO data_version (table_name, version)
+    SELECT DISTINCT unnest(p_tables), 1
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = data_version.version + 1, updated_at = now()
+';
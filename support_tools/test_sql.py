@@ -1,14 +1,11 @@
-import psycopg
 import os
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-conn = psycopg.connect(
-    f"postgresql://{os.getenv('user')}:{os.getenv('password')}@{os.getenv('host')}:{os.getenv('port')}/{os.getenv('dbname')}?sslmode=require"
-)
+from pipeline.utils.connection import pg_connection
 
-with conn.cursor() as cur:
+with pg_connection() as conn, conn.cursor() as cur:
 
     print("\n=== INFO CONNEXION ===")
     cur.execute("SELECT current_database();")
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.checkpoints import CheckpointStore, main as checkpoints_main
+
+
+def _frame():
+    return pd.DataFrame({
+        "operation_id": [1, 2],
+        "numero_ordre": pd.array([1, None], dtype="Int16"),
+        "pavillon": pd.Categorical(["FR", "EN"]),
+        "numero_immatriculation": pd.array(["A1", None], dtype="string"),
+        "date": pd.to_datetime(["2023-01-01", None], utc=True),
+    }, index=[3, 7])
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "pickle"])
+def test_save_and_load_roundtrip_keeps_exact_dtypes(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    store = CheckpointStore(str(tmp_path), fmt=fmt)
+    df = _frame()
+    df["compact_text"] = pd.array(["x", None], dtype="string[pyarrow]") if fmt == "parquet" else "x"
+
+    store.save("flotteurs", "clean", "abc", df)
+    restored = store.load("flotteurs", "clean", "abc")
+
+    pd.testing.assert_frame_equal(restored, df)
+    assert store.load("flotteurs", "clean", "other") is None
+
+
+def test_stage_keys_are_chained_on_input_file(tmp_path):
+    path = tmp_path / "operations.csv"
+    path.write_text("operation_id\n1\n")
+    store = CheckpointStore(str(tmp_path / "ckpt"))
+
+    versions = [("clean", "v1"), ("validated", "s1"), ("loaded", "db")]
+    keys = store.stage_keys(str(path), versions)
+
+    # une nouvelle version du schéma n'invalide pas le nettoyage
+    changed_schema = store.stage_keys(str(path), [("clean", "v1"), ("validated", "s2"), ("loaded", "db")])
+    assert changed_schema["clean"] == keys["clean"]
+    assert changed_schema["validated"] != keys["validated"]
+    assert changed_schema["loaded"] != keys["loaded"]
+
+    # un fichier d'entrée modifié invalide toutes les étapes
+    path.write_text("operation_id\n1\n2\n")
+    changed_file = store.stage_keys(str(path), versions)
+    assert all(changed_file[stage] != keys[stage] for stage in keys)
+
+
+def test_only_latest_checkpoint_per_stage_is_kept_and_cli_lists_and_clears(tmp_path, capsys):
+    store = CheckpointStore(str(tmp_path))
+    store.save("operations", "clean", "old", _frame())
+    store.save("operations", "clean", "new", _frame())
+    store.save("operations", "loaded", "k")
+    store.save("flotteurs", "clean", "f", _frame())
+
+    entries = store.list()
+    assert sorted(entries["cle"]) == ["f", "k", "new"]
+    assert pd.isna(entries.set_index("cle").loc["k", "lignes"])
+
+    checkpoints_main(["--dir", str(tmp_path), "list"])
+    assert "operations" in capsys.readouterr().out
+
+    checkpoints_main(["--dir", str(tmp_path), "clear", "--table", "operations"])
+    assert "2 point(s)" in capsys.readouterr().out
+    assert list(store.list()["table"]) == ["flotteurs"]
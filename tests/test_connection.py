@@ -0,0 +1,87 @@
+import os
+import sys
+
+import psycopg
+import pytest
+import sqlalchemy.exc
+from types import SimpleNamespace
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils import connection
+from pipeline.utils.connection import get_engine, dispose_engines
+
+
+@pytest.fixture(autouse=True)
+def db_env(monkeypatch):
+    for var, value in {"user": "etl", "password": "p@ss:word", "host": "db.local", "port": "5432", "dbname": "secmar"}.items():
+        monkeypatch.setenv(var, value)
+    for var in ("DB_ECHO", "DB_SSLMODE", "DB_PGBOUNCER", "DB_POOL_SIZE"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(connection, "load_dotenv", lambda: None)
+    yield
+    dispose_engines()
+
+
+def test_engine_is_shared_and_configured_from_env(monkeypatch):
+    engine = get_engine()
+
+    assert get_engine() is engine
+    assert engine.echo is False
+    assert engine.url.password == "p@ss:word"
+    assert engine.url.query["sslmode"] == "require"
+    assert engine.pool.size() == 10
+
+    monkeypatch.setenv("DB_SSLMODE", "disable")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    local = get_engine(echo=True)
+    assert local is not engine
+    assert local.echo is True
+    assert local.url.query["sslmode"] == "disable"
+    assert local.pool.size() == 3
+
+
+@pytest.mark.parametrize("port, setting, prepared", [
+    ("5432", None, True),
+    ("6543", None, False),  # pooler Supabase en mode transaction
+    ("5432", "1", False),
+    ("6543", "0", True),
+])
+def test_prepared_statements_are_disabled_behind_a_pooler(monkeypatch, port, setting, prepared):
+    monkeypatch.setenv("port", port)
+    if setting is not None:
+        monkeypatch.setenv("DB_PGBOUNCER", setting)
+
+    settings = connection.db_settings()
+    args = connection.connect_args(connection.database_url(settings), settings)
+
+    assert (args["prepare_threshold"] is not None) == prepared
+
+
+@pytest.mark.parametrize("port", ["5432", "6543"])
+def test_connect_args_are_valid_psycopg_options(monkeypatch, port):
+    monkeypatch.setenv("port", port)
+    settings = connection.db_settings()
+    args = connection.connect_args(connection.database_url(settings), settings)
+    # Port fermé en local : la connexion doit échouer au réseau, pas sur une option inconnue
+    unreachable = "postgresql+psycopg://etl@127.0.0.1:1/secmar?sslmode=disable&connect_timeout=2"
+
+    with pytest.raises(psycopg.OperationalError):
+        psycopg.connect(connection.psycopg_conninfo(unreachable), **args)
+
+    engine = get_engine(url=unreachable)
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        engine.connect()
+
+
+def test_prepared_max_is_set_on_new_connections(monkeypatch):
+    monkeypatch.setenv("DB_PREPARED_MAX", "42")
+    direct, pooled = SimpleNamespace(), SimpleNamespace()
+
+    for conn, engine in ((direct, get_engine()), (pooled, get_engine(url="postgresql+psycopg://etl@db.local:6543/secmar"))):
+        # dernier écouteur "connect" : le nôtre (ceux du dialecte veulent une vraie connexion)
+        list(engine.pool.dispatch.connect)[-1](conn, None)
+
+    assert direct.prepared_max == 42
+    assert not hasattr(pooled, "prepared_max")
@@ -0,0 +1,63 @@
+import os
+import sys
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+import pipeline.utils.csv_reader as csv_reader_mod
+from pipeline.utils.csv_reader import raw_projection, read_csv
+from support_tools.generate_data import generate_dataset
+
+
+def test_raw_projection_uses_raw_names_and_schema_columns():
+    header = ["operation_id", "cross", "colonne_inutile", "date_heure_reception_alerte", "numero_sitrep"]
+    dtypes = {"cross_type": "category", "numero_sitrep": "string[pyarrow]", "operation_id": int}
+
+    usecols, dtype = raw_projection(
+        header,
+        ["operation_id", "cross_type", "date_heure_reception_alerte", "numero_sitrep", "absente"],
+        dtypes,
+        date_cols=["date_heure_reception_alerte"],
+        renames={"cross": "cross_type"},
+    )
+
+    assert usecols == ["operation_id", "cross", "date_heure_reception_alerte", "numero_sitrep"]
+    assert dtype == {"cross": "category", "date_heure_reception_alerte": str, "numero_sitrep": "string[pyarrow]"}
+    assert raw_projection(None, ["operation_id"], dtypes) == (None, None)
+
+
+@pytest.mark.parametrize("dtype_profile", ["default", "compact"])
+def test_arrow_and_c_engines_give_the_same_clean_frames(tmp_path, dtype_profile):
+    generate_dataset(str(tmp_path), 500, seed=5, garbage_rate=0.05)
+
+    for name, cfg in main_mod.TABLES.items():
+        path = str(tmp_path / cfg["file"])
+        options = main_mod.raw_read_options(name, path, dtype_profile)
+        dtypes, schema = main_mod.table_types(name, dtype_profile)
+
+        frames = [
+            main_mod.apply_dtypes(cfg["clean"](read_csv(path, engine=engine, **options)), dtypes, cfg["date_cols"])
+            for engine in ("pyarrow", "c")
+        ]
+        pd.testing.assert_frame_equal(frames[0], frames[1], check_categorical=False)
+
+        # seules les colonnes du schéma (et celles chargées telles quelles) sont lues
+        assert set(frames[0].columns) == set(schema.columns) | set(cfg["passthrough_cols"])
+        main_mod.validate_df(frames[0], schema, name)
+
+
+def test_read_csv_falls_back_to_c_parser(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,texte\n1,a\n2,\n")
+
+    with patch.object(csv_reader_mod, "read_csv_arrow", side_effect=ValueError("option non supportée")):
+        df = read_csv(str(path), usecols=["texte"], engine="pyarrow")
+
+    assert list(df.columns) == ["texte"]
+    assert df["texte"].isna().tolist() == [False, True]
@@ -0,0 +1,49 @@
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from streamlit_app.utils.dashboard import MAP_POINT_RADIUS, cell_bbox, map_cells
+
+
+def _client(payload):
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value = SimpleNamespace(data=payload)
+    return client
+
+
+def test_cells_are_sized_by_count_and_filters_are_sent():
+    client = _client({
+        "mode": "mailles", "taille": 2.0, "total": 1_000_000,
+        "mailles": [[47.0, -5.0, 900_000], [43.0, 5.0, 100_000]],
+    })
+
+    df = map_cells(client, zoom=2, bbox=(40, 52, -6, 10), annee=2023, departement="Finistère")
+
+    name, params = client.rpc.call_args.args
+    assert name == "dashboard_carte"
+    assert params["p_zoom"] == 2 and params["p_annee"] == 2023
+    assert (params["p_lat_min"], params["p_lon_max"]) == (40, 10)
+    assert params["p_type_operation"] is None
+
+    assert df["nb"].tolist() == [900_000, 100_000]
+    # rayon en racine du nombre : 3x plus petit pour 9x moins d'opérations
+    assert round(df["size"].iloc[0] / df["size"].iloc[1], 6) == 3
+    assert df.attrs == {"mode": "mailles", "taille": 2.0, "total": 1_000_000}
+    assert cell_bbox(47.0, -5.0, 2.0) == (46.0, 48.0, -6.0, -4.0)
+
+
+def test_small_windows_return_individual_points():
+    client = _client({
+        "mode": "points", "taille": 0.125, "total": 2,
+        "mailles": [[48.1, -4.5, 1, "OP-1"], [48.2, -4.4, 1, "OP-2"]],
+    })
+
+    df = map_cells(client, zoom=6, bbox=cell_bbox(48.1, -4.5, 0.5))
+
+    assert df["operation_id"].tolist() == ["OP-1", "OP-2"]
+    assert (df["size"] == MAP_POINT_RADIUS).all()
+    assert map_cells(_client(None)).empty
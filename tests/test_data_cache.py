@@ -0,0 +1,126 @@
+import os
+import sys
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+from pipeline.utils.instrumentation import start_run
+from streamlit_app.utils.cache import DataCache
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(versions, clock, **kwargs):
+    polls = []
+
+    def source(tables):
+        polls.append(list(tables))
+        return {t: versions[t] for t in tables if t in versions}
+
+    return DataCache(version_source=source, clock=clock, **kwargs), polls
+
+
+def test_entries_are_served_until_the_table_version_changes():
+    clock, versions = Clock(), {"operation": 1}
+    cache, polls = _cache(versions, clock, version_poll=2)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return pd.DataFrame({"operation_id": ["OP-1"]})
+
+    first = cache.get("ops", ["operation"], loader)
+    first["operation_id"] = "modifié par la page"
+    second = cache.get("ops", ["operation"], loader)
+    assert len(loads) == 1 and second["operation_id"].tolist() == ["OP-1"]
+
+    # chargement du pipeline : visible à la prochaine relecture des versions
+    versions["operation"] = 2
+    cache.get("ops", ["operation"], loader)
+    assert len(loads) == 1
+    clock.now = 3
+    cache.get("ops", ["operation"], loader)
+    assert len(loads) == 2
+    assert polls == [["operation"], ["operation"]]
+
+
+def test_bump_invalidates_at_once_and_ttl_is_a_fallback():
+    clock = Clock()
+    cache, _ = _cache({}, clock, ttl=10)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [{"id": len(loads)}]
+
+    cache.get("fl", ["flotteurs"], loader)
+    cache.get("ops", ["operation"], loader)
+    cache.bump("flotteurs")
+    assert cache.get("fl", ["flotteurs"], loader) == [{"id": 3}]
+    assert cache.get("ops", ["operation"], loader) == [{"id": 2}]
+
+    clock.now = 11
+    assert cache.get("ops", ["operation"], loader) == [{"id": 4}]
+
+
+def test_lru_eviction_bounds_entries_and_bytes():
+    cache, _ = _cache({}, Clock(), max_entries=2, max_bytes=10_000)
+    frame = pd.DataFrame({"x": range(500)})  # ~4 Ko
+
+    cache.get("a", ["t"], lambda: frame)
+    cache.get("b", ["t"], lambda: frame)
+    cache.get("a", ["t"], lambda: frame)  # a redevient récent
+    cache.get("c", ["t"], lambda: frame)  # b évincé
+    assert len(cache) == 2
+    assert cache.get("a", ["t"], lambda: None) is not None
+    assert cache.get("b", ["t"], lambda: "rechargé") == "rechargé"
+
+    cache.get("big", ["t"], lambda: pd.DataFrame({"x": range(5000)}))
+    assert cache.nbytes <= 10_000
+
+
+def test_pipeline_bumps_loaded_tables():
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+
+    main_mod.notify_data_change(engine, {"resultats_humain", "operation", "flotteurs"})
+
+    params = conn.execute.call_args.args[1]
+    assert params == {"tables": ["operation", "flotteurs", "resultats_humain"]}
+
+    engine.reset_mock()
+    main_mod.notify_data_change(engine, set())
+    engine.begin.assert_not_called()
+
+
+def test_failed_run_still_bumps_the_tables_already_loaded():
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+    args = MagicMock(schema_cache=False, reinject=False, stream=False, parallel=False, resume=False)
+
+    def failing_batch(*a, **kwargs):
+        main_mod.load_rows(pd.DataFrame({"operation_id": [1, 2]}), "operation", engine)
+        main_mod.load_rows(pd.DataFrame({"operation_id": []}), "flotteurs", engine)
+        raise RuntimeError("chargement interrompu")
+
+    start_run()
+    with patch.object(main_mod, "run_batch", side_effect=failing_batch), \
+            patch.object(main_mod, "insert_dataframe"), \
+            pytest.raises(RuntimeError):
+        main_mod.run_pipeline(engine, args, validation={})
+
+    # flotteurs n'a reçu aucune ligne : sa version ne change pas
+    assert conn.execute.call_args.args[1] == {"tables": ["operation"]}
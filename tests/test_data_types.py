@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.main import clean_operations, validate_df
+from pipeline.schemas.schema_pandera import CompactOperationsSchema
+from pipeline.utils.data_types import (
+    apply_dtypes, category_dtypes, memory_report,
+    operations_dtypes, compact_operations_dtypes, operations_date_cols,
+)
+
+
+def _raw_operations(n=2_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "operation_id": np.arange(n),
+        "type_operation": rng.choice(["SAR", "MAS", "DIV", "SUR"], n),
+        "cross_type": rng.choice(["Gris-Nez", "Corsen", "Étel", "La Garde"], n),
+        "departement": rng.choice(["Finistère", "Var", "Manche", None], n),
+        "vent_force": rng.choice(["3", "7", "", "x"], n),
+        "mer_force": rng.integers(0, 9, n).astype(str),
+        "vent_direction": rng.integers(0, 360, n),
+        "latitude": rng.uniform(40, 50, n),
+        "numero_sitrep": rng.integers(1, 500, n).astype(str),
+        "date_heure_reception_alerte": ["2023-01-01 10:00:00"] * n,
+        "date_heure_fin_operation": ["2023-01-01 12:00:00"] * n,
+    })
+
+
+def test_compact_profile_types_and_validates():
+    raw = pd.read_csv(
+        io.StringIO(_raw_operations().to_csv(index=False)),
+        dtype=category_dtypes(compact_operations_dtypes),
+    )
+    df = apply_dtypes(clean_operations(raw), compact_operations_dtypes, operations_date_cols)
+
+    assert str(df["type_operation"].dtype) == "category"
+    assert str(df["vent_force"].dtype) == "Int8"
+    assert str(df["vent_direction"].dtype) == "Int16"
+    assert str(df["numero_sitrep"].dtype) == "string"
+    assert df["vent_force"].isna().sum() > 0
+
+    # both validation engines accept the compact profile
+    df["longitude"] = 0.0
+    df = df.assign(**{
+        col: pd.Series(pd.NA, index=df.index, dtype="string")
+        for col in CompactOperationsSchema.columns if col not in df.columns
+    })
+    validate_df(df, CompactOperationsSchema, "operations")
+    validate_df(df, CompactOperationsSchema, "operations", mode="fast")
+
+
+def test_compact_profile_reduces_memory():
+    raw = _raw_operations()
+    default = apply_dtypes(clean_operations(raw.copy()), operations_dtypes, operations_date_cols)
+    compact = apply_dtypes(clean_operations(raw.copy()), compact_operations_dtypes, operations_date_cols)
+
+    report = memory_report({"default": default, "compact": compact}).set_index("table")
+    assert list(report.columns) == ["lignes", "colonnes", "memoire_mo"]
+    assert report.loc["compact", "memoire_mo"] * 2 < report.loc["default", "memoire_mo"]
+
+
+def test_apply_dtypes_on_a_selection_leaves_the_source_untouched():
+    import warnings
+
+    source = pd.DataFrame({"vent_force": ["3", "x", "5"], "departement": ["Finistère", None, "Var"]})
+    selection = source[source["vent_force"] != "x"]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        df = apply_dtypes(selection, {"vent_force": "Int8", "departement": str})
+
+    assert str(df["vent_force"].dtype) == "Int8"
+    assert source["vent_force"].tolist() == ["3", "x", "5"]
+    assert selection["vent_force"].dtype == object
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.dates import normalize_dates
+from pipeline.main import clean_operations
+from pipeline.utils.instrumentation import start_run
+
+
+def _utc(value):
+    return pd.Timestamp(value, tz="UTC")
+
+
+def test_local_times_are_converted_with_fuseau_horaire():
+    df = pd.DataFrame({
+        "date_heure_reception_alerte": [
+            "2025-06-11 22:50:00",        # heure locale de Nouméa (UTC+11)
+            "2025-06-11 22:50:00",        # heure locale de Paris (UTC+2 en été)
+            "2025-06-11 22:50:00+00:00",  # instant absolu : fuseau ignoré
+            "2025-01-15T08:00:00",
+        ],
+        "fuseau_horaire": ["Pacific/Noumea", "Europe/Paris", "Pacific/Noumea", "America/Martinique"],
+    })
+
+    result, unparseable = normalize_dates(df, ["date_heure_reception_alerte"])
+
+    assert str(result["date_heure_reception_alerte"].dtype) == "datetime64[ns, UTC]"
+    assert list(result["date_heure_reception_alerte"]) == [
+        _utc("2025-06-11 11:50"),
+        _utc("2025-06-11 20:50"),
+        _utc("2025-06-11 22:50"),
+        _utc("2025-01-15 12:00"),
+    ]
+    assert unparseable == {"date_heure_reception_alerte": 0}
+
+
+def test_explicit_formats_offsets_and_unparseable_count():
+    df = pd.DataFrame({
+        "date_heure_fin_operation": [
+            "2025-06-11 22:50:00-0300",
+            "2025-06-11 22:50:00Z",
+            "11/06/2025 22:50",
+            "0000-00-00 00:00:00",
+            "inconnu",
+            None,
+        ],
+    })
+
+    result, unparseable = normalize_dates(df, ["date_heure_fin_operation"])
+
+    values = result["date_heure_fin_operation"]
+    assert values[0] == _utc("2025-06-12 01:50")
+    assert values[1] == _utc("2025-06-11 22:50")
+    # sans colonne fuseau_horaire : heure locale considérée en UTC
+    assert values[2] == _utc("2025-06-11 22:50")
+    assert values[3:].isna().all()
+    # une valeur manquante n'est pas une valeur non reconnue
+    assert unparseable == {"date_heure_fin_operation": 2}
+
+
+def test_dst_edges_and_unknown_timezone_do_not_lose_rows():
+    df = pd.DataFrame({
+        "d": ["2025-03-30 02:30:00", "2025-10-26 02:30:00", "2025-06-11 12:00:00"],
+        "fuseau_horaire": ["Europe/Paris", "Europe/Paris", "Mars/Olympus"],
+    })
+
+    result, unparseable = normalize_dates(df, ["d"])
+
+    assert result["d"].notna().all()
+    assert result["d"][2] == _utc("2025-06-11 12:00")
+    assert unparseable == {"d": 0}
+
+
+def test_clean_operations_reports_unparseable_dates():
+    recorder = start_run()
+    df = pd.DataFrame({
+        "date_heure_reception_alerte": ["2025-06-11 22:50:00", "xx"],
+        "date_heure_fin_operation": ["2025-06-12 01:00:00", "2025-06-12 02:00:00"],
+        "fuseau_horaire": ["Indian/Reunion", "Europe/Paris"],
+    })
+
+    result = clean_operations(df)
+
+    assert result["date_heure_reception_alerte"][0] == _utc("2025-06-11 18:50")
+    assert recorder.report()["counters"] == {
+        "dates_non_reconnues:date_heure_reception_alerte": 1,
+        "dates_non_reconnues:date_heure_fin_operation": 0,
+    }
@@ -0,0 +1,225 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils import db_utils
+from pipeline.utils.db_utils import insert_dataframe
+
+
+def _mock_engine():
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+    cur = conn.connection.driver_connection.cursor.return_value.__enter__.return_value
+    copy = cur.copy.return_value.__enter__.return_value
+    return engine, cur, copy
+
+
+def _executed_sql(cur):
+    return [call.args[0].as_string(None) for call in cur.execute.call_args_list]
+
+
+def test_insert_dataframe_copy_mode_stages_then_merges():
+    engine, cur, copy = _mock_engine()
+    cur.rowcount = 2
+    df = pd.DataFrame({
+        "operation_id": [1, 2, 3],
+        "pavillon": ["FR", None, "EN"],
+        "numero_ordre": [1.0, None, 2.0],
+    })
+
+    with patch.object(db_utils, "Table") as mock_table:
+        insert_dataframe(
+            df, "flotteurs", engine,
+            conflict_cols=["operation_id", "numero_ordre"],
+            method="copy",
+        )
+
+    # no reflection nor per-chunk transaction in bulk mode
+    mock_table.assert_not_called()
+    engine.connect.assert_not_called()
+    engine.begin.assert_called_once()
+
+    create_sql, merge_sql = _executed_sql(cur)
+    assert create_sql.startswith('CREATE TEMP TABLE "_staging_flotteurs" ON COMMIT DROP')
+    assert merge_sql == (
+        'INSERT INTO "public"."flotteurs" ("operation_id", "pavillon", "numero_ordre") '
+        'SELECT "operation_id", "pavillon", "numero_ordre" FROM "_staging_flotteurs" '
+        'ON CONFLICT ("operation_id", "numero_ordre") DO NOTHING'
+    )
+
+    copied = "".join(call.args[0] for call in copy.write.call_args_list)
+    assert copied.splitlines() == ["1,FR,1", "2,,\\N", "3,EN,2"]
+
+
+def test_insert_dataframe_copy_mode_uses_constraint_and_blocks():
+    engine, cur, copy = _mock_engine()
+    df = pd.DataFrame({"operation_id": range(5), "nombre": range(5)})
+
+    db_utils.copy_merge_dataframe(
+        df, "resultats_humain", engine,
+        conflict_constraint="resultats_humain_unique",
+        block_rows=2,
+    )
+
+    assert copy.write.call_count == 3
+    assert _executed_sql(cur)[-1].endswith(
+        'ON CONFLICT ON CONSTRAINT "resultats_humain_unique" DO NOTHING'
+    )
+
+
+def test_insert_dataframe_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        insert_dataframe(pd.DataFrame({"a": [1]}), "operation", MagicMock(), method="bulk")
+
+
+# --- reflected schema cache
+@pytest.fixture
+def fake_reflection():
+    from sqlalchemy import Table, Column, Integer
+
+    db_utils.invalidate_table_cache()
+
+    def reflect(name, meta, schema=None, autoload_with=None):
+        return Table(name, meta, Column("operation_id", Integer, primary_key=True), schema=schema)
+
+    with patch.object(db_utils, "Table", side_effect=reflect) as mock_table:
+        yield mock_table
+
+    db_utils.invalidate_table_cache()
+
+
+def test_get_table_reflects_once_per_table(fake_reflection):
+    engine = MagicMock()
+    first = db_utils.get_table("operation", engine)
+    second = db_utils.get_table("operation", engine)
+    db_utils.get_table("flotteurs", engine)
+
+    assert first is second
+    assert fake_reflection.call_count == 2
+
+    db_utils.invalidate_table_cache("operation")
+    db_utils.get_table("operation", engine)
+    db_utils.get_table("flotteurs", engine)
+    assert fake_reflection.call_count == 3
+
+
+def test_table_cache_round_trips_through_disk(fake_reflection, tmp_path):
+    sql_path = tmp_path / "script_tables.sql"
+    sql_path.write_text("CREATE TABLE operation (operation_id INT);")
+    cache_dir = tmp_path / "cache"
+
+    db_utils.get_table("operation", MagicMock())
+    db_utils.save_table_cache(cache_dir=str(cache_dir), sql_path=str(sql_path))
+    db_utils.invalidate_table_cache()
+
+    assert db_utils.load_table_cache(cache_dir=str(cache_dir), sql_path=str(sql_path))
+    tbl = db_utils.get_table("operation", MagicMock())
+    assert fake_reflection.call_count == 1
+    assert "operation_id" in tbl.c
+
+    # a DDL change invalidates the persisted cache
+    sql_path.write_text("CREATE TABLE operation (operation_id TEXT);")
+    db_utils.invalidate_table_cache()
+    assert not db_utils.load_table_cache(cache_dir=str(cache_dir), sql_path=str(sql_path))
+
+
+def test_insert_dataframe_copy_mode_handles_compact_categories():
+    engine, cur, copy = _mock_engine()
+    df = pd.DataFrame({
+        "operation_id": [1, 2],
+        "pavillon": pd.Series(["FR", None], dtype="category"),
+        "numero_ordre": pd.Series([1, None], dtype="Int16"),
+    })
+
+    insert_dataframe(df, "flotteurs", engine, method="copy")
+
+    copied = "".join(call.args[0] for call in copy.write.call_args_list)
+    assert copied.splitlines() == ["1,FR,1", "2,,\\N"]
+
+
+# --- change-aware upsert
+def test_copy_mode_update_rewrites_only_changed_rows():
+    engine, cur, copy = _mock_engine()
+    df = pd.DataFrame({
+        "operation_id": [1, 2, 1],
+        "numero_ordre": [1.0, 1.0, 1.0],
+        "pavillon": ["FR", "EN", "BE"],
+    })
+
+    insert_dataframe(
+        df, "flotteurs", engine,
+        conflict_cols=["operation_id", "numero_ordre"],
+        method="copy",
+        on_conflict="update",
+    )
+
+    assert _executed_sql(cur)[-1].endswith(
+        'ON CONFLICT ("operation_id", "numero_ordre") DO UPDATE SET '
+        '"pavillon" = EXCLUDED."pavillon", "row_hash" = EXCLUDED."row_hash" '
+        'WHERE "public"."flotteurs"."row_hash" IS DISTINCT FROM EXCLUDED."row_hash"'
+    )
+    # one row per key (the last one wins), each with its content hash
+    copied = [line.split(",") for line in "".join(c.args[0] for c in copy.write.call_args_list).splitlines()]
+    assert [row[:3] for row in copied] == [["2", "1", "EN"], ["1", "1", "BE"]]
+    assert all(row[3].lstrip("-").isdigit() for row in copied)
+
+
+def test_update_mode_keeps_rows_with_a_null_key_part():
+    engine, cur, copy = _mock_engine()
+    df = pd.DataFrame({
+        "operation_id": [1, 1, 1],
+        "numero_ordre": [None, None, 2.0],
+        "pavillon": ["FR", "EN", "BE"],
+    })
+
+    insert_dataframe(
+        df, "flotteurs", engine,
+        conflict_cols=["operation_id", "numero_ordre"],
+        method="copy",
+        on_conflict="update",
+    )
+
+    # numero_ordre NULL : aucun conflit possible en base, les deux lignes partent
+    copied = [line.split(",") for line in "".join(c.args[0] for c in copy.write.call_args_list).splitlines()]
+    assert [row[:3] for row in copied] == [["1", "\\N", "FR"], ["1", "\\N", "EN"], ["1", "2", "BE"]]
+
+
+def test_insert_mode_update_uses_hash_guard(fake_reflection):
+    from sqlalchemy import Table, Column, BigInteger, Integer, String
+    from sqlalchemy.dialects import postgresql
+
+    def reflect(name, meta, schema=None, autoload_with=None):
+        return Table(
+            name, meta,
+            Column("operation_id", Integer, primary_key=True),
+            Column("departement", String),
+            Column("row_hash", BigInteger),
+            schema=schema,
+        )
+
+    fake_reflection.side_effect = reflect
+    engine = MagicMock()
+    df = pd.DataFrame({"operation_id": [1, 2], "departement": ["Var", None]})
+
+    insert_dataframe(df, "operation", engine, conflict_cols=["operation_id"], on_conflict="update")
+
+    conn = engine.connect.return_value.__enter__.return_value
+    compiled = str(conn.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (operation_id) DO UPDATE SET departement = excluded.departement" in compiled
+    assert "WHERE public.operation.row_hash IS DISTINCT FROM excluded.row_hash" in compiled
+
+
+def test_row_hashes_do_not_depend_on_dtype_profile():
+    default = pd.DataFrame({
+        "operation_id": [1, 2],
+        "pavillon": pd.Series(["FR", ""], dtype="string"),
+        "numero_ordre": pd.Series([1, None], dtype="Int64"),
+    })
+    compact = default.astype({"pavillon": "category", "numero_ordre": "Int16"})
+
+    assert list(db_utils.row_hashes(default)) == list(db_utils.row_hashes(compact))
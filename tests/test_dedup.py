@@ -0,0 +1,83 @@
+import os
+import sys
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+from pipeline.utils.dedup import KeyDeduplicator, key_hashes
+
+KEYS = ["operation_id", "numero_ordre"]
+
+
+def _flotteurs(operation_ids, numeros, types):
+    return pd.DataFrame({
+        "operation_id": operation_ids,
+        "numero_ordre": pd.array(numeros, dtype="Int64"),
+        "type_flotteur": types,
+    })
+
+
+def test_key_duplicates_are_dropped_across_chunks():
+    dedup = KeyDeduplicator(KEYS)
+
+    first = dedup.drop(_flotteurs([1, 1, 2], [1, 1, 1], ["Plaisance", "Commerce", "Pêche"]))
+    second = dedup.drop(_flotteurs([2, 3], [1, 1], ["Autre", "Plaisance"]))
+
+    # première occurrence conservée, même si les autres colonnes diffèrent
+    assert first["type_flotteur"].tolist() == ["Plaisance", "Pêche"]
+    assert second["operation_id"].tolist() == [3]
+    assert dedup.duplicates == 2
+
+
+def test_keys_compare_like_the_database():
+    # operation_id est VARCHAR en base : 1, 1.0 et "1" sont la même clé
+    as_int = _flotteurs([1], [2], ["a"])
+    as_text = _flotteurs(["1"], [2], ["a"]).astype({"operation_id": "string"})
+    as_float = _flotteurs([1.0], [2], ["a"])
+
+    assert key_hashes(as_int, KEYS)[0] == key_hashes(as_text, KEYS)[0] == key_hashes(as_float, KEYS)[0]
+
+    # clé incomplète : seules les lignes identiques sont des doublons
+    partial = _flotteurs([5, 5, 5], [None, None, None], ["a", "b", "a"])
+    assert len(KeyDeduplicator(KEYS).drop(partial)) == 2
+
+
+def test_known_keys_are_dropped_and_counted():
+    in_db = pd.DataFrame({"operation_id": ["1"], "numero_ordre": ["1"]}, dtype="string")
+    dedup = KeyDeduplicator(KEYS, known=key_hashes(in_db, KEYS))
+
+    kept = dedup.drop(_flotteurs([1, 1, 2], [1, 1, 1], ["a", "b", "c"]))
+
+    assert kept["operation_id"].tolist() == [2]
+    assert (dedup.known_dropped, dedup.duplicates) == (2, 0)
+
+
+def test_dedupe_stage_in_streaming_and_db_precheck(tmp_path):
+    (tmp_path / "flotteurs.csv").write_text(
+        "operation_id,numero_ordre,pavillon,type_flotteur,categorie_flotteur,numero_immatriculation,resultat_flotteur\n"
+        "1,1,Français,Plaisance,Loisir,A1,Assisté\n"
+        "1,1,Français,Commerce,Commerce,A2,Sauvé\n"
+        "2,1,Français,Pêche,Pêche,A3,Assisté\n"
+        "3,1,Français,Plaisance,Loisir,A4,Assisté\n"
+    )
+    loaded = []
+    tables = {"flotteurs": main_mod.TABLES["flotteurs"]}
+    known = key_hashes(pd.DataFrame({"operation_id": ["3"], "numero_ordre": ["1"]}, dtype="string"), KEYS)
+
+    with patch.dict(main_mod.TABLES, tables, clear=True), \
+            patch.object(main_mod, "fetch_known_keys", return_value=known) as mock_fetch, \
+            patch.object(main_mod, "insert_dataframe", side_effect=lambda df, *a, **k: loaded.append(df)), \
+            patch("builtins.print"):
+        main_mod.run_streaming(object(), chunk_size=2, data_dir=str(tmp_path), dedupe_db=True)
+
+    mock_fetch.assert_called_once()
+    result = pd.concat(loaded)
+    assert result["operation_id"].tolist() == [1, 2]
+    assert result["type_flotteur"].tolist() == ["Plaisance", "Pêche"]
+    assert np.all(result.groupby(KEYS).size() == 1)
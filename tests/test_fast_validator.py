@@ -0,0 +1,106 @@
+import os
+import sys
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pandera as pa
+import pytest
+from pandera import DataFrameSchema, Check
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.schemas.fast_validator import compile_schema, fast_validate
+from pipeline.schemas.schema_pandera import ResultatsHumainSchema
+from pipeline.main import validate_df
+
+MeteoSchema = DataFrameSchema({
+    "operation_id": pa.Column(int, nullable=False),
+    "latitude": pa.Column(float, nullable=True, checks=Check.in_range(-90, 90)),
+    "vent_force": pa.Column(float, nullable=True, checks=Check.ge(0)),
+    "departement": pa.Column(pa.String, nullable=True),
+})
+
+
+def _meteo(**overrides):
+    df = pd.DataFrame({
+        "operation_id": [1, 2, 3, 4],
+        "latitude": [45.0, -12.5, np.nan, 90.0],
+        "vent_force": [0.0, 3.0, np.nan, 12.0],
+        "departement": pd.Series(["Finistère", None, "Var", "Manche"], dtype="string"),
+    })
+    for col, values in overrides.items():
+        df[col] = values
+    return df
+
+
+def _pandera_failures(df, schema):
+    try:
+        schema.validate(df, lazy=True)
+        return 0
+    except pa.errors.SchemaErrors as e:
+        return len(e.failure_cases)
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"latitude": [45.0, 91.0, np.nan, -95.0]},
+    {"vent_force": [-1.0, 3.0, np.nan, 12.0]},
+    {"departement": pd.Series(["a", "b", "c", "d"], dtype="category")},
+])
+def test_fast_validate_agrees_with_pandera(overrides):
+    df = _meteo(**overrides)
+    total, _ = fast_validate(df, compile_schema(MeteoSchema))
+    assert total == _pandera_failures(df, MeteoSchema)
+
+
+def test_fast_validate_reports_type_nullability_and_missing_columns():
+    df = pd.DataFrame({
+        "operation_id": pd.Series([1, None], dtype="Int64"),
+        "categorie_personne": ["Plaisancier", "Pêcheur"],
+        "nombre": [1.5, 2.0],
+    })
+    total, cases = fast_validate(df, compile_schema(ResultatsHumainSchema))
+
+    assert total == 4
+    assert set(cases["check"]) == {
+        "not_nullable", "dtype('int64')", "column_in_dataframe",
+    }
+    assert cases.loc[cases["check"] == "not_nullable", "index"].tolist() == [1]
+
+
+def test_fast_validate_caps_failure_cases_and_samples():
+    n = 1_000
+    df = pd.DataFrame({
+        "operation_id": np.arange(n),
+        "latitude": np.full(n, 120.0),
+        "vent_force": np.zeros(n),
+        "departement": pd.Series(["Var"] * n, dtype="string"),
+    })
+    rules = compile_schema(MeteoSchema)
+
+    total, cases = fast_validate(df, rules, max_failure_cases=10)
+    assert total == n
+    assert len(cases) == 10
+
+    total, _ = fast_validate(df, rules, sample=50)
+    assert total == 50
+
+
+def test_compile_schema_rejects_unsupported_checks():
+    schema = DataFrameSchema({"a": pa.Column(str, checks=Check.str_matches("^OP"))})
+    with pytest.raises(ValueError):
+        compile_schema(schema)
+
+
+def test_validate_df_fast_mode_raises_with_capped_log():
+    df = _meteo(latitude=[95.0, 96.0, 97.0, 98.0])
+
+    with patch("logging.error") as mock_log:
+        with pytest.raises(RuntimeError):
+            validate_df(df, MeteoSchema, "meteo", mode="fast", max_failure_cases=2)
+
+    logged = [c.args[0] for c in mock_log.call_args_list if isinstance(c.args[0], pd.DataFrame)]
+    assert len(logged) == 1 and len(logged[0]) == 2
+
+    assert validate_df(_meteo(), MeteoSchema, "meteo", mode="fast") is not None
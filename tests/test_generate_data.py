@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.main import TABLES
+from support_tools.generate_data import generate_dataset
+from support_tools.benchmark import prepare_frame, find_regressions
+import pipeline.main as main_mod
+
+
+def test_generated_csvs_match_secmar_layout_and_keys(tmp_path):
+    counts = generate_dataset(str(tmp_path), 5_000, seed=1, chunk_size=2_000)
+
+    ops = pd.read_csv(tmp_path / "operations.csv", low_memory=False)
+    flot = pd.read_csv(tmp_path / "flotteurs.csv", low_memory=False)
+    res = pd.read_csv(tmp_path / "resultats_humain.csv")
+    assert counts == {"operations": len(ops), "flotteurs": len(flot), "resultats_humain": len(res)}
+
+    assert ops["operation_id"].is_unique
+    assert "cross" in ops.columns and "est_metropolitain" in ops.columns
+    assert ops["cross"].nunique() == 17
+    assert ops["fuseau_horaire"].nunique() == 9
+    # taux de valeurs manquantes de l'extrait réel (seconde_autorite ~96 %)
+    assert 0.9 < ops["seconde_autorite"].isna().mean() < 1
+
+    # clés étrangères et unicité métier
+    assert flot["operation_id"].isin(ops["operation_id"]).all()
+    assert res["operation_id"].isin(ops["operation_id"]).all()
+    assert not res.duplicated(["operation_id", "categorie_personne"]).any()
+
+
+def test_generation_is_deterministic_and_passes_pipeline_validation(tmp_path):
+    generate_dataset(str(tmp_path / "a"), 1_000, seed=7)
+    generate_dataset(str(tmp_path / "b"), 1_000, seed=7)
+
+    for name, cfg in TABLES.items():
+        a = (tmp_path / "a" / cfg["file"]).read_bytes()
+        assert a == (tmp_path / "b" / cfg["file"]).read_bytes()
+
+        # les valeurs aberrantes sont absorbées par le nettoyage
+        df = prepare_frame(name, pd.read_csv(tmp_path / "a" / cfg["file"], low_memory=False))
+        main_mod.validate_df(df, cfg["schema"], name)
+
+
+def test_find_regressions_compares_with_last_other_commit():
+    history = [
+        {"commit": "aaa", "operations": 10, "host": "h", "timings": {"clean": 1.0, "validate": 1.0}},
+        {"commit": "bbb", "operations": 99, "host": "h", "timings": {"clean": 0.1}},
+    ]
+    result = {"commit": "ccc", "operations": 10, "host": "h", "timings": {"clean": 1.5, "validate": 1.1}}
+
+    assert find_regressions(result, history, threshold=0.2) == [("clean", 1.0, 1.5, "aaa")]
+    assert find_regressions(dict(result, commit="aaa"), history) == []
@@ -0,0 +1,131 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.incremental import (
+    empty_state, load_state, filter_changed, merge_pending, commit_state, forget_rows,
+)
+
+
+def _ops(**overrides):
+    df = pd.DataFrame({
+        "operation_id": [1, 2, 3],
+        "date_heure_reception_alerte": ["2023-01-01", "2023-01-02", "2023-01-03"],
+        "vent_force": [3, 4, 5],
+    })
+    for col, values in overrides.items():
+        df[col] = values
+    return df
+
+
+def test_filter_changed_keeps_only_new_and_modified_rows(tmp_path):
+    changed, pending = filter_changed(_ops(), empty_state(), ["operation_id"], "date_heure_reception_alerte")
+    assert len(changed) == 3
+    assert pending["new"] == 3 and pending["modified"] == 0
+
+    commit_state("operations", empty_state(), pending, state_dir=str(tmp_path))
+    state = load_state("operations", state_dir=str(tmp_path))
+    assert state["watermark"] == "2023-01-03"
+
+    # unchanged extract: nothing to reprocess
+    changed, pending = filter_changed(_ops(), state, ["operation_id"], "date_heure_reception_alerte")
+    assert changed.empty
+
+    # one correction and one new operation
+    df = pd.concat([
+        _ops(vent_force=[3, 9, 5]),
+        pd.DataFrame({"operation_id": [4], "date_heure_reception_alerte": ["2023-01-04"], "vent_force": [1]}),
+    ], ignore_index=True)
+    changed, pending = filter_changed(df, state, ["operation_id"], "date_heure_reception_alerte")
+    assert changed["operation_id"].tolist() == [2, 4]
+    assert pending["new"] == 1 and pending["modified"] == 1
+
+    state = commit_state("operations", state, pending, state_dir=str(tmp_path))
+    assert len(state["keys"]) == 4
+    assert state["watermark"] == "2023-01-04"
+
+
+def test_merge_pending_combines_chunks():
+    _, first = filter_changed(_ops().iloc[:2], empty_state(), ["operation_id"], "operation_id")
+    _, second = filter_changed(_ops().iloc[2:], empty_state(), ["operation_id"], "operation_id")
+
+    merged = merge_pending([first, second])
+    assert len(merged["keys"]) == 3
+    assert merged["watermark"] == 3
+    assert merged["new"] == 3
+
+    assert merge_pending([])["new"] == 0
+
+
+def _flotteurs(**dtypes):
+    # 3 flotteurs sans numero_ordre sur la même opération
+    df = pd.DataFrame({
+        "operation_id": [1, 1, 1, 2],
+        "numero_ordre": [None, None, None, 1],
+        "pavillon": ["FR", "EN", "BE", "FR"],
+    })
+    return df.astype(dtypes) if dtypes else df
+
+
+@pytest.mark.parametrize("raw", ["float", "object"])
+def test_rows_with_an_incomplete_key_keep_their_own_fingerprint(tmp_path, raw):
+    key_cols = ["operation_id", "numero_ordre"]
+    df = _flotteurs()
+    if raw == "object":
+        # colonne brute texte : valeurs non numériques ("NC") à côté des NULL
+        df["numero_ordre"] = pd.Series([float("nan")] * 3 + ["NC"], dtype=object)
+    _, pending = filter_changed(df, empty_state(), key_cols)
+    state = commit_state("flotteurs", empty_state(), pending, state_dir=str(tmp_path))
+    assert len(state["keys"]) == 4
+
+    # relance sur les mêmes données : plus rien à renvoyer
+    changed, _ = filter_changed(df.copy(), state, key_cols)
+    assert changed.empty
+
+
+def test_fingerprints_do_not_depend_on_inferred_dtypes():
+    key_cols = ["operation_id", "numero_ordre"]
+    # même fichier lu par blocs : numero_ordre float64 (NaN dans le bloc) ou int64
+    whole = _flotteurs().iloc[3:]
+    chunk = _flotteurs(numero_ordre="Int64").iloc[3:].astype({"numero_ordre": "int64"})
+    assert str(whole["numero_ordre"].dtype) == "float64"
+
+    _, first = filter_changed(whole, empty_state(), key_cols)
+    _, second = filter_changed(chunk, empty_state(), key_cols)
+    assert first["keys"].tolist() == second["keys"].tolist()
+    assert first["hashes"].tolist() == second["hashes"].tolist()
+
+
+def test_forgotten_rows_are_reprocessed_next_run(tmp_path):
+    _, pending = filter_changed(_ops(), empty_state(), ["operation_id"])
+    # opération 2 écartée avant le chargement, sans quarantaine
+    state = commit_state("operations", empty_state(), forget_rows(pending, [1]), state_dir=str(tmp_path))
+
+    changed, _ = filter_changed(_ops(), state, ["operation_id"])
+    assert changed["operation_id"].tolist() == [2]
+
+
+def test_state_from_an_older_fingerprint_version_is_ignored(tmp_path):
+    _, pending = filter_changed(_ops(), empty_state(), ["operation_id"])
+    commit_state("operations", empty_state(), pending, state_dir=str(tmp_path))
+    meta_path = tmp_path / "operations.json"
+    meta_path.write_text(meta_path.read_text().replace('"fingerprint": 3', '"fingerprint": 2'))
+
+    assert len(load_state("operations", state_dir=str(tmp_path))["keys"]) == 0
+
+
+def test_fingerprints_do_not_depend_on_non_numeric_values_in_the_chunk():
+    # un bloc contenant "NC" lit numero_ordre en object, les autres en float64
+    numeric = pd.DataFrame({"operation_id": [1, 1], "numero_ordre": [None, 2.0], "pavillon": ["FR", "EN"]})
+    raw = numeric.astype({"numero_ordre": object})
+    raw["numero_ordre"] = [float("nan"), "2.0"]
+
+    for key_cols in (["operation_id", "numero_ordre"], ["operation_id"]):
+        _, first = filter_changed(numeric, empty_state(), key_cols)
+        _, second = filter_changed(raw, empty_state(), key_cols)
+        assert first["keys"].tolist() == second["keys"].tolist()
+        assert first["hashes"].tolist() == second["hashes"].tolist()
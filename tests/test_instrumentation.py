@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.instrumentation import RunRecorder
+
+
+def test_stage_accumulates_calls_rows_and_throughput():
+    recorder = RunRecorder()
+
+    for rows in (10, 30):
+        with recorder.stage("clean_operations", "operations") as metrics:
+            metrics["rows"] = rows
+
+    (entry,) = recorder.report()["stages"]
+    assert entry["calls"] == 2
+    assert entry["rows"] == 40
+    assert entry["seconds"] >= 0
+    assert entry["peak_rss_mb"] is None or entry["peak_rss_mb"] > 0
+
+
+def test_stage_is_recorded_even_when_it_fails():
+    recorder = RunRecorder()
+
+    with pytest.raises(RuntimeError):
+        with recorder.stage("validate_df", "flotteurs"):
+            raise RuntimeError("boom")
+
+    assert recorder.report()["stages"][0]["calls"] == 1
+
+
+def test_db_round_trips_are_attributed_to_the_running_stage():
+    recorder = RunRecorder()
+    engine = create_engine("sqlite://")
+    recorder.attach_engine(engine)
+
+    with recorder.stage("insert_dataframe", "operation"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+    assert recorder.report()["stages"][0]["db_round_trips"] == 2
+    assert recorder.db_round_trips == 2
+
+
+def test_write_report_is_json(tmp_path):
+    recorder = RunRecorder(["--stream"])
+    with recorder.stage("load_raw_data", "operations") as metrics:
+        metrics["bytes_read"] = 123
+
+    path = recorder.write_report(str(tmp_path), status="failed")
+
+    report = json.loads(open(path).read())
+    assert report["status"] == "failed"
+    assert report["argv"] == ["--stream"]
+    assert report["stages"][0]["bytes_read"] == 123
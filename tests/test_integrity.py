@@ -0,0 +1,125 @@
+import os
+import sys
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+from pipeline.utils.dedup import key_hashes
+from pipeline.utils.integrity import ParentKeys
+from pipeline.utils.quarantine import Quarantine, REASON_COL
+
+
+def _db_keys(*operation_ids):
+    # Clés lues en base : operation_id::text
+    keys = pd.DataFrame({"operation_id": [str(i) for i in operation_ids]}, dtype="string")
+    return key_hashes(keys, ["operation_id"])
+
+
+def test_orphans_are_split_against_db_and_loaded_parents():
+    parents = ParentKeys(["operation_id"], known=_db_keys(1, 2))
+    parents.add(pd.DataFrame({"operation_id": [3]}))
+    children = pd.DataFrame({
+        "operation_id": pd.array([1, 3, 4, None, 4], dtype="Int64"),
+        "numero_ordre": [1, 1, 1, 1, 2],
+    })
+
+    kept, orphans = parents.split_orphans(children)
+
+    # clé étrangère NULL : non contrôlée, comme en base
+    assert kept.index.tolist() == [0, 1, 3]
+    assert orphans["operation_id"].tolist() == [4, 4]
+
+
+def _write_raw_csvs(data_dir):
+    pd.DataFrame({
+        "operation_id": [1, 2],
+        "type_operation": ["SAR", "MAS"],
+        "date_heure_reception_alerte": ["2023-01-01 10:00:00"] * 2,
+        "date_heure_fin_operation": ["2023-01-01 12:00:00"] * 2,
+    }).to_csv(data_dir / "operations.csv", index=False)
+    pd.DataFrame({
+        "operation_id": [1, 7, 2, 9],
+        "numero_ordre": [1, 1, 1, 1],
+        "pavillon": ["FR", "FR", "EN", "FR"],
+    }).to_csv(data_dir / "flotteurs.csv", index=False)
+    pd.DataFrame({
+        "operation_id": [2, 9],
+        "categorie_personne": ["Plaisancier", "Pêcheur"],
+        "nombre": [2, 1],
+    }).to_csv(data_dir / "resultats_humain.csv", index=False)
+
+
+@pytest.mark.parametrize("mode", ["stream", "parallel"])
+def test_fk_check_drops_orphans_before_loading(tmp_path, mode):
+    _write_raw_csvs(tmp_path)
+    loaded = {}
+    quarantine = Quarantine(str(tmp_path / "quarantine"))
+
+    def fake_insert(df, table_name, engine, **kwargs):
+        loaded.setdefault(table_name, []).extend(df["operation_id"].tolist())
+
+    with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+            patch.object(main_mod, "insert_dataframe", side_effect=fake_insert), \
+            patch.object(main_mod, "fetch_known_keys",
+                         side_effect=lambda *a: _db_keys(7, *loaded.get("operation", []))) as mock_fetch, \
+            patch("builtins.print"):
+        run = main_mod.run_streaming if mode == "stream" else main_mod.run_parallel
+        run(MagicMock(), data_dir=str(tmp_path), validation={"quarantine": quarantine}, fk_check=True)
+
+    # une seule lecture des clés d'operation en base (en streaming : après
+    # le chargement d'operation, les clés chargées y sont déjà)
+    mock_fetch.assert_called_once()
+    assert mock_fetch.call_args.args[1:] == ("operation", ["operation_id"])
+
+    assert sorted(loaded["flotteurs"]) == [1, 2, 7]
+    assert loaded["resultats_humain"] == [2]
+    assert quarantine.counts == {"flotteurs": 1, "resultats_humain": 1}
+    rejected = pd.read_csv(quarantine.path("flotteurs"))
+    assert rejected[REASON_COL].tolist() == ["operation_id:foreign_key(operations)"]
+
+
+@pytest.mark.parametrize("mode", ["batch", "stream", "parallel"])
+def test_incremental_fk_check_retries_orphans_without_quarantine(tmp_path, monkeypatch, mode):
+    import pipeline.utils.incremental as incremental_mod
+
+    data_dir = tmp_path / "pipeline" / "data"
+    data_dir.mkdir(parents=True)
+    _write_raw_csvs(data_dir)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(incremental_mod, "STATE_DIR", str(tmp_path / "state"))
+    in_db = {"operation": [7]}
+
+    def run():
+        loaded = {}
+
+        def fake_insert(df, table_name, engine, **kwargs):
+            loaded.setdefault(table_name, []).extend(df["operation_id"].tolist())
+            in_db.setdefault(table_name, []).extend(df["operation_id"].tolist())
+
+        with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+                patch.object(main_mod, "insert_dataframe", side_effect=fake_insert), \
+                patch.object(main_mod, "fetch_known_keys", side_effect=lambda *a: _db_keys(*in_db["operation"])), \
+                patch("builtins.print"):
+            run = {
+                "batch": main_mod.run_batch,
+                "stream": main_mod.run_streaming,
+                "parallel": main_mod.run_parallel,
+            }[mode]
+            run(MagicMock(), incremental=True, fk_check=True)
+        return loaded
+
+    assert sorted(run()["flotteurs"]) == [1, 2, 7]
+
+    # l'opération 9 arrive : ses enfants écartés au passage précédent sont renvoyés
+    ops = pd.read_csv(data_dir / "operations.csv")
+    ops.loc[2] = [9, "SAR", "2023-01-02 10:00:00", "2023-01-02 12:00:00"]
+    ops.to_csv(data_dir / "operations.csv", index=False)
+    loaded = run()
+    assert loaded["operation"] == [9]
+    assert loaded["flotteurs"] == [9] and loaded["resultats_humain"] == [9]
@@ -2,6 +2,8 @@ import os
 import sys
 from unittest.mock import patch, MagicMock
 from pandera.errors import SchemaErrors
+import threading
+import time
 import pandas as pd
 import pytest
 
@@ -21,9 +23,15 @@ from pipeline.main import (
     validate_df,
 )
 
-import inspect
-import textwrap
 import pipeline.main as main_mod
+import pipeline.utils.instrumentation as instrumentation_mod
+
+
+@pytest.fixture(autouse=True)
+def report_dir(tmp_path, monkeypatch):
+    # les rapports d'exécution de main() ne polluent pas pipeline/data
+    monkeypatch.setattr(instrumentation_mod, "REPORT_DIR", str(tmp_path / "reports"))
+    return tmp_path / "reports"
 
 
 def test_load_raw_data_reads_three_files():
@@ -114,6 +122,17 @@ def test_validate_df_success_and_failure():
         assert mock_log_error.called
 
 
+def test_validate_df_sample_larger_than_frame_validates_everything():
+    import pandera as pa
+
+    schema = pa.DataFrameSchema({"col": pa.Column(int, pa.Check.ge(0))})
+    df = pd.DataFrame({"col": [1, 2, 3]})
+
+    assert validate_df(df, schema, "test_schema", sample=10).equals(df)
+    with patch("logging.error"), pytest.raises(RuntimeError):
+        validate_df(pd.DataFrame({"col": [1, -2]}), schema, "test_schema", sample=10)
+
+
 # --- from tests/test_main_extra.py: tests for additional validate_df branches
 def _make_schema_error_with_attr(attr_name, value):
     err = SchemaErrors.__new__(SchemaErrors)
@@ -157,71 +176,271 @@ def test_validate_df_logs_str_when_no_failure_attrs():
 
 
 # --- from tests/test_main_run_module.py: integration-like test running module main
-def test_run_module_main_executes_pipeline():
+def _run_main(argv, ops, flot, res):
+    insert_calls = []
+    validated = {}
+
+    def fake_validate(df, schema, schema_name, **kwargs):
+        validated[schema_name] = df
+        return df
+
+    with patch.object(main_mod, "load_raw_data", return_value=(ops, flot, res)), \
+            patch.object(main_mod, "save_clean_data") as mock_save, \
+            patch.object(main_mod.pd, "read_csv") as mock_read_csv, \
+            patch.object(main_mod, "validate_df", side_effect=fake_validate), \
+            patch.object(main_mod, "get_engine", return_value=MagicMock()), \
+            patch.object(
+                main_mod,
+                "insert_dataframe",
+                side_effect=lambda df, table_name, engine, **kwargs: insert_calls.append(table_name),
+            ):
+        main_mod.main(argv)
+
+    return insert_calls, validated, mock_save, mock_read_csv
+
+
+def _small_frames():
     # small dataframes matching minimal expected columns
     ops = pd.DataFrame({
-        "date_heure_reception_alerte": ["2023-01-01T00:00:00Z"],
-        "date_heure_fin_operation": ["2023-01-02T00:00:00Z"],
+        "operation_id": [1],
+        "date_heure_reception_alerte": ["2023-01-01T00:00:00"],
+        "date_heure_fin_operation": ["2023-01-02T00:00:00"],
         "latitude": [45.0],
         "longitude": [2.0],
     })
+    flot = pd.DataFrame({"operation_id": [1], "numero_ordre": [1], "pavillon": ["FR"]})
+    res = pd.DataFrame({"operation_id": [1], "nombre": [3]})
+    return ops, flot, res
+
 
-    flot = pd.DataFrame({"numero_ordre": [1], "pavillon": ["FR"]})
-    res = pd.DataFrame({"resultat_flotteur": ["ok"]})
-
-    def fake_read_csv(path, *args, **kwargs):
-        if "operations_clean.csv" in str(path):
-            return ops
-        if "flotteurs_clean.csv" in str(path):
-            return flot
-        if "resultats_humain_clean.csv" in str(path):
-            return res
-        return pd.DataFrame()
-
-    # Read the source and extract the __main__ block
-    src_path = main_mod.__file__
-    with open(src_path, "r", encoding="utf8") as f:
-        lines = f.read().splitlines()
-
-    idx_if = next(i for i, ln in enumerate(lines) if ln.strip().startswith('if __name__') )
-    body_lines = lines[idx_if + 1 :]
-    body = textwrap.dedent("\n".join(body_lines))
-    body_start_line = idx_if + 2
-
-    # Prefix newlines so compiled code maps to the original file line numbers
-    prefix = "\n" * (body_start_line - 1)
-    exec_src = prefix + body
-
-    # Prepare globals for execution of the main block
-    g = {
-        "__name__": "__main__",
-        "load_raw_data": lambda: (ops, flot, res),
-        "clean_operations": main_mod.clean_operations,
-        "clean_flotteurs": main_mod.clean_flotteurs,
-        "clean_resultats": main_mod.clean_resultats,
-        "save_clean_data": lambda a, b, c: None,
-        "pd": pd,
-        "os": main_mod.os,
-        "operations_dtypes": {},
-        "flotteurs_dtypes": {},
-        "resultats_humain_dtypes": {},
-        "OperationsSchema": object,
-        "FlotteursSchema": object,
-        "ResultatsHumainSchema": object,
-        "get_engine": lambda: MagicMock(),
-        "insert_dataframe": lambda df, table_name, engine: g.setdefault("_insert_calls", []).append(table_name),
-        "validate_df": lambda df, schema, schema_name: df,
-    }
-
-    # ensure pd.read_csv used in the exec uses our fake
-    g["pd"].read_csv = fake_read_csv
-
-    # compile with filename set to the real module so coverage attributes lines correctly
-    code_obj = compile(exec_src, src_path, "exec")
-    exec(code_obj, g, g)
+def test_run_module_main_executes_pipeline():
+    insert_calls, validated, mock_save, mock_read_csv = _run_main([], *_small_frames())
 
     # verify insert_dataframe was called for expected tables
-    called = g.get("_insert_calls", [])
-    assert "operation" in called
-    assert "flotteurs" in called
-    assert "resultats_humain" in called
+    assert "operation" in insert_calls
+    assert "flotteurs" in insert_calls
+    assert "resultats_humain" in insert_calls
+
+    # frames are typed in memory: no clean CSV written nor read back
+    mock_save.assert_not_called()
+    mock_read_csv.assert_not_called()
+    ops = validated["operations"]
+    assert str(ops["date_heure_reception_alerte"].dtype) == "datetime64[ns, UTC]"
+    assert str(validated["resultats_humain"]["nombre"].dtype) == "Int64"
+
+
+def test_main_save_clean_flag_writes_side_output():
+    _, _, mock_save, mock_read_csv = _run_main(["--save-clean"], *_small_frames())
+    mock_save.assert_called_once()
+    mock_read_csv.assert_not_called()
+
+
+# --- streaming mode
+def _write_raw_csvs(data_dir):
+    pd.DataFrame({
+        "operation_id": [1, 2, 3],
+        "type_operation": ["SAR", "MAS", "SAR"],
+        "date_heure_reception_alerte": ["2023-01-01 10:00:00"] * 3,
+        "date_heure_fin_operation": ["2023-01-01 12:00:00"] * 3,
+        "latitude": [45.0, 46.0, "x"],
+        "longitude": [2.0, 3.0, 4.0],
+    }).to_csv(data_dir / "operations.csv", index=False)
+    pd.DataFrame({
+        "operation_id": [1, 1, 2, 1],
+        "numero_ordre": [1, 2, 1, 1],
+        "pavillon": ["FR", "FR", "EN", "FR"],
+    }).to_csv(data_dir / "flotteurs.csv", index=False)
+    pd.DataFrame({
+        "operation_id": [1, 2],
+        "categorie_personne": ["Plaisancier", "Pêcheur"],
+        "nombre": [2, None],
+    }).to_csv(data_dir / "resultats_humain.csv", index=False)
+
+
+def test_run_streaming_processes_each_table_in_chunks(tmp_path):
+    _write_raw_csvs(tmp_path)
+    loaded = {}
+
+    def fake_insert(df, table_name, engine, **kwargs):
+        loaded.setdefault(table_name, []).append(df.copy())
+
+    with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+            patch.object(main_mod, "insert_dataframe", side_effect=fake_insert), \
+            patch("builtins.print"):
+        main_mod.run_streaming(MagicMock(), chunk_size=2, data_dir=str(tmp_path))
+
+    assert list(loaded) == ["operation", "flotteurs", "resultats_humain"]
+    assert [len(c) for c in loaded["operation"]] == [2, 1]
+
+    ops = pd.concat(loaded["operation"])
+    assert str(ops["date_heure_reception_alerte"].dtype) == "datetime64[ns, UTC]"
+    assert ops["latitude"].isna().sum() == 1
+
+    # le doublon du 2e bloc est supprimé malgré le découpage
+    flot = pd.concat(loaded["flotteurs"])
+    assert len(flot) == 3
+
+    res = pd.concat(loaded["resultats_humain"])
+    assert str(res["nombre"].dtype) == "Int64"
+
+
+def test_main_stream_flag_uses_streaming_mode():
+    with patch.object(main_mod, "get_engine", return_value=MagicMock()), \
+            patch.object(main_mod, "run_streaming") as mock_stream, \
+            patch.object(main_mod, "run_batch") as mock_batch:
+        main_mod.main(["--stream", "--chunk-size", "10"])
+
+    mock_stream.assert_called_once()
+    assert mock_stream.call_args.kwargs["chunk_size"] == 10
+    mock_batch.assert_not_called()
+
+
+# --- parallel mode
+def test_run_parallel_loads_children_after_operations(tmp_path):
+    _write_raw_csvs(tmp_path)
+    events = []
+    lock = threading.Lock()
+
+    def fake_insert(df, table_name, engine, **kwargs):
+        with lock:
+            events.append(("start", table_name))
+        time.sleep(0.05)
+        with lock:
+            events.append(("end", table_name))
+
+    with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+            patch.object(main_mod, "insert_dataframe", side_effect=fake_insert), \
+            patch("builtins.print"):
+        counts = main_mod.run_parallel(MagicMock(), data_dir=str(tmp_path), max_workers=3)
+
+    assert counts == {"operations": 3, "flotteurs": 3, "resultats_humain": 2}
+
+    ops_end = events.index(("end", "operation"))
+    assert events.index(("start", "flotteurs")) > ops_end
+    assert events.index(("start", "resultats_humain")) > ops_end
+    # the two child tables overlap
+    children = [e for e in events if e[1] != "operation"]
+    assert [kind for kind, _ in children] == ["start", "start", "end", "end"]
+
+
+# --- incremental mode
+def test_run_streaming_incremental_skips_unchanged_rows(tmp_path, monkeypatch):
+    import pipeline.utils.incremental as incremental_mod
+
+    _write_raw_csvs(tmp_path)
+    monkeypatch.setattr(incremental_mod, "STATE_DIR", str(tmp_path / "state"))
+
+    def run():
+        loaded = {}
+
+        def fake_insert(df, table_name, engine, **kwargs):
+            loaded[table_name] = loaded.get(table_name, 0) + len(df)
+
+        with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+                patch.object(main_mod, "insert_dataframe", side_effect=fake_insert), \
+                patch("builtins.print"):
+            main_mod.run_streaming(MagicMock(), chunk_size=2, data_dir=str(tmp_path), incremental=True)
+        return loaded
+
+    assert run() == {"operation": 3, "flotteurs": 3, "resultats_humain": 2}
+    assert run() == {"operation": 0, "flotteurs": 0, "resultats_humain": 0}
+
+    # a corrected operation is the only row sent again
+    ops = pd.read_csv(tmp_path / "operations.csv")
+    ops.loc[1, "type_operation"] = "SAR"
+    ops.to_csv(tmp_path / "operations.csv", index=False)
+    assert run()["operation"] == 1
+
+
+def test_commit_changed_rows_prints_the_committed_watermark(tmp_path, monkeypatch):
+    import pipeline.utils.incremental as incremental_mod
+    from pipeline.utils.incremental import empty_state, merge_pending
+
+    monkeypatch.setattr(incremental_mod, "STATE_DIR", str(tmp_path / "state"))
+    state = dict(empty_state(), watermark=13331)
+    pending = dict(merge_pending([]), watermark=13312)
+
+    with patch("builtins.print") as mock_print:
+        main_mod.commit_changed_rows("operations", state, pending)
+
+    # le watermark enregistré reste le plus grand des deux
+    assert "watermark 13331 → 13331" in mock_print.call_args.args[0]
+
+
+# --- instrumentation
+def test_main_writes_run_report_and_profile(report_dir):
+    import json
+
+    _run_main(["--profile"], *_small_frames())
+
+    reports = sorted(report_dir.iterdir())
+    assert [p.suffix for p in reports] == [".json", ".prof"]
+
+    report = json.loads(reports[0].read_text())
+    assert report["status"] == "ok"
+    assert report["argv"] == ["--profile"]
+    stages = {(s["stage"], s["table"]): s for s in report["stages"]}
+    assert stages[("clean_operations", "operations")]["rows"] == 1
+    assert stages[("validate_df", "flotteurs")]["calls"] == 1
+    assert stages[("insert_dataframe", "resultats_humain")]["rows"] == 1
+
+
+def test_run_streaming_records_each_chunk(tmp_path):
+    _write_raw_csvs(tmp_path)
+    recorder = instrumentation_mod.start_run()
+
+    with patch.object(main_mod, "validate_df", side_effect=lambda df, schema, schema_name, **kwargs: df), \
+            patch.object(main_mod, "insert_dataframe"), \
+            patch("builtins.print"):
+        main_mod.run_streaming(MagicMock(), chunk_size=2, data_dir=str(tmp_path))
+
+    stages = {(s["stage"], s["table"]): s for s in recorder.report()["stages"]}
+    read = stages[("load_raw_data", "operations")]
+    assert read["rows"] == 3
+    assert read["bytes_read"] == os.path.getsize(tmp_path / "operations.csv")
+    assert stages[("insert_dataframe", "operation")]["calls"] == 2
+
+
+# --- checkpoints / resume
+def test_run_resume_restarts_from_first_unfinished_stage(tmp_path):
+    from pipeline.utils.checkpoints import CheckpointStore
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    _write_raw_csvs(data_dir)
+    store = CheckpointStore(str(tmp_path / "ckpt"))
+    engine = MagicMock()
+    loaded, validated = [], []
+
+    def fake_validate(df, schema, schema_name, **kwargs):
+        validated.append(schema_name)
+        return df
+
+    def failing_insert(df, table_name, engine, **kwargs):
+        if table_name == "flotteurs":
+            raise RuntimeError("connexion perdue")
+        loaded.append(table_name)
+
+    def run(insert):
+        with patch.object(main_mod, "validate_df", side_effect=fake_validate), \
+                patch.object(main_mod, "insert_dataframe", side_effect=insert), \
+                patch("builtins.print"):
+            return main_mod.run_resume(engine, data_dir=str(data_dir), checkpoints=store)
+
+    with pytest.raises(RuntimeError):
+        run(failing_insert)
+    assert loaded == ["operation"]
+    assert validated == ["operations", "flotteurs"]
+
+    loaded.clear(), validated.clear()
+    counts = run(lambda df, table_name, engine, **kwargs: loaded.append(table_name))
+
+    # operation déjà chargée, flotteurs repris après validation
+    assert loaded == ["flotteurs", "resultats_humain"]
+    assert validated == ["resultats_humain"]
+    assert counts == {"operations": 0, "flotteurs": 3, "resultats_humain": 2}
+
+
+def test_main_resume_rejects_streaming():
+    with pytest.raises(SystemExit):
+        main_mod.main(["--resume", "--stream"])
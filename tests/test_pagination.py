@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.data_types import apply_dtypes
+from streamlit_app.utils.helpers import column_types
+from streamlit_app.utils.pagination import fetch_pages, pages_frame
+
+
+class FakeTable:
+    # PostgREST : range inclusif, réponses plafonnées à max_rows
+
+    def __init__(self, n_rows, max_rows=1000):
+        self.rows = [{"operation_id": f"OP-{i:04d}", "vent_force": i % 12} for i in range(n_rows)]
+        self.max_rows = max_rows
+        self.ranges = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def query(self, count):
+        table = self
+
+        class Query:
+            def range(self, start, end):
+                self.start, self.end = start, end
+                return self
+
+            def execute(self):
+                with table._lock:
+                    table.ranges.append((self.start, self.end))
+                    table.threads.add(threading.current_thread().name)
+                end = min(self.end + 1, self.start + table.max_rows)
+                return SimpleNamespace(
+                    data=table.rows[self.start:end],
+                    count=len(table.rows) if count else None,
+                )
+
+        return Query()
+
+
+def test_pages_cover_the_table_past_the_server_cap():
+    table = FakeTable(2_350, max_rows=500)
+    seen = []
+
+    pages = fetch_pages(table.query, page_size=1000, max_workers=3,
+                        on_page=lambda number, rows: seen.append(number))
+
+    # plafond serveur (500) détecté sur la première page : pages de 500
+    assert [len(p) for p in pages] == [500, 500, 500, 500, 350]
+    assert table.ranges[0] == (0, 999)
+    assert sorted(table.ranges[1:]) == [(500, 999), (1000, 1499), (1500, 1999), (2000, 2349)]
+    assert sorted(seen) == [0, 1, 2, 3, 4] and seen[0] == 0
+
+    df = pages_frame(pages, dtypes=lambda df: df.astype({"vent_force": "Int8"}))
+    assert df["operation_id"].tolist() == [r["operation_id"] for r in table.rows]
+    assert str(df["vent_force"].dtype) == "Int8"
+
+
+def test_limit_and_empty_tables():
+    table = FakeTable(2_500)
+
+    pages = fetch_pages(table.query, page_size=1000, limit=1_200)
+    assert [len(p) for p in pages] == [1000, 200]
+
+    assert fetch_pages(FakeTable(0).query) == [[]]
+    assert pages_frame([[]], columns=["operation_id"]).columns.tolist() == ["operation_id"]
+
+
+def test_declared_columns_are_decoded_with_the_table_profile():
+    columns = ["operation_id", "date_heure_reception_alerte", "vent_force", "departement"]
+    dtypes, date_cols = column_types("operation", columns)
+    pages = [[
+        {"operation_id": "OP-1", "date_heure_reception_alerte": "2023-01-01T10:00:00+00:00",
+         "vent_force": 7, "departement": "Finistère"},
+        {"operation_id": "OP-2", "date_heure_reception_alerte": None,
+         "vent_force": None, "departement": "Finistère"},
+    ]]
+
+    df = pages_frame(
+        pages, columns=columns,
+        dtypes=lambda df: apply_dtypes(df, dtypes, date_cols, date_format="ISO8601"),
+    )
+
+    assert "operation_id" not in dtypes  # VARCHAR en base
+    assert str(df["date_heure_reception_alerte"].dtype) == "datetime64[ns, UTC]"
+    assert str(df["vent_force"].dtype) == "Int8"
+    assert str(df["departement"].dtype) == "category"
+
+
+def test_api_timestamps_with_varying_fractions_are_all_parsed():
+    # PostgREST omet les zéros de fin des fractions de seconde
+    _, date_cols = column_types("operation", ["date_heure_reception_alerte"])
+    pages = [[
+        {"date_heure_reception_alerte": "2023-01-01T10:00:00+00:00"},
+        {"date_heure_reception_alerte": "2023-01-01T10:00:00.5+00:00"},
+        {"date_heure_reception_alerte": "2023-01-01T12:00:00.123456+02:00"},
+    ]]
+
+    df = pages_frame(pages, dtypes=lambda df: apply_dtypes(df, {}, date_cols, date_format="ISO8601"))
+
+    assert df["date_heure_reception_alerte"].notna().all()
+    assert str(df["date_heure_reception_alerte"].iloc[2]) == "2023-01-01 10:00:00.123456+00:00"
@@ -0,0 +1,60 @@
+import os
+import sys
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+import pipeline.utils.partitions as partitions_mod
+from pipeline.utils.instrumentation import start_run
+from pipeline.utils.partitions import byte_partitions, read_partition
+from support_tools.generate_data import generate_dataset
+
+
+def test_byte_partitions_split_on_line_boundaries(tmp_path):
+    path = tmp_path / "data.csv"
+    lines = [f"{i},valeur {i}" for i in range(1000)]
+    path.write_text("id,texte\n" + "\n".join(lines) + "\n")
+
+    partitions = byte_partitions(str(path), 7)
+
+    assert len(partitions) == 7
+    frames = [read_partition(str(path), start, end) for start, end in partitions]
+    assert all(list(df.columns) == ["id", "texte"] for df in frames)
+    assert list(pd.concat(frames)["id"]) == list(range(1000))
+
+
+def _serial_clean(name, data_dir, dtype_profile):
+    cfg = main_mod.TABLES[name]
+    dtypes, _ = main_mod.table_types(name, dtype_profile)
+    raw = main_mod.read_raw_csv(os.path.join(data_dir, cfg["file"]), name, dtype_profile)
+    return main_mod.apply_dtypes(cfg["clean"](raw), dtypes, cfg["date_cols"])
+
+
+@pytest.mark.parametrize("dtype_profile", ["default", "compact"])
+def test_clean_partitioned_matches_serial_clean(tmp_path, monkeypatch, dtype_profile):
+    monkeypatch.setattr(partitions_mod, "MIN_PARTITION_BYTES", 1)
+    generate_dataset(str(tmp_path), 2_000, seed=3, garbage_rate=0.01)
+
+    # doublons exacts éloignés : dans des partitions différentes
+    flot = pd.read_csv(tmp_path / "flotteurs.csv", dtype=str)
+    pd.concat([flot, flot.head(5)]).to_csv(tmp_path / "flotteurs.csv", index=False)
+
+    for name in main_mod.TABLES:
+        partitioned = start_run()
+        with patch("builtins.print"):
+            result = main_mod.clean_partitioned(name, 2, str(tmp_path), dtype_profile)
+        serial = start_run()
+        expected = _serial_clean(name, str(tmp_path), dtype_profile)
+        # l'ordre des catégories dépend de l'ordre de découverte des valeurs
+        pd.testing.assert_frame_equal(result, expected, check_categorical=False)
+        # compteurs des processus du pool remontés dans le rapport
+        assert partitioned.counters == serial.counters
+        if name == "operations":
+            assert any(c.startswith("dates_non_reconnues:") for c in serial.counters)
+
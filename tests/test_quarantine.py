@@ -0,0 +1,80 @@
+import os
+import sys
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandera import Check
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pipeline.main as main_mod
+from pipeline.main import validate_df
+from pipeline.schemas.schema_pandera import ResultatsHumainSchema
+from pipeline.utils.data_types import resultats_humain_dtypes
+from pipeline.utils.quarantine import Quarantine, REASON_COL
+
+# Le schéma de référence ne borne pas `nombre` : check ajouté pour les tests
+PositiveSchema = ResultatsHumainSchema.update_columns({"nombre": {"checks": [Check.ge(0)]}})
+
+
+def _resultats():
+    return pd.DataFrame({
+        "operation_id": [1, 2, 3, 4],
+        "categorie_personne": pd.Series(["Plaisancier", "Pêcheur", "Baigneur", "Autre"], dtype="string"),
+        "resultat_humain": pd.Series(["Secouru", "Assisté", "Décédé", "Secouru"], dtype="string"),
+        "nombre": [1, 2, 3, 4],
+        "dont_nombre_blesse": [0, 1, 0, 2],
+    }, index=[10, 11, 12, 13])
+
+
+@pytest.mark.parametrize("mode", ["pandera", "fast"])
+def test_invalid_rows_go_to_quarantine(tmp_path, mode):
+    df = _resultats()
+    df.loc[11, "nombre"] = -1
+    df.loc[13, "nombre"] = -5
+    quarantine = Quarantine(str(tmp_path))
+
+    valid = validate_df(df, PositiveSchema, "resultats_humain", mode=mode, quarantine=quarantine)
+
+    assert list(valid.index) == [10, 12]
+    rejected = pd.read_csv(quarantine.path("resultats_humain"))
+    assert list(rejected["operation_id"]) == [2, 4]
+    assert all(reason.startswith("nombre:") for reason in rejected[REASON_COL])
+    assert quarantine.counts == {"resultats_humain": 2}
+
+
+def test_column_errors_still_fail_the_table(tmp_path):
+    df = _resultats().drop(columns=["nombre"])
+
+    with pytest.raises(RuntimeError):
+        validate_df(df, ResultatsHumainSchema, "resultats_humain", mode="fast", quarantine=Quarantine(str(tmp_path)))
+
+
+def test_reinject_loads_fixed_rows_and_keeps_the_others(tmp_path):
+    quarantine = main_mod.make_quarantine(root=str(tmp_path))
+    df = _resultats()
+    df.loc[11, "nombre"] = -1
+    df.loc[13, "nombre"] = -5
+    validate_df(df, PositiveSchema, "resultats_humain", quarantine=quarantine)
+
+    # correction manuelle d'une des deux lignes
+    path = quarantine.path("resultats_humain")
+    fixed = pd.read_csv(path)
+    fixed.loc[fixed["operation_id"] == 2, "nombre"] = 2
+    fixed.to_csv(path, index=False)
+
+    with patch.object(main_mod, "table_types", return_value=(resultats_humain_dtypes, PositiveSchema)), \
+            patch.object(main_mod, "insert_dataframe") as mock_insert, \
+            patch("builtins.print"):
+        counts = main_mod.run_reinject(MagicMock(), validation={"quarantine": quarantine})
+
+    assert counts == {"resultats_humain": 1}
+    loaded = mock_insert.call_args[0][0]
+    assert list(loaded["operation_id"]) == [2]
+    assert list(pd.read_csv(path)["operation_id"]) == [4]
+    assert not os.path.exists(path + ".reinjection")
+    assert np.all(loaded["nombre"] >= 0)
@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pipeline.utils.scheduler import run_stages
+
+
+def test_run_stages_passes_dependency_results_in_order():
+    order = []
+
+    def step(name, value):
+        def fn(*args):
+            order.append(name)
+            return value + sum(args)
+        return fn
+
+    results = run_stages({
+        "c": (step("c", 100), ["a", "b"]),
+        "a": (step("a", 1), []),
+        "b": (step("b", 10), ["a"]),
+    })
+
+    assert results == {"a": 1, "b": 11, "c": 112}
+    assert order.index("a") < order.index("b") < order.index("c")
+
+
+def test_run_stages_runs_independent_stages_concurrently():
+    # both children must be running at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    results = run_stages({
+        "parent": (lambda: "ok", []),
+        "child_1": (lambda _: barrier.wait() is not None, ["parent"]),
+        "child_2": (lambda _: barrier.wait() is not None, ["parent"]),
+    }, max_workers=2)
+
+    assert results["child_1"] and results["child_2"]
+
+
+def test_run_stages_stops_dependents_on_failure():
+    started = []
+
+    def boom():
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError, match="load failed"):
+        run_stages({
+            "parent": (boom, []),
+            "child": (lambda _: started.append("child"), ["parent"]),
+        })
+
+    assert started == []
+
+
+def test_run_stages_rejects_unknown_and_cyclic_dependencies():
+    with pytest.raises(ValueError, match="inconnues"):
+        run_stages({"a": (lambda _: None, ["missing"])})
+
+    with pytest.raises(ValueError, match="cycliques"):
+        run_stages({
+            "a": (lambda _: None, ["b"]),
+            "b": (lambda _: None, ["a"]),
+        })
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+APP_DIR = os.path.join(PROJECT_ROOT, "streamlit_app")
+
+
+@pytest.mark.parametrize("module", ["utils.db", "utils.helpers"])
+def test_app_modules_import_with_only_the_app_on_the_path(module):
+    # `streamlit run streamlit_app/1_Home.py` : seul streamlit_app/ est sur le path
+    pytest.importorskip("supabase")
+    env = dict(os.environ, PYTHONPATH=APP_DIR)
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr